@@ -1,25 +1,86 @@
 import argparse
 import asyncio
+import json
+import logging
 import math
 import os.path
 import sys
+import time
 from uuid import UUID
 
-from flask import Flask, request, jsonify
-
-from logger.log import create_logger
-from manager.file_manager import file_manager
-from manager.runner_manager import Manager, is_ready, task_count
+from flask import Flask, Request, Response, request, jsonify
+
+from logger.log import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, DEFAULT_ROTATE_INTERVAL, \
+    configure as configure_logging, create_logger, set_console_level
+from manager.delta_jar import DeltaError
+from manager.file_manager import UploadFile, delta_file_manager, file_manager, publish_upload, replica_file_manager
+from manager.ingest import DEFAULT_QUIET
+from manager.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, UPLOAD_BYTES, UPLOAD_DURATION, UPLOADS, \
+    render as render_metrics
+from manager.runner_manager import Manager
+from manager.service_config import ServiceConfigError, load_service_configs
+from manager.replication import QUORUM_PENDING, REPLICA_HEADER, parse_peer
 from manager.service_manager import registration
+from manager.supervisor import DEFAULT_RESTART_LIMIT
+from manager.task_registry import DEPLOYING, FAILED, FINISHED, IN_PROGRESS, SKIPPED, UNKNOWN, VALIDATING
+from manager.upload_session import DEFAULT_CHUNK_SIZE, ChecksumError, UploadSessionError, UploadSessions
+from server.async_server import DEFAULT_CONCURRENCY, DEFAULT_KEEP_ALIVE, DEFER_KEY, PAUSE_KEY, RESUMED_KEY, Pause, \
+    serve
+
+
+# 서비스 이름 -> Manager. 첫 번째 서비스가 service 파라미터를 생략했을 때의 기본 서비스입니다.
+services = {}
+# 이어받기가 가능한 청크 업로드의 세션입니다.
+upload_sessions = UploadSessions()
+
+
+def _find_service(name=None):
+    if name is None:
+        return next(iter(services.values()), None)
+    return services.get(name)
+
+
+class UploadRequest(Request):
+    # 업로드된 JAR은 werkzeug 임시 파일을 거치지 않고 서비스의 save_dir 에 바로 기록됩니다.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 본문을 끝까지 받지 못해 request.files 에 등록되지 않은 파일도 요청이 끝날 때 지울 수 있도록 모두 기록합니다.
+        self.upload_files = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        service = _find_service(self.args.get('service'))
+        if service is not None and filename and filename.endswith('.jar'):
+            upload = UploadFile(service.target_dir)
+            self.upload_files.append(upload)
+            return upload
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 log = create_logger('UEC_Log', 'uec.log')
 
 
+@app.teardown_request
+def close_upload_files(exc=None):
+    # 파싱이 성공했는지와 관계없이, 게시되지 않은 임시 파일을 지웁니다.
+    for upload in getattr(request, 'upload_files', ()):
+        upload.close()
+
+
+SERVICE_NOT_FOUND = {'error': '해당 서비스를 찾을 수 없습니다.'}
+UPLOAD_SESSION_NOT_FOUND = {'error': '해당 업로드 세션을 찾을 수 없습니다.'}
+
+
 @app.route('/jar_upload', methods=['POST'])
 def jar_upload():
     log.info('Upload has been detected.')
+    start_time = time.monotonic()
+
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
 
     if files := request.files:
         if 'jar' not in files:
@@ -37,46 +98,504 @@ def jar_upload():
             log.info('Upload event failed. Request where file extension is not .jar')
             return jsonify({'error': '확장자가 jar이 아닙니다.'}), 400
 
-    uuid, result = file_manager(save_dir, jar)
-    manager.uuid = uuid
+    uuid, result, duplicate = file_manager(manager.target_dir, jar, on_publish=manager.reserve, dedup=dedup,
+                                           on_duplicate=manager.deploy_stored)
+
+    if isinstance(jar.stream, UploadFile):
+        UPLOAD_BYTES.labels(manager.name).observe(jar.stream.size)
+    UPLOAD_DURATION.labels(manager.name).observe(time.monotonic() - start_time)
+    UPLOADS.labels(manager.name, 'duplicate' if duplicate else 'published' if result else 'failed').inc()
 
-    if result:
-        response = jsonify({
+    return _upload_response(manager, uuid, result, duplicate)
+
+
+def _upload_response(manager, uuid, result, duplicate):
+    if duplicate:
+        body, code = {
+            'message': 'The same file has already been uploaded. No work has been added.',
+            'uuid': str(uuid),
+            'polling': f'/tasking?uuid={uuid}'
+        }, 200
+    elif result:
+        body, code = {
             'message': 'Upload has been completed. Work is in progress.',
+            'uuid': str(uuid),
             'polling': f'/tasking?uuid={uuid}'
-        }), 202
+        }, 202
     else:
-        response = jsonify({'message': 'Upload failed.'}), 400
+        return jsonify({'message': 'Upload failed.'}), 400
+
+    # 다른 UEC 가 복제한 업로드는 다시 복제하지 않습니다.
+    if manager.replication.enabled and REPLICA_HEADER not in request.headers:
+        manager.replicate(uuid)
+        body['cluster'] = f'/tasking/cluster?uuid={uuid}'
+
+    return jsonify(body), code
+
+
+@app.route('/jar_upload/replica', methods=['POST'])
+def jar_upload_replica():
+    # 다른 UEC 가 파일을 보내기 전에 같은 내용이 있는지 확인합니다. 없으면 404 를 받고 /jar_upload 로 파일을 보냅니다.
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    body = request.get_json(silent=True) or {}
+    filename, digest = body.get('filename'), body.get('sha256')
+    if not filename or not digest:
+        return jsonify({'error': 'filename, sha256 이 필요합니다.'}), 400
+    if not filename.endswith('.jar'):
+        return jsonify({'error': '확장자가 jar이 아닙니다.'}), 400
+
+    replica = replica_file_manager(manager.target_dir, filename, digest, on_publish=manager.reserve, dedup=dedup,
+                                   on_duplicate=manager.deploy_stored)
+    if replica is None:
+        return jsonify({'error': '같은 내용의 파일이 없습니다.', 'missing': True}), 404
+
+    uuid, result, duplicate = replica
+    UPLOADS.labels(manager.name, 'duplicate' if duplicate else 'published' if result else 'failed').inc()
+    return _upload_response(manager, uuid, result, duplicate)
+
+
+@app.route('/jar_upload/delta', methods=['POST'])
+def jar_upload_delta():
+    log.info('Delta upload has been detected.')
+    start_time = time.monotonic()
+
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    delta = request.files.get('delta')
+    base, expected_digest = request.form.get('base'), request.form.get('sha256')
+    if delta is None or not base or not expected_digest:
+        log.info('Delta upload failed. Request where delta, base or sha256 does not exist')
+        return jsonify({'error': 'delta, base, sha256 이 필요합니다.'}), 400
+
+    try:
+        deleted = json.loads(request.form.get('deleted') or '[]')
+        if not isinstance(deleted, list):
+            raise ValueError(deleted)
+    except ValueError:
+        return jsonify({'error': 'deleted 는 엔트리 이름의 JSON 배열이어야 합니다.'}), 400
+
+    filename = request.form.get('filename')
+    if filename is not None and not filename.endswith('.jar'):
+        return jsonify({'error': '확장자가 jar이 아닙니다.'}), 400
+
+    try:
+        uuid, result, duplicate = delta_file_manager(manager.target_dir, base, delta, deleted, expected_digest,
+                                                     filename, on_publish=manager.reserve, dedup=dedup,
+                                                     on_duplicate=manager.deploy_stored)
+    except FileNotFoundError as e:
+        log.info(f'Delta upload failed. {e}')
+        return jsonify({'error': '기준 버전을 찾을 수 없습니다.', 'base': base}), 404
+    except DeltaError as e:
+        log.info(f'Delta upload failed. {e}')
+        UPLOADS.labels(manager.name, 'failed').inc()
+        return jsonify({'error': str(e)}), 400
+
+    UPLOAD_BYTES.labels(manager.name).observe(request.content_length or 0)
+    UPLOAD_DURATION.labels(manager.name).observe(time.monotonic() - start_time)
+    UPLOADS.labels(manager.name, 'duplicate' if duplicate else 'published' if result else 'failed').inc()
+
+    return _upload_response(manager, uuid, result, duplicate)
+
+
+@app.route('/jar_upload/sessions', methods=['POST'])
+def open_upload_session():
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    body = request.get_json(silent=True) or {}
+    filename, size = body.get('filename'), body.get('size')
+    if not isinstance(filename, str) or not filename.endswith('.jar'):
+        return jsonify({'error': '확장자가 jar이 아닙니다.'}), 400
+    if not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'size 는 파일의 크기(byte)여야 합니다.'}), 400
+    chunk_size = body.get('chunk_size')
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        return jsonify({'error': 'chunk_size 는 청크의 크기(byte)여야 합니다.'}), 400
+
+    try:
+        session = upload_sessions.open(manager.name, manager.target_dir, os.path.basename(filename), size,
+                                       body.get('sha256'), chunk_size)
+    except OSError as e:
+        log.error(f'The upload session could not be opened. : {e}')
+        return jsonify({'error': '업로드 세션을 열 수 없습니다.'}), 500
+
+    return jsonify(dict(session.status(), upload=f'/jar_upload/sessions/{session.id}')), 201
+
+
+@app.route('/jar_upload/sessions/<session_id>', methods=['PUT'])
+def put_upload_chunk(session_id):
+    session = upload_sessions.get(session_id)
+    if session is None:
+        return jsonify(UPLOAD_SESSION_NOT_FOUND), 404
+
+    offset = request.args.get('offset', type=int)
+    checksum = request.headers.get('X-Chunk-Sha256')
+    length = request.content_length
+    if offset is None or not checksum or not length:
+        return jsonify({'error': 'offset, Content-Length, X-Chunk-Sha256 이 필요합니다.'}), 400
+
+    try:
+        received = session.write(offset, request.stream, length, checksum)
+    except UploadSessionError as e:
+        log.info(f'The chunk was rejected. {e}')
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'offset': offset, 'length': length, 'received_bytes': received,
+                    'complete': received == session.size}), 200
+
+
+@app.route('/jar_upload/sessions/<session_id>', methods=['GET'])
+def upload_session_status(session_id):
+    session = upload_sessions.get(session_id)
+    if session is None:
+        return jsonify(UPLOAD_SESSION_NOT_FOUND), 404
+
+    return jsonify(session.status()), 200
+
+
+@app.route('/jar_upload/sessions/<session_id>', methods=['DELETE'])
+def abort_upload_session(session_id):
+    if not upload_sessions.abort(session_id):
+        return jsonify(UPLOAD_SESSION_NOT_FOUND), 404
+
+    return '', 204
+
+
+@app.route('/jar_upload/sessions/<session_id>/finalize', methods=['POST'])
+def finalize_upload_session(session_id):
+    session = upload_sessions.get(session_id)
+    if session is None:
+        return jsonify(UPLOAD_SESSION_NOT_FOUND), 404
+
+    manager = services.get(session.service)
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    try:
+        digest = session.finish()
+    except ChecksumError as e:
+        log.info(f'The upload session has failed. {e}')
+        upload_sessions.abort(session_id)
+        UPLOADS.labels(manager.name, 'failed').inc()
+        return jsonify({'error': str(e)}), 400
+    except UploadSessionError as e:
+        return jsonify(dict(session.status(), error=str(e))), 409
+
+    upload_sessions.pop(session_id)
+    try:
+        uuid, result, duplicate = publish_upload(manager.target_dir, session.path, session.filename, digest,
+                                                 on_publish=manager.reserve, dedup=dedup,
+                                                 on_duplicate=manager.deploy_stored)
+    except Exception as e:
+        log.error(f'An error occurred while saving the file. : {e}')
+        session.close()
+        uuid, result, duplicate = None, False, False
 
-    return response
+    UPLOAD_BYTES.labels(manager.name).observe(session.size)
+    UPLOAD_DURATION.labels(manager.name).observe(time.time() - session.created_at)
+    UPLOADS.labels(manager.name, 'duplicate' if duplicate else 'published' if result else 'failed').inc()
+
+    return _upload_response(manager, uuid, result, duplicate)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
 
 
 @app.route('/test', methods=['GET'])
 def test(): return jsonify({'message': 'Test Successful'}), 200
 
 
+MAX_WAIT = 60
+STREAM_KEEP_ALIVE = 15
+
+
+def _task_body(uuid, status, waiting, message, phase):
+    if status in IN_PROGRESS:
+        body = {
+            'message': f'Work is in progress. waiting number : {waiting}',
+            'status': status,
+            'polling': f'/tasking?uuid={uuid}'
+        }
+        if phase is not None:
+            body['phase'] = phase
+        return body, 202
+    elif status == UNKNOWN:
+        return {'error': '해당 작업 번호를 찾을 수 없습니다.'}, 404
+    elif status == SKIPPED:
+        return {'message': f'That work has been skipped. ({message})', 'status': status}, 200
+    elif status == FAILED:
+        return {'message': f'That work has failed. ({message})', 'status': status}, 200
+    else:
+        return {'message': 'That work has been completed.', 'status': status}, 200
+
+
+def _request_uuid():
+    name = request.args.get('file')
+    if name is not None and 'uuid' not in request.args:
+        # 직접 복사된 파일처럼 작업 번호를 모르는 경우, 파일 이름으로 가장 최근 작업을 찾습니다.
+        service = request.args.get('service')
+        targets = [services[service]] if service in services else services.values()
+        for manager in targets:
+            if (uuid := manager.latest_task(name)) is not None:
+                return uuid
+        return None
+
+    try:
+        return UUID(request.args.get('uuid'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _uuid_error():
+    if 'file' in request.args and 'uuid' not in request.args:
+        return jsonify({'error': '해당 파일의 작업을 찾을 수 없습니다.'}), 404
+    return jsonify({'error': 'uuid 형식이 올바르지 않습니다.'}), 400
+
+
+def _find_task_service(uuid):
+    name = request.args.get('service')
+    if name is not None:
+        return services.get(name)
+
+    for service in services.values():
+        if service.task_status(uuid)[0] != UNKNOWN:
+            return service
+    return _find_service()
+
+
 @app.route('/tasking', methods=['GET'])
 def tasking():
-    uuid = UUID(request.args.get('uuid'))
+    uuid = _request_uuid()
+    if uuid is None:
+        return _uuid_error()
     log.debug(f'Check the current task status. Incoming request UUID : {uuid}')
 
-    is_tasking, waiting = manager.is_tasking(uuid)
+    manager = _find_task_service(uuid)
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
 
-    if is_tasking:
-        return jsonify({
-            'message': f'Work is in progress. waiting number : {waiting}',
-            'polling': f'{request.path}?uuid={uuid}'
-        }), 202
+    state = manager.task_status(uuid)
+
+    # wait 가 주어지면 작업 상태가 바뀌는 즉시, 혹은 wait 초가 지나면 응답합니다.
+    wait = min(request.args.get('wait', 0, type=float), MAX_WAIT)
+    if wait > 0 and state[0] not in FINISHED and not request.environ.get(RESUMED_KEY):
+        defer = request.environ.get(DEFER_KEY)
+        if defer is None:
+            state = manager.wait_for_change(uuid, state, wait)
+        else:
+            # 비동기 서버에서는 스레드를 붙잡지 않고 이벤트 루프에서 기다린 뒤 이 요청을 다시 처리합니다.
+            previous = state
+            defer(lambda: manager.wait_for_change_async(uuid, previous, wait))
+            return '', 204
+
+    body, code = _task_body(uuid, *state)
+    return jsonify(body), code
+
+
+@app.route('/tasking', methods=['DELETE'])
+def cancel_tasking():
+    uuid = _request_uuid()
+    if uuid is None:
+        return _uuid_error()
+
+    manager = _find_task_service(uuid)
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    cancelled, status = manager.cancel(uuid)
+    if cancelled:
+        return jsonify({'message': 'The task has been cancelled.', 'status': status}), 200
+    elif status == VALIDATING:
+        # 검증 중인 작업은 검증이 끝난 뒤 배포하지 않고 건너뜁니다.
+        return jsonify({'message': 'The task will be cancelled after validation.', 'status': status,
+                        'polling': f'/tasking?uuid={uuid}'}), 202
+    elif status == UNKNOWN:
+        return jsonify({'error': '해당 작업 번호를 찾을 수 없습니다.'}), 404
+    elif status == DEPLOYING:
+        return jsonify({'error': '이미 배포가 시작된 작업은 취소할 수 없습니다.', 'status': status}), 409
     else:
-        return jsonify({'message': 'That work has been completed.'}), 200
+        return jsonify({'error': '이미 끝난 작업입니다.', 'status': status}), 409
+
+
+@app.route('/tasking/cluster', methods=['GET'])
+def tasking_cluster():
+    # 업로드를 받은 노드와 복제된 피어 노드의 배포 상태, 정족수 달성 여부를 함께 반환합니다.
+    uuid = _request_uuid()
+    if uuid is None:
+        return _uuid_error()
+
+    manager = _find_task_service(uuid)
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    body = manager.cluster_status(uuid)
+    if body['nodes'][0]['status'] == UNKNOWN and len(body['nodes']) == 1:
+        return jsonify({'error': '해당 작업 번호를 찾을 수 없습니다.'}), 404
+
+    if body['status'] == QUORUM_PENDING:
+        body['polling'] = f'/tasking/cluster?uuid={uuid}'
+        return jsonify(body), 202
+    return jsonify(body), 200
+
+
+@app.route('/tasking/stream', methods=['GET'])
+def tasking_stream():
+    uuid = _request_uuid()
+    if uuid is None:
+        return _uuid_error()
+
+    manager = _find_task_service(uuid)
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    pause = request.environ.get(PAUSE_KEY, False)
+
+    def events():
+        state = manager.task_status(uuid)
+        while True:
+            body, code = _task_body(uuid, *state)
+            body['code'] = code
+            yield f'event: status\ndata: {json.dumps(body, ensure_ascii=False)}\n\n'
+
+            if state[0] in FINISHED:
+                return
+
+            previous = state
+            while state == previous:
+                if pause:
+                    # 비동기 서버에서는 스레드와 동시 처리 수를 반납하고 이벤트 루프에서 기다립니다.
+                    yield Pause(lambda: manager.wait_for_change_async(uuid, previous, STREAM_KEEP_ALIVE))
+                    state = manager.task_status(uuid)
+                else:
+                    state = manager.wait_for_change(uuid, previous, STREAM_KEEP_ALIVE)
+                if state == previous:
+                    yield ': keep-alive\n\n'
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 
 @app.route('/ready', methods=['GET'])
 def ready():
-    if is_ready():
+    name = request.args.get('service')
+    if name is not None:
+        if name not in services:
+            return jsonify(SERVICE_NOT_FOUND), 404
+        targets = [services[name]]
+    else:
+        targets = list(services.values())
+
+    if all(service.is_ready() for service in targets):
         return jsonify({'message': 'There are no pending tasks.'}), 200
     else:
-        return jsonify({'message': f'Number of pending tasks {task_count()}'}), 202
+        return jsonify({'message': f'Number of pending tasks {sum(service.task_count() for service in targets)}'}), 202
+
+
+LOG_LINES = 100
+MAX_LOG_LINES = 2000
+
+
+@app.route('/logs', methods=['GET'])
+def logs():
+    if request.args.get('uuid') is not None:
+        uuid = _request_uuid()
+        if uuid is None:
+            return jsonify({'error': 'uuid 형식이 올바르지 않습니다.'}), 400
+        manager = _find_task_service(uuid)
+    else:
+        uuid = None
+        manager = _find_service(request.args.get('service'))
+
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    output = manager.backend_output(uuid)
+    if output is None:
+        return jsonify({'error': '해당 작업의 백엔드 출력을 찾을 수 없습니다.'}), 404
+
+    lines = min(request.args.get('lines', LOG_LINES, type=int), MAX_LOG_LINES)
+    return jsonify({
+        'uuid': str(uuid) if uuid is not None else None,
+        'running': not output.closed.is_set(),
+        'dropped': output.dropped,
+        'lines': output.tail(lines),
+    }), 200
+
+
+@app.route('/backend', methods=['GET'])
+def backend():
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    return jsonify(manager.backend_status()), 200
+
+
+@app.route('/versions', methods=['GET'])
+def versions():
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    return jsonify(manager.versions()), 200
+
+
+@app.route('/deploy', methods=['POST'])
+def deploy():
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    version = request.args.get('version')
+    if not version:
+        return jsonify({'error': 'version 이 필요합니다.'}), 400
+
+    uuid = manager.redeploy(version)
+    if uuid is None:
+        log.info(f'Redeploy failed. The version does not exist. : {version}')
+        return jsonify({'error': '해당 버전을 찾을 수 없습니다.', 'version': version}), 404
+
+    return jsonify({
+        'message': 'The stored version has been queued ahead of uploads. Work is in progress.',
+        'polling': f'/tasking?uuid={uuid}'
+    }), 202
+
+
+@app.route('/retention', methods=['GET'])
+def retention():
+    manager = _find_service(request.args.get('service'))
+    if manager is None:
+        return jsonify(SERVICE_NOT_FOUND), 404
+
+    return jsonify(manager.retention_report()), 200
+
+
+# 서비스별 설정의 실행 인수 값입니다. 설정 파일의 서비스도 생략한 설정은 이 값을 따릅니다.
+def service_defaults(args):
+    return dict(debug=args.debug,
+                maintenance_count=args.maintenance_count,
+                maintenance_bytes=args.maintenance_bytes,
+                maintenance_age=args.maintenance_age,
+                coalesce=args.coalesce,
+                ready_timeout=args.ready_timeout,
+                health_path=args.health_path,
+                internal_ports=args.internal_ports,
+                drain_timeout=args.drain_timeout,
+                restart_limit=args.restart_limit,
+                backend_log=args.backend_log,
+                validate=not args.no_validate,
+                ingest_quiet=args.ingest_quiet,
+                peers=args.peers,
+                quorum=args.quorum)
 
 
 def add_parse(parse: argparse.ArgumentParser):
@@ -84,12 +603,54 @@ def add_parse(parse: argparse.ArgumentParser):
     save_default = os.path.join(temp, 'uec')
 
     parse.add_argument('-up', '--uec_port', type=int, required=False, default=4074, help='해당 프로그램이 사용할 포트')
-    parser.add_argument('-bp', '--backend_port', type=int, required=False, default=8080, help='감시할 백엔드 포트')
-    parser.add_argument('-sd', '--save_dir', type=str, required=False, default=save_default, help='파일을 저장할 위치')
-    parser.add_argument('-d', '--dir_created', action='store_true', help='디렉토리가 존재하지 않을 경우 생성합니다.')
+    parse.add_argument('-bp', '--backend_port', type=int, required=False, default=8080, help='감시할 백엔드 포트')
+    parse.add_argument('-sd', '--save_dir', type=str, required=False, default=save_default, help='파일을 저장할 위치')
+    parse.add_argument('-d', '--dir_created', action='store_true', help='디렉토리가 존재하지 않을 경우 생성합니다.')
     parse.add_argument('-mc', '--maintenance_count', type=int, required=False, default=math.inf, help='유지할 파일의 수 입니다.')
-    parser.add_argument('-reg', '--register', action='store_true', help='app 최초 실행시 서비스를 자동 등록')
-    parser.add_argument('--debug', action='store_true', help='디버깅')
+    parse.add_argument('-mb', '--maintenance_bytes', type=int, required=False, default=None,
+                       help='저장된 JAR 전체의 최대 용량(byte). 넘으면 오래된 버전부터 삭제합니다.')
+    parse.add_argument('-ma', '--maintenance_age', type=float, required=False, default=None,
+                       help='이전 버전을 보관할 최대 기간(초)')
+    parse.add_argument('-rt', '--ready_timeout', type=float, required=False, default=60,
+                       help='백엔드가 준비될 때까지 기다릴 최대 시간(초)')
+    parse.add_argument('-hp', '--health_path', type=str, required=False, default=None,
+                       help='2xx 응답으로 준비 여부를 확인할 백엔드 경로 (예: /actuator/health)')
+    parse.add_argument('-ip', '--internal_ports', type=int, nargs=2, required=False, default=None,
+                       help='지정 시 UEC가 backend_port 를 점유하고, 두 내부 포트를 번갈아 사용하여 무중단 배포합니다.')
+    parse.add_argument('-dt', '--drain_timeout', type=float, required=False, default=30,
+                       help='무중단 배포 시 이전 서버의 연결이 끝나기를 기다릴 최대 시간(초)')
+    parse.add_argument('-rl', '--restart_limit', type=int, required=False, default=DEFAULT_RESTART_LIMIT,
+                       help='비정상 종료된 백엔드를 연속으로 다시 실행할 최대 횟수. 넘으면 마지막 정상 버전으로 되돌립니다. 0 이면 다시 실행하지 않습니다.')
+    parse.add_argument('-bl', '--backend_log', action='store_true',
+                       help='백엔드 출력을 로그 디렉토리의 backend.log 에도 기록합니다. 로그 파일 교체 설정을 따릅니다.')
+    parse.add_argument('-nv', '--no_validate', action='store_true',
+                       help='배포 전 JAR 검증(zip 구조, CRC, MANIFEST 의 Main-Class/Start-Class)을 하지 않습니다.')
+    parse.add_argument('-iq', '--ingest_quiet', type=float, required=False, default=DEFAULT_QUIET,
+                       help='직접 복사된 JAR의 닫힘 이벤트를 받지 못했을 때, 변경이 없어야 하는 시간(초)')
+    parse.add_argument('-pe', '--peers', type=str, nargs='+', required=False, default=None,
+                       help='업로드를 복제할 다른 노드의 UEC 주소 목록 (host:port)')
+    parse.add_argument('-qu', '--quorum', type=int, required=False, default=None,
+                       help='배포에 성공해야 하는 노드 수. 기본값은 이 노드를 포함한 전체 노드의 과반수')
+    parse.add_argument('-co', '--coalesce', action='store_true', help='같은 JAR의 새 버전이 업로드되면 대기 중인 이전 버전은 실행하지 않습니다.')
+    parse.add_argument('-cf', '--config', type=str, required=False, default=None,
+                       help='여러 백엔드를 관리하기 위한 서비스 설정 파일(JSON). 지정 시 서비스별 설정이 위 인수보다 우선합니다.')
+    parse.add_argument('-nd', '--no_dedup', action='store_true', help='내용이 같은 JAR도 새로운 버전으로 저장하고 실행합니다.')
+    parse.add_argument('-sv', '--server', type=str, required=False, default='flask', choices=['flask', 'async'],
+                       help='HTTP 서버 종류. async 는 업로드와 상태 조회가 서로를 막지 않는 운영용 서버입니다.')
+    parse.add_argument('-cc', '--concurrency', type=int, required=False, default=DEFAULT_CONCURRENCY,
+                       help='async 서버에서 동시에 처리할 요청 수')
+    parse.add_argument('-ka', '--keep_alive', type=float, required=False, default=DEFAULT_KEEP_ALIVE,
+                       help='async 서버에서 유휴 연결을 유지할 시간(초)')
+    parse.add_argument('-lf', '--log_format', type=str, required=False, default='text', choices=['text', 'json'],
+                       help='로그 형식. json 은 한 줄에 하나의 JSON 객체로 기록하며 작업 번호(uuid)와 단계(phase)를 포함합니다.')
+    parse.add_argument('-lb', '--log_max_bytes', type=int, required=False, default=DEFAULT_MAX_BYTES,
+                       help='로그 파일 하나의 최대 크기(byte). 넘으면 새 파일로 교체합니다.')
+    parse.add_argument('-lc', '--log_backup_count', type=int, required=False, default=DEFAULT_BACKUP_COUNT,
+                       help='보관할 이전 로그 파일의 수')
+    parse.add_argument('-li', '--log_rotate_interval', type=float, required=False, default=DEFAULT_ROTATE_INTERVAL,
+                       help='로그 파일을 교체하는 주기(초). 0 이면 크기로만 교체합니다.')
+    parse.add_argument('-reg', '--register', action='store_true', help='app 최초 실행시 서비스를 자동 등록')
+    parse.add_argument('--debug', action='store_true', help='디버깅')
 
     return parse.parse_args()
 
@@ -102,27 +663,49 @@ if __name__ == '__main__':
     backend_port = args.backend_port
     save_dir = args.save_dir
     dir_created = args.dir_created
-    maintenance_count = args.maintenance_count
+    dedup = not args.no_dedup
     register = args.register
     debug = args.debug
 
-    if not os.path.exists(save_dir):
-        if dir_created:
-            os.makedirs(save_dir)
-        else:
-            exit(f'Could not find the path to "{save_dir}" Exit the program.')
+    defaults = service_defaults(args)
+
+    if args.config:
+        try:
+            # 내부 포트는 서비스마다 달라야 하므로 설정 파일에서만 지정합니다.
+            service_configs = load_service_configs(args.config, dict(defaults, internal_ports=None))
+        except (OSError, ServiceConfigError) as e:
+            exit(f'Could not load the service config "{args.config}". : {e}')
+    else:
+        service_configs = [dict(defaults, name='default', target_dir=save_dir, server_port=backend_port)]
+
+    for service_config in service_configs:
+        for peer in service_config.get('peers') or ():
+            try:
+                parse_peer(peer)
+            except ValueError as e:
+                exit(f'{e} Exit the program.')
+
+        target_dir = service_config['target_dir']
+        if not os.path.exists(target_dir):
+            if dir_created:
+                os.makedirs(target_dir)
+            else:
+                exit(f'Could not find the path to "{target_dir}" Exit the program.')
 
     if register:
         success = asyncio.run(registration(args))
         sys.exit()
 
+    configure_logging(args.log_max_bytes, args.log_backup_count, args.log_rotate_interval, args.log_format == 'json')
     if debug:
-        log = create_logger('UEC_log', 'uec.log', console_level=debug)
+        set_console_level(logging.DEBUG)
 
-    manager = (Manager(target_dir=save_dir, server_port=backend_port,
-                      debug=debug,
-                      maintenance_count=maintenance_count)
-               .start())
+    for service_config in service_configs:
+        services[service_config['name']] = Manager(**service_config).start()
+    upload_sessions.start()
 
     log.info(f"The server has started. Port : {port}")
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    if args.server == 'async':
+        serve(app, port=port, concurrency=args.concurrency, keep_alive=args.keep_alive)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,81 @@
+import http.client
+import io
+import json
+import os
+import statistics
+import time
+import uuid
+import zipfile
+
+from fake_backend import FAIL_ENTRY
+
+
+def percentile(values, percent):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def report(label, latencies):
+    latencies = [latency * 1000 for latency in latencies]
+    if not latencies:
+        print(f'{label:<20} no samples')
+        return
+
+    print(f'{label:<20} n={len(latencies):<6} '
+          f'p50={percentile(latencies, 50):8.2f}ms '
+          f'p95={percentile(latencies, 95):8.2f}ms '
+          f'p99={percentile(latencies, 99):8.2f}ms '
+          f'max={max(latencies):8.2f}ms '
+          f'mean={statistics.fmean(latencies):8.2f}ms')
+
+
+def make_jar(size, fail=False):
+    # 배포 전 검증을 통과하는 실행 가능한 형태의 JAR 입니다. 내용은 매번 달라 중복 업로드로 건너뛰지 않습니다.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as jar:
+        jar.writestr('META-INF/MANIFEST.MF', 'Manifest-Version: 1.0\r\nMain-Class: bench.Main\r\n\r\n')
+        if fail:
+            jar.writestr(FAIL_ENTRY, b'')
+        jar.writestr('payload.bin', os.urandom(max(size - 256, 16)))
+    return buffer.getvalue()
+
+
+def multipart(content, throttle=0.0, filename='bench.jar'):
+    boundary = uuid.uuid4().hex
+    part_head = (f'--{boundary}\r\n'
+                 f'Content-Disposition: form-data; name="jar"; filename="{filename}"\r\n'
+                 f'Content-Type: application/java-archive\r\n\r\n').encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+
+    def body():
+        yield part_head
+        for offset in range(0, len(content), 64 * 1024):
+            yield content[offset:offset + 64 * 1024]
+            if throttle:
+                time.sleep(throttle)
+        yield tail
+
+    return boundary, len(part_head) + len(content) + len(tail), body()
+
+
+def upload(host, port, size, throttle=0.0, filename='bench.jar', fail=False, service=None):
+    boundary, length, body = multipart(make_jar(size, fail), throttle, filename)
+    path = '/jar_upload' if service is None else f'/jar_upload?service={service}'
+    connection = http.client.HTTPConnection(host, port, timeout=600)
+    try:
+        connection.putrequest('POST', path)
+        connection.putheader('Content-Type', f'multipart/form-data; boundary={boundary}')
+        connection.putheader('Content-Length', str(length))
+        connection.endheaders()
+        for chunk in body:
+            connection.send(chunk)
+        response = connection.getresponse()
+        data = response.read()
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, None
+    finally:
+        connection.close()
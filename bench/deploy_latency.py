@@ -0,0 +1,185 @@
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+from common import report, upload
+from poll_latency import measure
+
+# 가짜 백엔드로 UEC를 실행하고, 업로드부터 파일 저장, 백엔드 응답까지 걸리는 시간을 측정합니다.
+# 측정 결과가 JVM 기동 시간에 흔들리지 않도록 `java -jar` 대신 bench/fake_backend.py 를 실행합니다.
+#
+#   python bench/deploy_latency.py --uploads 20 --burst 4 --size 33554432 --delay 0.5
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(os.path.dirname(BENCH_DIR), 'app.py')
+FINISHED = ('completed', 'failed', 'skipped')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_port(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def _get(port, path, timeout=90):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def start_uec(args, save_dir):
+    uec_port, backend_port = _free_port(), _free_port()
+    command = [sys.executable, os.path.join(BENCH_DIR, 'fake_backend.py'), '{jar}', '--port={port}',
+               f'--delay={args.delay}']
+    service = {'name': 'bench', 'save_dir': save_dir, 'port': backend_port, 'command': command}
+    if args.maintenance_count is not None:
+        service['maintenance_count'] = args.maintenance_count
+    if args.internal_ports:
+        service['internal_ports'] = [_free_port(), _free_port()]
+
+    config = os.path.join(save_dir, '.bench_services.json')
+    with open(config, 'w', encoding='utf-8') as f:
+        json.dump({'services': [service]}, f)
+
+    process = subprocess.Popen(
+        [sys.executable, APP, f'--uec_port={uec_port}', f'--config={config}', f'--server={args.server}'],
+        cwd=os.path.dirname(APP), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    if not _wait_port(uec_port, 30):
+        process.kill()
+        raise RuntimeError('UEC did not start within 30 seconds.')
+    return process, uec_port
+
+
+def _wait_task(uec_port, uuid):
+    while True:
+        status, body = _get(uec_port, f'/tasking?uuid={uuid}&wait=60')
+        if status == 404:
+            return 'unknown'
+        state = json.loads(body).get('status')
+        if state in FINISHED:
+            return state
+
+
+# 작업 완료는 준비 확인(포트 연결)이 끝난 시점이므로, 이때부터 백엔드가 새 JAR로 응답합니다.
+def deploy_one(args, uec_port, number, results):
+    fail = bool(args.fail_every) and number % args.fail_every == 0
+
+    start_time = time.perf_counter()
+    status, body = upload('127.0.0.1', uec_port, args.size, filename=f'{args.artifact}.jar', fail=fail)
+    uploaded = time.perf_counter()
+    if status not in (200, 202) or not body:
+        results['errors'] += 1
+        return
+
+    results['visible'].append(uploaded - start_time)
+    uuid = body['polling'].split('uuid=', 1)[1]
+    state = _wait_task(uec_port, uuid)
+    results['states'][state] = results['states'].get(state, 0) + 1
+    if state != 'completed':
+        return
+
+    finished = time.perf_counter()
+    results['serving'].append(finished - start_time)
+    results['deploy'].append(finished - uploaded)
+
+
+def run_bursts(args, uec_port):
+    results = {'visible': [], 'serving': [], 'deploy': [], 'states': {}, 'errors': 0}
+
+    start_time = time.perf_counter()
+    number = 0
+    while number < args.uploads:
+        burst = [threading.Thread(target=deploy_one, args=(args, uec_port, number + offset, results))
+                 for offset in range(min(args.burst, args.uploads - number))]
+        for thread in burst:
+            thread.start()
+        for thread in burst:
+            thread.join()
+        number += len(burst)
+    elapsed = time.perf_counter() - start_time
+
+    report('upload->visible', results['visible'])
+    report('visible->completed', results['deploy'])
+    report('upload->serving', results['serving'])
+
+    uploaded = len(results['visible'])
+    print(f'{"throughput":<20} {uploaded / elapsed:.2f} uploads/s, '
+          f'{uploaded * args.size / elapsed / 1024 / 1024:.2f} MiB/s over {elapsed:.1f}s')
+    print(f'{"results":<20} {results["states"]} errors={results["errors"]}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--uploads', type=int, default=20, help='전체 업로드 수')
+    parser.add_argument('--burst', type=int, default=4, help='동시에 보내는 업로드 수')
+    parser.add_argument('--size', type=int, default=32 * 1024 * 1024, help='업로드 한 건의 크기(byte)')
+    parser.add_argument('--delay', type=float, default=0.5, help='가짜 백엔드가 포트를 열기까지의 시간(초)')
+    parser.add_argument('--fail_every', type=int, default=0, help='N번째 업로드마다 실행에 실패하는 JAR을 보냅니다. 0 이면 사용하지 않습니다.')
+    parser.add_argument('--artifact', type=str, default='bench', help='업로드할 JAR 이름')
+    parser.add_argument('--maintenance_count', type=int, default=None, help='UEC의 유지 파일 수')
+    parser.add_argument('--internal_ports', action='store_true', help='무중단 배포 모드로 측정합니다.')
+    parser.add_argument('--server', type=str, default='async', choices=['flask', 'async'], help='UEC HTTP 서버 종류')
+    parser.add_argument('--pollers', type=int, default=4, help='/tasking 조회 지연 측정에 사용할 클라이언트 수')
+    parser.add_argument('--poll_duration', type=float, default=5, help='/tasking 조회 지연 측정 시간(초). 0 이면 건너뜁니다.')
+    args = parser.parse_args()
+
+    save_dir = tempfile.mkdtemp(prefix='uec_bench_')
+    process, uec_port = start_uec(args, save_dir)
+    try:
+        run_bursts(args, uec_port)
+
+        if args.poll_duration:
+            status, body = upload('127.0.0.1', uec_port, 1024, filename=f'{args.artifact}.jar')
+            path = body['polling'] if body else '/ready'
+            report('tasking idle', measure('127.0.0.1', uec_port, path, args.pollers, args.poll_duration))
+            report('tasking busy', measure('127.0.0.1', uec_port, path, args.pollers, args.poll_duration,
+                                           args.burst, args.size, 0.0))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        _kill_backends(save_dir)
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def _kill_backends(save_dir):
+    # UEC를 종료해도 백엔드는 남아 있으므로 save_dir 의 JAR을 실행 중인 가짜 백엔드를 정리합니다.
+    for process in psutil.process_iter(['cmdline']):
+        cmdline = process.info['cmdline'] or []
+        if any(arg.startswith(save_dir) for arg in cmdline):
+            try:
+                process.kill()
+            except psutil.Error:
+                pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 벤치마크에서 `java -jar` 대신 실행되는 가짜 백엔드입니다.
+# 지정한 시간만큼 기다린 뒤 포트를 열고, 모든 GET 요청에 실행 중인 JAR 이름을 응답합니다.
+# JAR 에 FAIL_ENTRY 가 있으면 포트를 열지 않고 실패합니다.
+
+FAIL_ENTRY = 'META-INF/uec-bench-fail'
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('jar', type=str, help='실행할 JAR 경로')
+    parser.add_argument('--port', type=int, default=8080, help='열 포트')
+    parser.add_argument('--delay', type=float, default=1.0, help='포트를 열기 전 기다릴 시간(초). JVM 기동 시간을 흉내냅니다.')
+    parser.add_argument('--exit_code', type=int, default=1, help='실패할 때의 종료 코드')
+    args, unknown = parser.parse_known_args(argv)
+
+    # 무중단 배포 모드에서 UEC가 덧붙이는 Spring Boot 형식의 포트 인수입니다.
+    for arg in unknown:
+        if arg.startswith('--server.port='):
+            args.port = int(arg.split('=', 1)[1])
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    name = os.path.basename(args.jar).encode()
+
+    with zipfile.ZipFile(args.jar) as jar:
+        fail = FAIL_ENTRY in jar.namelist()
+
+    print(f'Starting {name.decode()} on port {args.port}', flush=True)
+    time.sleep(args.delay)
+    if fail:
+        print('APPLICATION FAILED TO START', file=sys.stderr, flush=True)
+        sys.exit(args.exit_code)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(name)))
+            self.end_headers()
+            self.wfile.write(name)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer(('127.0.0.1', args.port), Handler).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
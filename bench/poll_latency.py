@@ -0,0 +1,69 @@
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlparse
+
+from common import report, upload
+
+# 여러 업로드가 진행되는 동안 /ready 조회 지연 시간을 측정합니다.
+# 측정 대상 UEC는 별도의 save_dir 로 실행하십시오. 업로드된 JAR은 실제로 배포됩니다.
+
+
+def poll(host, port, path, stop, latencies):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    while not stop.is_set():
+        start_time = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            connection.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start_time)
+        time.sleep(0.005)
+    connection.close()
+
+
+def measure(host, port, path, pollers, duration, uploads=0, size=0, throttle=0.0):
+    stop = threading.Event()
+    latencies = []
+
+    poll_threads = [threading.Thread(target=poll, args=(host, port, path, stop, latencies), daemon=True)
+                    for _ in range(pollers)]
+    upload_threads = [threading.Thread(target=upload, args=(host, port, size, throttle), daemon=True)
+                      for _ in range(uploads)]
+
+    for thread in upload_threads + poll_threads:
+        thread.start()
+
+    time.sleep(duration)
+    stop.set()
+    for thread in poll_threads:
+        thread.join()
+
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', type=str, default='http://127.0.0.1:4074', help='측정할 UEC 주소')
+    parser.add_argument('--path', type=str, default='/ready', help='조회할 경로')
+    parser.add_argument('--pollers', type=int, default=4, help='동시에 조회하는 클라이언트 수')
+    parser.add_argument('--uploads', type=int, default=4, help='동시에 진행할 업로드 수')
+    parser.add_argument('--size', type=int, default=64 * 1024 * 1024, help='업로드 한 건의 크기(byte)')
+    parser.add_argument('--throttle', type=float, default=0.002, help='64KiB 전송마다 쉬는 시간(초). 느린 링크를 흉내냅니다.')
+    parser.add_argument('--duration', type=float, default=10, help='각 단계의 측정 시간(초)')
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    report('idle', measure(host, port, args.path, args.pollers, args.duration))
+    report('during uploads', measure(host, port, args.path, args.pollers, args.duration,
+                                     args.uploads, args.size, args.throttle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.version_index import VersionIndex, parse_version  # noqa: E402
+
+# save_dir 에 버전이 수천 개 쌓였을 때 버전 색인의 비용을 측정합니다.
+# 'rescan' 은 업로드마다 디렉토리 전체를 읽고 정렬하던 방식의 비용으로, 비교 기준입니다.
+
+
+def _populate(target_dir, files, artifacts):
+    for number in range(files):
+        artifact = f'app{number % artifacts}'
+        version = number // artifacts + 1
+        name = f'{artifact}.jar' if version == 1 else f'{artifact} v{version}.jar'
+        open(os.path.join(target_dir, name), 'wb').close()
+
+
+def _rescan(target_dir):
+    names = [name for name in os.listdir(target_dir) if name.endswith('.jar')]
+    return sorted(names, key=lambda name: parse_version(name)[1])
+
+
+def _timed(function, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start_time) / repeat
+
+
+def measure(files, artifacts, repeat):
+    target_dir = tempfile.mkdtemp(prefix='uec_scan_')
+    try:
+        _populate(target_dir, files, artifacts)
+        index = VersionIndex(target_dir)
+
+        scan = _timed(index.scan, repeat)
+        rescan = _timed(lambda: _rescan(target_dir), repeat)
+
+        def reserve():
+            name = index.reserve_next('app0.jar')
+            index.discard(name)
+
+        reserve_time = _timed(reserve, repeat * 100)
+        evict = _timed(lambda: index.evict(files // artifacts), repeat * 100)
+    finally:
+        shutil.rmtree(target_dir, ignore_errors=True)
+
+    print(f'files={files:<7} artifacts={artifacts:<4} '
+          f'scan={scan * 1000:9.3f}ms rescan={rescan * 1000:9.3f}ms '
+          f'reserve_next={reserve_time * 1e6:8.2f}us evict={evict * 1e6:8.2f}us')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, nargs='+', default=[100, 1000, 5000, 20000], help='save_dir 의 JAR 수')
+    parser.add_argument('--artifacts', type=int, default=4, help='JAR 이름의 종류 수')
+    parser.add_argument('--repeat', type=int, default=5, help='측정 반복 횟수')
+    args = parser.parse_args()
+
+    for files in args.files:
+        measure(files, args.artifacts, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
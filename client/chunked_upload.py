@@ -0,0 +1,137 @@
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+# 큰 JAR을 청크로 나눠 여러 연결로 동시에 업로드합니다. 연결이 끊기면 서버가 받지 못한 범위만 다시 보냅니다.
+# 세션 번호를 --resume 으로 넘기면 이전 실행에서 끊긴 업로드를 이어서 진행합니다.
+#
+#   python client/chunked_upload.py build/app.jar --host 10.0.0.5 --parallel 4
+#   python client/chunked_upload.py build/app.jar --host 10.0.0.5 --resume 5f0c3d...
+
+RETRIES = 5
+
+
+class Client:
+    def __init__(self, host, port, timeout=600):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        # 스레드마다 keep-alive 연결 하나를 재사용하고, 끊어진 연결은 다시 엽니다.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body, headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status, json.loads(data) if data else None
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _chunks(missing, chunk_size):
+    for start, end in missing:
+        for offset in range(start, end, chunk_size):
+            yield offset, min(chunk_size, end - offset)
+
+
+def _send_chunks(client, path, upload, chunks, lock, errors):
+    with open(path, 'rb') as f:
+        while True:
+            with lock:
+                item = next(chunks, None)
+            if item is None:
+                return
+
+            offset, length = item
+            f.seek(offset)
+            data = f.read(length)
+            headers = {'Content-Type': 'application/octet-stream',
+                       'X-Chunk-Sha256': hashlib.sha256(data).hexdigest()}
+            for attempt in range(RETRIES):
+                try:
+                    status, body = client.request('PUT', f'{upload}?offset={offset}', data, headers)
+                    if status == 200:
+                        break
+                except (OSError, http.client.HTTPException) as e:
+                    body = {'error': str(e)}
+                time.sleep(min(2 ** attempt, 10))
+            else:
+                errors.append((offset, body))
+
+
+def upload(host, port, path, service=None, parallel=4, chunk_size=None, resume=None):
+    client = Client(host, port)
+    size = os.path.getsize(path)
+
+    if resume is None:
+        query = '' if service is None else f'?service={quote(service)}'
+        request = {'filename': os.path.basename(path), 'size': size, 'sha256': _sha256(path)}
+        if chunk_size:
+            request['chunk_size'] = chunk_size
+        status, session = client.request('POST', f'/jar_upload/sessions{query}', json.dumps(request),
+                                         {'Content-Type': 'application/json'})
+        if status != 201:
+            return status, session
+        upload_path = session['upload']
+        print(f'session : {session["id"]}', file=sys.stderr)
+    else:
+        upload_path = f'/jar_upload/sessions/{resume}'
+        status, session = client.request('GET', upload_path)
+        if status != 200:
+            return status, session
+
+    # 서버가 받지 못한 범위만 나눠 보냅니다.
+    chunks = _chunks(session['missing'], session['chunk_size'])
+    lock = threading.Lock()
+    errors = []
+    threads = [threading.Thread(target=_send_chunks, args=(client, path, upload_path, chunks, lock, errors))
+               for _ in range(parallel)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        return None, {'error': f'{len(errors)} chunks could not be sent. Retry with --resume {session["id"]}'}
+    return client.request('POST', f'{upload_path}/finalize')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('jar', type=str, help='업로드할 JAR')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='UEC 주소')
+    parser.add_argument('--port', type=int, default=4074, help='UEC 포트')
+    parser.add_argument('--service', type=str, default=None, help='업로드할 서비스 이름')
+    parser.add_argument('--parallel', type=int, default=4, help='동시에 보낼 청크 수')
+    parser.add_argument('--chunk_size', type=int, default=None, help='청크 크기(byte). 기본값은 서버가 정합니다.')
+    parser.add_argument('--resume', type=str, default=None, help='이어서 진행할 업로드 세션 번호')
+    args = parser.parse_args()
+
+    status, body = upload(args.host, args.port, args.jar, args.service, args.parallel, args.chunk_size, args.resume)
+    print(json.dumps(body, ensure_ascii=False) if body is not None else status)
+    if status is None or status >= 400:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import http.client
+import io
+import json
+import os
+import sys
+import uuid
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.delta_jar import make_delta, rebuilt_digest  # noqa: E402
+
+# 이전에 배포한 JAR(base)과 새 JAR을 비교하여, 바뀐 엔트리만 /jar_upload/delta 로 업로드합니다.
+# 서버는 save_dir 의 같은 버전으로 전체 JAR을 다시 만들고, 아래에서 계산한 sha256 과 비교합니다.
+#
+#   python client/delta_upload.py build/app-old.jar build/app.jar --base "app v3.jar" --host 10.0.0.5
+
+
+def build_delta(base_path, new_path):
+    delta = io.BytesIO()
+    deleted = make_delta(base_path, new_path, delta)
+    digest, size = rebuilt_digest(base_path, delta, deleted)
+    return delta.getvalue(), deleted, digest, size
+
+
+def _multipart(fields, delta):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="delta"; filename="delta.zip"\r\n'
+                 f'Content-Type: application/zip\r\n\r\n'.encode())
+    parts.append(delta)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return boundary, b''.join(parts)
+
+
+def upload_delta(host, port, base_name, delta, deleted, digest, filename=None, service=None, timeout=600):
+    fields = {'base': base_name, 'sha256': digest, 'deleted': json.dumps(deleted)}
+    if filename is not None:
+        fields['filename'] = filename
+    boundary, body = _multipart(fields, delta)
+
+    path = '/jar_upload/delta' if service is None else f'/jar_upload/delta?service={quote(service)}'
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request('POST', path, body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        response = connection.getresponse()
+        data = response.read()
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, None
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base_jar', type=str, help='서버에 저장된 base 버전과 같은 내용의 로컬 JAR')
+    parser.add_argument('new_jar', type=str, help='배포할 새 JAR')
+    parser.add_argument('--base', type=str, default=None, help='서버 save_dir 에 있는 base 버전의 파일 이름. 기본값은 base_jar 의 파일 이름')
+    parser.add_argument('--filename', type=str, default=None, help='새 버전의 업로드 이름. 기본값은 base 의 JAR 이름')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='UEC 주소')
+    parser.add_argument('--port', type=int, default=4074, help='UEC 포트')
+    parser.add_argument('--service', type=str, default=None, help='업로드할 서비스 이름')
+    parser.add_argument('--dry_run', action='store_true', help='업로드하지 않고 delta 크기와 sha256 만 출력합니다.')
+    args = parser.parse_args()
+
+    delta, deleted, digest, size = build_delta(args.base_jar, args.new_jar)
+    print(f'delta : {len(delta)} bytes, deleted entries : {len(deleted)}, '
+          f'rebuilt : {size} bytes, sha256 : {digest}', file=sys.stderr)
+    if args.dry_run:
+        return
+
+    status, body = upload_delta(args.host, args.port, args.base or os.path.basename(args.base_jar), delta, deleted,
+                                digest, args.filename, args.service)
+    print(json.dumps(body, ensure_ascii=False) if body is not None else status)
+    if status >= 400:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
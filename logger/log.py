@@ -1,7 +1,36 @@
+import atexit
+import copy
+import json
 import logging
 import os
-
+import queue
+import threading
+import time
 from logging import INFO, DEBUG
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_ROTATE_INTERVAL = 24 * 60 * 60
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 로그 호출 시 extra 로 전달되면 JSON 형식에서 별도 필드로 기록됩니다.
+STRUCTURED_FIELDS = ('service', 'uuid', 'phase')
+
+_lock = threading.Lock()
+_loggers = {}
+_file_handlers = {}
+_settings = {
+    'max_bytes': DEFAULT_MAX_BYTES,
+    'backup_count': DEFAULT_BACKUP_COUNT,
+    'rotate_interval': DEFAULT_ROTATE_INTERVAL,
+    'json': False,
+}
+
+_queue = queue.SimpleQueue()
+_exception_formatter = logging.Formatter()
+_listener = None
 
 
 def create_log_dir():
@@ -9,30 +38,180 @@ def create_log_dir():
         logs_dir = os.path.abspath('C:\\uec_logs')
     else:
         logs_dir = os.path.abspath('/uec_logs')
-        
+
     if not os.path.exists(logs_dir):
         os.mkdir(logs_dir)
 
     return logs_dir
 
 
-def create_logger(log_name, log_file_name, file_level: int = DEBUG, console_level: int = INFO):
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = str(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    # 파일이 max_bytes 를 넘거나 rotate_interval 이 지나면 교체합니다.
+    # 보관 파일은 backup_count 개로 제한되어, 디스크 사용량은 (backup_count + 1) * max_bytes 를 넘지 않습니다.
+    def __init__(self, filename, max_bytes, backup_count, rotate_interval):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.rotate_interval = rotate_interval
+        self.rollover_at = time.time() + rotate_interval
+
+    def shouldRollover(self, record):
+        if self.rotate_interval and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.rotate_interval
+
+
+class _Router(logging.Handler):
+    # 기록 스레드에서 동작하며, 각 로그를 해당 로거의 파일과 콘솔로 전달합니다.
+    def __init__(self):
+        super().__init__()
+        self.console = logging.StreamHandler()
+
+    def handle(self, record):
+        file_handler = _file_handlers.get(record.uec_log_file)
+        if file_handler is not None and record.levelno >= record.uec_file_level:
+            file_handler.handle(record)
+
+        if record.uec_console_level is not None and record.levelno >= record.uec_console_level:
+            self.console.handle(record)
+
+
+class _LoggerQueueHandler(QueueHandler):
+    def __init__(self, log_file_name, file_level, console_level):
+        super().__init__(_queue)
+        self.log_file_name = log_file_name
+        self.file_level = file_level
+        self.console_level = console_level
+
+    # 기본 prepare() 는 예외 정보를 메시지 본문에 합친 뒤 지우므로, JSON 형식에서 exception 필드가 빠집니다.
+    # 메시지만 완성하고, 예외는 문자열로 바꿔 exc_text 에 남겨 두어 기록 스레드의 포매터가 사용하도록 합니다.
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.uec_log_file = self.log_file_name
+        record.uec_file_level = self.file_level
+        record.uec_console_level = self.console_level
+        return record
+
+
+def _formatter():
+    return JsonFormatter() if _settings['json'] else logging.Formatter(TEXT_FORMAT)
+
+
+def _start_listener():
+    global _listener
+    if _listener is None:
+        router = _Router()
+        router.console.setFormatter(_formatter())
+        _listener = QueueListener(_queue, router)
+        _listener.start()
+        atexit.register(_stop_listener)
+    return _listener
+
+
+# 종료 시 큐에 남은 로그를 모두 기록한 뒤 기록 스레드를 멈춥니다.
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    for handler in _file_handlers.values():
+        handler.close()
+
+
+def _file_handler(log_file_name):
+    handler = _file_handlers.get(log_file_name)
+    if handler is None:
+        handler = SizeAndTimeRotatingFileHandler(
+            os.path.join(create_log_dir(), log_file_name),
+            _settings['max_bytes'], _settings['backup_count'], _settings['rotate_interval']
+        )
+        handler.setFormatter(_formatter())
+        _file_handlers[log_file_name] = handler
+    return handler
+
+
+# 로그 파일 기록과 콘솔 출력은 하나의 기록 스레드에서 처리됩니다. 호출한 스레드는 큐에 넣고 바로 돌아갑니다.
+# 같은 이름으로 다시 호출하면 핸들러를 추가하지 않고 기존 로거를 반환합니다.
+# console_level 이 None 이면 파일에만 기록하며, set_console_level 로도 콘솔 출력이 켜지지 않습니다.
+def create_logger(log_name, log_file_name, file_level: int = DEBUG, console_level: Optional[int] = INFO):
+    with _lock:
+        log = _loggers.get(log_name)
+        if log is not None:
+            handler = log.handlers[0]
+            if handler.console_level is not None and console_level is not None:
+                handler.console_level = min(handler.console_level, console_level)
+            return log
+
+        _start_listener()
+        _file_handler(log_file_name)
+
+        log = logging.getLogger(log_name)
+        log.setLevel(logging.DEBUG)
+        log.propagate = False
+        log.addHandler(_LoggerQueueHandler(log_file_name, file_level, console_level))
+
+        _loggers[log_name] = log
+        return log
+
 
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setLevel(console_level)
+def set_console_level(level, log_names=None):
+    with _lock:
+        for name, log in _loggers.items():
+            if log.handlers[0].console_level is None:
+                continue
+            if log_names is None or name in log_names:
+                log.handlers[0].console_level = level
 
-    logs_dir = create_log_dir()
 
-    file_handler = logging.FileHandler(os.path.join(logs_dir, log_file_name))
-    file_handler.setFormatter(formatter)
-    file_handler.setLevel(file_level)
+def configure(max_bytes=None, backup_count=None, rotate_interval=None, json_format=None):
+    with _lock:
+        if max_bytes is not None:
+            _settings['max_bytes'] = max_bytes
+        if backup_count is not None:
+            _settings['backup_count'] = backup_count
+        if rotate_interval is not None:
+            _settings['rotate_interval'] = rotate_interval
+        if json_format is not None:
+            _settings['json'] = json_format
 
-    log = logging.getLogger(log_name)
-    log.setLevel(logging.DEBUG)
-    log.addHandler(file_handler)
-    log.addHandler(console_handler)
+        formatter = _formatter()
+        for handler in _file_handlers.values():
+            handler.acquire()
+            try:
+                handler.maxBytes = _settings['max_bytes']
+                handler.backupCount = _settings['backup_count']
+                handler.rotate_interval = _settings['rotate_interval']
+                handler.rollover_at = time.time() + _settings['rotate_interval']
+                handler.setFormatter(formatter)
+            finally:
+                handler.release()
 
-    return log
+        if _listener is not None:
+            for handler in _listener.handlers:
+                handler.console.setFormatter(formatter)
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import uuid
+
+from logger.log import create_logger
+
+log = create_logger('CS_Log', 'uec.log')
+
+STORE_FILE_NAME = '.uec_hashes.json'
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class ContentStore:
+    def __init__(self, target_dir):
+        self.target_dir = target_dir
+        self.path = os.path.join(target_dir, STORE_FILE_NAME)
+
+        self._lock = threading.Lock()
+        # sha256 -> {'name': 파일 이름, 'uuid': 해당 버전을 등록한 작업 번호}
+        self._by_digest = {}
+        self._by_name = {}
+        # 감시자 스레드에서 지운 항목은 별도 스레드가 모아서 저장합니다.
+        self._dirty = threading.Condition(self._lock)
+        self._unsaved = False
+        self._saver = None
+        # 파일 쓰기는 _save_lock 으로 한 번에 하나씩 진행하며, 이미 저장된 것보다 오래된 상태는 쓰지 않습니다.
+        self._save_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            entries = {}
+        except (OSError, ValueError) as e:
+            log.warning(f'The hash map could not be read, so it will be rebuilt. : {e}')
+            entries = {}
+
+        with self._lock:
+            for digest, entry in entries.items():
+                # 이미 삭제된 버전은 불러오지 않습니다.
+                if os.path.isfile(os.path.join(self.target_dir, entry['name'])):
+                    self._by_digest[digest] = entry
+                    self._by_name[entry['name']] = digest
+
+        log.debug(f'The hash map has been loaded. entries : {len(self._by_digest)}')
+        return self
+
+    def __snapshot(self):
+        # _lock 을 잡은 상태에서 호출합니다.
+        self._unsaved = False
+        self._generation += 1
+        return json.dumps(self._by_digest), self._generation
+
+    def __write(self, data, generation):
+        with self._save_lock:
+            if generation <= self._saved_generation:
+                return
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._saved_generation = generation
+
+    def __save(self):
+        self.__write(*self.__snapshot())
+
+    def lookup(self, digest):
+        with self._lock:
+            entry = self._by_digest.get(digest)
+
+        if entry is None:
+            return None, None
+
+        return entry['name'], uuid.UUID(entry['uuid'])
+
+    def record(self, digest, name, task_uuid):
+        with self._lock:
+            previous = self._by_digest.get(digest)
+            if previous is not None:
+                self._by_name.pop(previous['name'], None)
+
+            self._by_digest[digest] = {'name': name, 'uuid': str(task_uuid)}
+            self._by_name[name] = digest
+            self.__save()
+
+    def digest_of(self, name):
+        with self._lock:
+            return self._by_name.get(os.path.basename(name))
+
+    # wait 가 False 이면 조회 결과에서는 바로 제외하고, 파일 저장은 기다리지 않고 별도 스레드에 맡깁니다.
+    # 저장되기 전에 종료되어도 삭제된 파일의 항목은 다음 load() 에서 불러오지 않습니다.
+    def discard(self, name, wait=True):
+        name = os.path.basename(name)
+        with self._lock:
+            digest = self._by_name.pop(name, None)
+            if digest is None:
+                return False
+
+            del self._by_digest[digest]
+            if wait:
+                self.__save()
+            else:
+                self.__save_later()
+            return True
+
+    def __save_later(self):
+        self._unsaved = True
+        if self._saver is None:
+            self._saver = threading.Thread(target=self.__save_loop, daemon=True, name='UEC Hash Map')
+            self._saver.start()
+        self._dirty.notify()
+
+    def __save_loop(self):
+        while True:
+            with self._dirty:
+                self._dirty.wait_for(lambda: self._unsaved)
+                snapshot = self.__snapshot()
+            try:
+                self.__write(*snapshot)
+            except OSError as e:
+                log.error(f'The hash map could not be saved. : {e}')
+
+    # 여러 파일을 지운 뒤 해시 맵을 한 번만 저장합니다.
+    def discard_many(self, names):
+        with self._lock:
+            discarded = 0
+            for name in names:
+                digest = self._by_name.pop(os.path.basename(name), None)
+                if digest is not None:
+                    del self._by_digest[digest]
+                    discarded += 1
+            if discarded:
+                self.__save()
+            return discarded
+
+
+def get_content_store(target_dir):
+    key = os.path.abspath(target_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ContentStore(key).load()
+            _stores[key] = store
+        return store
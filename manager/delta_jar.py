@@ -0,0 +1,133 @@
+import copy
+import hashlib
+import struct
+import zipfile
+
+COPY_SIZE = 1024 * 1024
+
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+_ZIP64_EXTRA_ID = 0x0001
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def _strip_zip64(extra):
+    # 크기에 맞는 zip64 확장 필드는 헤더를 다시 만들 때 새로 붙으므로 기존 것은 제거합니다.
+    fields = []
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack('<HH', extra[offset:offset + 4])
+        if header_id != _ZIP64_EXTRA_ID:
+            fields.append(extra[offset:offset + 4 + size])
+        offset += 4 + size
+    return b''.join(fields)
+
+
+def _copy_entry(source, info, target: zipfile.ZipFile):
+    # 압축을 풀지 않고, 원본의 압축된 데이터를 그대로 target 에 옮깁니다.
+    if info.flag_bits & _FLAG_ENCRYPTED:
+        raise DeltaError(f'Encrypted entries are not supported. : {info.filename}')
+
+    source.seek(info.header_offset)
+    header = source.read(_LOCAL_HEADER_SIZE)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise DeltaError(f'The local header is broken. : {info.filename}')
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    source.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+    # CRC 와 크기는 중앙 디렉토리에서 알고 있으므로 data descriptor 없이 로컬 헤더에 기록합니다.
+    entry = copy.copy(info)
+    entry.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+    entry.extra = _strip_zip64(info.extra)
+    entry.header_offset = target.fp.tell()
+    target.fp.write(entry.FileHeader())
+
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.read(min(COPY_SIZE, remaining))
+        if not chunk:
+            raise DeltaError(f'The entry data is truncated. : {info.filename}')
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+
+    target.filelist.append(entry)
+    target.NameToInfo[entry.filename] = entry
+    target.start_dir = target.fp.tell()
+
+
+def apply_delta(base_path, delta_file, deleted, out):
+    # base 의 엔트리를 순서대로 옮기면서, 삭제된 엔트리는 건너뛰고 변경된 엔트리는 delta 의 것으로 바꿉니다.
+    # 새로 추가된 엔트리는 마지막에 붙입니다. 결과는 같은 입력에 대해 항상 같은 바이트입니다.
+    deleted = set(deleted)
+    counts = {'copied': 0, 'replaced': 0, 'added': 0, 'deleted': 0}
+
+    try:
+        with open(base_path, 'rb') as base_fp, zipfile.ZipFile(base_fp) as base, \
+                zipfile.ZipFile(delta_file) as delta, zipfile.ZipFile(out, 'w') as target:
+            changes = {info.filename: info for info in delta.infolist()}
+
+            for info in base.infolist():
+                if info.filename in deleted:
+                    counts['deleted'] += 1
+                    continue
+                replacement = changes.pop(info.filename, None)
+                if replacement is None:
+                    _copy_entry(base_fp, info, target)
+                    counts['copied'] += 1
+                else:
+                    _copy_entry(delta_file, replacement, target)
+                    counts['replaced'] += 1
+
+            for info in changes.values():
+                _copy_entry(delta_file, info, target)
+                counts['added'] += 1
+
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError) as e:
+        raise DeltaError(f'The JAR could not be rebuilt. : {e}') from e
+
+    return counts
+
+
+def make_delta(base_path, new_path, out):
+    # new 에서 추가되었거나 내용(CRC, 크기)이 바뀐 엔트리를 out 에 담고, 삭제된 엔트리 이름을 반환합니다.
+    with zipfile.ZipFile(base_path) as base, open(new_path, 'rb') as new_fp, zipfile.ZipFile(new_fp) as new, \
+            zipfile.ZipFile(out, 'w') as delta:
+        before = {info.filename: (info.CRC, info.file_size) for info in base.infolist()}
+        names = set()
+
+        for info in new.infolist():
+            names.add(info.filename)
+            if before.get(info.filename) != (info.CRC, info.file_size):
+                _copy_entry(new_fp, info, delta)
+
+    return [name for name in before if name not in names]
+
+
+class _HashingSink:
+    # 결과를 저장하지 않고 해시만 계산합니다.
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        pass
+
+
+def rebuilt_digest(base_path, delta_file, deleted):
+    # 서버가 다시 만들 JAR 의 sha256 입니다. 클라이언트가 업로드 전에 계산하여 함께 보냅니다.
+    sink = _HashingSink()
+    apply_delta(base_path, delta_file, deleted, sink)
+    return sink.digest.hexdigest(), sink.size
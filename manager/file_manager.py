@@ -8,86 +8,248 @@ from os.path import join as opj
 from werkzeug.datastructures import FileStorage
 
 from logger.log import create_logger
+from manager.content_store import get_content_store
+from manager.delta_jar import DeltaError, apply_delta
+from manager.version_index import get_index, parse_version
 
 log = create_logger('FM_Log', 'uec.log')
 
+CHUNK_SIZE = 1024 * 1024
+TEMP_SUFFIX = '.part'
+# 업로드 임시 파일과 업로드 세션 파일의 이름입니다. (.uuid4 hex.part)
+_TEMP_NAME = re.compile(rf'\.[0-9a-f]{{32}}{re.escape(TEMP_SUFFIX)}')
 
-def version_sort(string):
-    match = re.search(r'v(\d+)', string)
-    return int(match.group(1)) if match else float('-inf')
 
+def __gen_random_uuid():
+    timestamp = str(int(time.time()))
+    random_hase = hashlib.sha224(os.urandom(4)).hexdigest()
+    name = f"{timestamp}{random_hase}"
+    return uuid.uuid5(uuid.NAMESPACE_DNS, name)
 
-def __version_manager(save_dir, file: FileStorage):
-    save_path = opj(save_dir, file.filename)
-    true_name = file.filename[:file.filename.rfind('.')]
 
-    file_list = os.listdir(save_dir)
-    last_same_files = list(filter(lambda x: true_name in x, file_list))
-    last_same_files.sort(key=version_sort, reverse=True)
+def _temp_path(save_dir):
+    # 감시 대상 확장자(.jar)가 아닌 숨김 파일로 기록하여, 작성 중인 파일이 감지되지 않도록 합니다.
+    return opj(save_dir, f'.{uuid.uuid4().hex}{TEMP_SUFFIX}')
 
-    if last_same_files:
-        log.debug('An existing file exists. Change the file name.')
-        log.debug('The most recent version of the file was found. Change to the corresponding version or higher.')
 
-        last_same_file = last_same_files[0]
+def remove_stale_temp_files(save_dir):
+    # 이전 실행에서 게시되지 못하고 남은 임시 파일을 지웁니다.
+    # 업로드 세션은 메모리에만 보관되어 재시작 후에는 이어받을 수 없으므로, 세션의 임시 파일도 함께 지웁니다.
+    removed = []
+    try:
+        with os.scandir(save_dir) as entries:
+            for entry in entries:
+                if _TEMP_NAME.fullmatch(entry.name) and entry.is_file(follow_symlinks=False):
+                    _remove_quietly(entry.path)
+                    removed.append(entry.name)
+    except FileNotFoundError:
+        return removed
 
-        if match := re.search(r'v(\d+)', last_same_file):
+    if removed:
+        log.info(f'Stale upload files have been removed. count : {len(removed)}, dir : {save_dir}')
+    return removed
 
-            next_number = int(match[1]) + 1
-            new_name = true_name + f' v{next_number}' + '.' + file.filename.split('.')[-1]
 
-        else:
-            new_name = true_name + ' v2' + '.' + file.filename.split('.')[-1]
+class UploadFile:
+    # multipart 파싱 중 파일 본문을 save_dir 의 임시 파일에 바로 기록하며 해시를 계산합니다.
+    # werkzeug 의 stream_factory 로 사용되어, 업로드를 별도의 임시 파일에 한 번 더 복사하지 않습니다.
+    def __init__(self, save_dir):
+        self.path = _temp_path(save_dir)
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = open(self.path, 'w+b')
 
-        log.info(f'The version change has been completed. new version name : {new_name}')
-        return opj(save_dir, new_name)
-    else:
-        return save_path
+    def write(self, data):
+        self._digest.update(data)
+        self.size += len(data)
+        return self._file.write(data)
 
+    def finish(self):
+        # 디스크 반영(fsync)은 중복 확인 뒤 실제로 게시할 때 publish_file 에서 합니다.
+        self._file.close()
+        return self._digest.hexdigest(), self.size
+
+    def close(self):
+        # 게시되지 않은 임시 파일은 요청이 끝날 때 삭제합니다.
+        self._file.close()
+        _remove_quietly(self.path)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def _stream_to_temp(stream, temp_path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(temp_path, 'wb') as out:
+        while chunk := stream.read(chunk_size):
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+
+    return digest.hexdigest(), size
 
-def __gen_random_uuid():
-    timestamp = str(int(time.time()))
-    random_hase = hashlib.sha224(os.urandom(4)).hexdigest()
-    name = f"{timestamp}{random_hase}"
-    return uuid.uuid5(uuid.NAMESPACE_DNS, name)
 
+def _fsync_file(path):
+    with open(path, 'r+b') as f:
+        os.fsync(f.fileno())
 
-def file_manager(save_dir, jar: FileStorage):
-    save_path = __version_manager(save_dir, jar)
+
+def _fsync_dir(path):
+    if os.name == 'nt':
+        return
+
+    fd = os.open(path, os.O_RDONLY)
     try:
-        jar.save(str(save_path))
-        return __gen_random_uuid(), True
-    except Exception as e:
-        log.error(f'An error occurred while saving the file. : {e}')
-        return None, False
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def publish_file(save_dir, temp_path, filename, digest, on_publish=None):
+    task_uuid = __gen_random_uuid()
+
+    # 색인에서 버전 이름을 선점하므로, 동시 업로드가 같은 버전 이름을 받지 않습니다.
+    index = get_index(save_dir)
+    new_name = index.reserve_next(filename)
+    if new_name != filename:
+        log.info(f'The version change has been completed. new version name : {new_name}')
+    save_path = opj(save_dir, new_name)
 
-def matching_files(target_dir, extension, ignores=None):
-    files = sorted(os.listdir(target_dir), key=version_sort, reverse=True)
-    match_files = []
+    abort = published = None
+    try:
+        # 감시자가 rename 이벤트를 받기 전에 작업 번호를 등록해야 합니다.
+        # on_publish 는 (게시에 실패했을 때 등록을 되돌릴 함수, 게시에 성공했을 때 호출할 함수) 를 반환합니다.
+        if on_publish is not None:
+            abort, published = on_publish(task_uuid, save_path)
+
+        # 내용이 같은 버전이 있어 버려지는 업로드는 디스크에 반영하지 않도록, 게시하기로 정해진 뒤에 fsync 합니다.
+        _fsync_file(temp_path)
+        os.replace(temp_path, save_path)
+    except Exception:
+        index.discard(new_name)
+        if abort is not None:
+            abort()
+        raise
+    _fsync_dir(save_dir)
+
+    get_content_store(save_dir).record(digest, new_name, task_uuid)
+    if published is not None:
+        published()
+
+    log.info(f'The file has been published. path : {save_path}')
+    return task_uuid
+
+
+def file_manager(save_dir, jar: FileStorage, on_publish=None, dedup=True, on_duplicate=None):
+    if isinstance(jar.stream, UploadFile):
+        temp_path = jar.stream.path
+    else:
+        temp_path = _temp_path(save_dir)
 
-    for file in files:
-        is_file = os.path.isfile(os.path.join(target_dir, file))
-        is_eq_extension = file.endswith(extension)
-        is_ignore = (ignores is not None) and file in ignores
+    try:
+        if isinstance(jar.stream, UploadFile):
+            digest, size = jar.stream.finish()
+        else:
+            digest, size = _stream_to_temp(jar.stream, temp_path)
+        log.debug(f'The upload has been written to a temporary file. size : {size}, sha256 : {digest}')
 
-        if is_file and is_eq_extension and not is_ignore:
-            match_files.append(file)
+        return publish_upload(save_dir, temp_path, jar.filename, digest, on_publish, dedup, on_duplicate)
+    except Exception as e:
+        log.error(f'An error occurred while saving the file. : {e}')
+        _remove_quietly(temp_path)
+        return None, False, False
+
+
+def publish_upload(save_dir, temp_path, filename, digest, on_publish=None, dedup=True, on_duplicate=None):
+    # 내용이 같은 버전이 이미 있으면 임시 파일을 지우고 저장된 파일을 사용합니다.
+    # on_duplicate(저장된 경로, sha256) 가 주어지면 그 결과를 반환하며, 저장된 파일로 배포할지 여기서 정합니다.
+    # (작업 번호, 성공 여부, 중복 여부)
+    if dedup:
+        store = get_content_store(save_dir)
+        name, existing_uuid = store.lookup(digest)
+        if name is not None and not os.path.isfile(opj(save_dir, name)):
+            # 감시자가 삭제를 반영하기 전이면, 새 파일로 게시합니다.
+            store.discard(name)
+            name = None
+
+        if name is not None:
+            log.info(f'The same content has already been saved as {name}. The uploaded copy is discarded.')
+            _remove_quietly(temp_path)
+            if on_duplicate is not None:
+                return on_duplicate(opj(save_dir, name), digest)
+            return existing_uuid, True, True
+
+    return publish_file(save_dir, temp_path, filename, digest, on_publish), True, False
+
+
+def replica_file_manager(save_dir, filename, digest, on_publish=None, dedup=True, on_duplicate=None):
+    # 다른 UEC 가 파일을 보내기 전에 sha256 만 보내 확인합니다. 같은 내용이 저장되어 있으면 전송받지 않고 그 파일로 배포합니다.
+    # 저장된 내용이 없으면 None 을 반환합니다.
+    digest = digest.lower()
+    name, existing_uuid = get_content_store(save_dir).lookup(digest)
+    if name is None or not os.path.isfile(opj(save_dir, name)):
+        return None
+
+    if dedup:
+        # 일반 업로드와 같이, 실행될 버전과 같을 때만 건너뛰고 아니면 저장된 파일을 다시 배포합니다.
+        if on_duplicate is not None:
+            return on_duplicate(opj(save_dir, name), digest)
+        log.info(f'The same content has already been saved as {name}. The replica is skipped.')
+        return existing_uuid, True, True
+
+    temp_path = _temp_path(save_dir)
+    try:
+        with open(opj(save_dir, name), 'rb') as source:
+            copied, _ = _stream_to_temp(source, temp_path)
+        if copied != digest:
+            # 기록된 뒤 같은 이름으로 덮어쓴 파일입니다. 파일을 전송받도록 합니다.
+            _remove_quietly(temp_path)
+            return None
+        return publish_file(save_dir, temp_path, filename, digest, on_publish), True, False
+    except FileNotFoundError:
+        _remove_quietly(temp_path)
+        return None
+    except Exception as e:
+        log.error(f'An error occurred while copying the stored file. : {e}')
+        _remove_quietly(temp_path)
+        return None, False, False
 
-    return sorted(match_files, key=version_sort)
 
+def delta_file_manager(save_dir, base_name, delta: FileStorage, deleted, expected_digest, filename=None,
+                       on_publish=None, dedup=True, on_duplicate=None):
+    # 저장된 base 버전과 변경된 엔트리로 전체 JAR 을 다시 만들어 일반 업로드와 같이 게시합니다.
+    # base 를 찾을 수 없거나 결과가 expected_digest 와 다르면 DeltaError 가 발생합니다.
+    base_name = os.path.basename(base_name)
+    base_path = opj(save_dir, base_name)
+    if not base_name.endswith('.jar') or not os.path.isfile(base_path):
+        raise FileNotFoundError(f'The base version does not exist. : {base_name}')
 
-def old_file_remove(target_dir, extension, maintenance_count, ignores=None):
-    matches = matching_files(target_dir, extension, ignores)
-    if len(matches) > maintenance_count:
-        matches.sort(key=version_sort)
+    if filename is None:
+        filename = f'{parse_version(base_name)[0]}.jar'
 
-        remove_list = matches[:len(matches) - maintenance_count]
+    out = UploadFile(save_dir)
+    try:
+        counts = apply_delta(base_path, delta.stream, deleted, out)
+        digest, size = out.finish()
+        log.debug(f'The JAR has been rebuilt from {base_name}. size : {size}, sha256 : {digest}, {counts}')
 
-        for path in remove_list:
-            try:
-                os.remove(os.path.join(target_dir, path))
-            except PermissionError:
-                pass
+        if digest != expected_digest.lower():
+            raise DeltaError(f'The rebuilt JAR does not match the expected sha256. rebuilt : {digest}')
 
-        log.info(f'The following files were deleted: {remove_list}')
+        return publish_upload(save_dir, out.path, filename, digest, on_publish, dedup, on_duplicate)
+    except DeltaError:
+        out.close()
+        raise
+    except Exception as e:
+        log.error(f'An error occurred while rebuilding the file. : {e}')
+        out.close()
+        return None, False, False
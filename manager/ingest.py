@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+
+from logger.log import create_logger
+
+ob_log = create_logger('Observer_Log', 'runner_manager.log')
+
+# 닫힘(close-write)이나 rename 으로 완성된 파일은, 이 시간 동안 다른 이벤트가 없으면 처리합니다.
+CLOSE_DEBOUNCE = 0.2
+# 닫힘 이벤트를 받지 못한 파일(close-write 를 지원하지 않는 플랫폼, 하드 링크 등)은
+# 이 시간 간격으로 두 번 확인한 크기와 수정 시각이 같아야 완성된 것으로 봅니다.
+DEFAULT_QUIET = 2.0
+
+# rsync(.name.XXXXXX), UEC 업로드(.id.part), 편집기와 다운로드 도구가 사용하는 임시 파일 이름입니다.
+_TEMP_PREFIXES = ('.', '~')
+_TEMP_SUFFIXES = ('.part', '.partial', '.tmp', '.temp', '.crdownload', '.filepart', '.swp', '~')
+
+
+def is_temp_name(path):
+    name = os.path.basename(path)
+    return name.startswith(_TEMP_PREFIXES) or name.lower().endswith(_TEMP_SUFFIXES)
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _Entry:
+    __slots__ = ('closed', 'deadline', 'stat')
+
+    def __init__(self):
+        self.closed = False
+        self.deadline = 0.0
+        self.stat = None
+
+
+class DirectoryIngest:
+    # 감시자 스레드는 경로와 마감 시각만 기록하고, 파일이 완성되었는지 확인하는 일은 별도 스레드에서 진행합니다.
+    # 같은 파일의 이벤트가 이어지면 마감 시각만 뒤로 밀리므로, 한 번의 복사는 한 번만 처리됩니다.
+    def __init__(self, on_ready, on_dropped, quiet=DEFAULT_QUIET, name='default'):
+        # on_ready(path) 는 파일이 완성되었을 때, on_dropped(path) 는 완성되기 전에 사라졌을 때 호출됩니다.
+        self._on_ready = on_ready
+        self._on_dropped = on_dropped
+        self.quiet = quiet
+        self.name = name
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        self._thread = threading.Thread(target=self.__loop, daemon=True)
+        self._thread.setName(f'UEC Ingest ({self.name})')
+        self._thread.start()
+        return self
+
+    def touch(self, path):
+        # 생성, 수정처럼 기록이 이어지고 있을 수 있는 이벤트입니다.
+        self.__schedule(path, False)
+
+    def closed(self, path):
+        # close-write, rename 처럼 기록이 끝났음을 알리는 이벤트입니다.
+        self.__schedule(path, True)
+
+    def discard(self, path):
+        with self._lock:
+            return self._entries.pop(path, None) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __schedule(self, path, closed):
+        with self._lock:
+            entry = self._entries.get(path)
+            created = entry is None
+            if created:
+                entry = self._entries[path] = _Entry()
+
+            # 닫힌 뒤에 다시 수정되면 기록이 다시 시작된 것입니다.
+            entry.closed = closed
+            entry.deadline = time.monotonic() + (CLOSE_DEBOUNCE if closed else self.quiet)
+            # 마감 시각이 뒤로 밀리기만 하는 수정 이벤트로는 스레드를 깨우지 않습니다.
+            if created or closed:
+                self._changed.notify()
+
+    def __take_due(self):
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                due = [(path, entry) for path, entry in self._entries.items() if entry.deadline <= now]
+                if due:
+                    for path, _ in due:
+                        del self._entries[path]
+                    return due
+
+                deadline = min((entry.deadline for entry in self._entries.values()), default=None)
+                self._changed.wait(None if deadline is None else deadline - now)
+
+    def __loop(self):
+        while True:
+            for path, entry in self.__take_due():
+                try:
+                    self.__check(path, entry)
+                except Exception:
+                    ob_log.exception(f'The detected file could not be ingested. : {path}')
+
+    def __check(self, path, entry):
+        try:
+            stat = _stat_key(path)
+        except FileNotFoundError:
+            self._on_dropped(path)
+            return
+
+        if entry.closed or stat == entry.stat:
+            self._on_ready(path)
+            return
+
+        # 닫힘 이벤트 없이 조용해진 파일은 한 번 더 기다려 크기와 수정 시각이 그대로인지 확인합니다.
+        with self._lock:
+            if path not in self._entries:
+                entry.stat = stat
+                entry.deadline = time.monotonic() + self.quiet
+                self._entries[path] = entry
@@ -0,0 +1,113 @@
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from logger.log import create_logger
+
+log = create_logger('JV_Log', 'runner_manager.log')
+
+MANIFEST_PATH = 'META-INF/MANIFEST.MF'
+MAIN_ATTRIBUTES = ('Main-Class', 'Start-Class')
+READ_SIZE = 1024 * 1024
+CRC_WORKERS = min(8, os.cpu_count() or 1)
+
+# 압축 해제는 GIL 을 놓으므로 엔트리 CRC 검사를 여러 스레드에 나눠 진행합니다.
+_crc_pool = ThreadPoolExecutor(max_workers=CRC_WORKERS, thread_name_prefix='UEC CRC')
+
+
+class InvalidJarError(Exception):
+    pass
+
+
+def _manifest_attributes(text):
+    # 첫 빈 줄 전까지가 main 속성입니다. 72바이트를 넘는 값은 공백으로 시작하는 줄로 이어집니다.
+    attributes = {}
+    name = None
+    for line in text.splitlines():
+        if not line:
+            break
+        if line.startswith(' ') and name is not None:
+            attributes[name] += line[1:]
+            continue
+        name, _, value = line.partition(':')
+        attributes[name.strip()] = value.strip()
+    return attributes
+
+
+def _check_crc(path, names):
+    with zipfile.ZipFile(path) as jar:
+        for name in names:
+            # 끝까지 읽으면 zipfile 이 CRC 를 비교하고, 다르면 BadZipFile 을 발생시킵니다.
+            with jar.open(name) as entry:
+                while entry.read(READ_SIZE):
+                    pass
+
+
+def validate_jar(path):
+    try:
+        with zipfile.ZipFile(path) as jar:
+            infos = [info for info in jar.infolist() if not info.is_dir()]
+            names = {info.filename for info in infos}
+            if MANIFEST_PATH not in names:
+                raise InvalidJarError(f'{MANIFEST_PATH} does not exist.')
+
+            attributes = _manifest_attributes(jar.read(MANIFEST_PATH).decode('utf-8', errors='replace'))
+            if not any(attributes.get(key) for key in MAIN_ATTRIBUTES):
+                raise InvalidJarError(f'{MANIFEST_PATH} has neither {" nor ".join(MAIN_ATTRIBUTES)}.')
+
+        # 크기가 비슷하도록 엔트리를 나눠, 각 작업이 자신의 ZipFile 로 읽습니다.
+        slices = [[] for _ in range(CRC_WORKERS)]
+        for number, info in enumerate(sorted(infos, key=lambda info: info.compress_size, reverse=True)):
+            slices[number % CRC_WORKERS].append(info.filename)
+        for future in [_crc_pool.submit(_check_crc, path, names) for names in slices if names]:
+            future.result()
+
+    except InvalidJarError as e:
+        return False, str(e)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError, NotImplementedError) as e:
+        return False, f'The JAR file is corrupt. : {e}'
+    except OSError as e:
+        return False, f'The JAR file could not be read. : {e}'
+
+    return True, None
+
+
+class JarValidator:
+    # 업로드가 감지되는 즉시 검증을 시작하고, 배포 차례가 되면 그 결과를 사용합니다.
+    # 앞선 작업이 배포 중이어도 다음 JAR 의 검증은 미리 진행됩니다.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='UEC Validator')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, path):
+        if not self.enabled:
+            return
+        with self._lock:
+            if path not in self._futures:
+                self._futures[path] = self._executor.submit(validate_jar, path)
+
+    def discard(self, path):
+        with self._lock:
+            future = self._futures.pop(path, None)
+        if future is not None:
+            future.cancel()
+
+    def result(self, path):
+        if not self.enabled:
+            return True, None
+
+        self.submit(path)
+        with self._lock:
+            future = self._futures[path]
+        try:
+            ok, message = future.result()
+        finally:
+            with self._lock:
+                self._futures.pop(path, None)
+
+        if not ok:
+            log.warning(f'The JAR failed validation. {message} path : {path}')
+        return ok, message
@@ -0,0 +1,190 @@
+import bisect
+import math
+import threading
+
+# Prometheus 텍스트 형식(0.0.4)으로 내보내는 프로세스 내부 지표입니다. 외부 의존성은 사용하지 않습니다.
+# 값 갱신은 라벨별 객체의 짧은 잠금 하나로 끝나므로, 업로드와 배포 경로에서 바로 호출해도 됩니다.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(2 ** power for power in range(16, 32, 2))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+        with _registry_lock:
+            _registry.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}, got {values}')
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        # 라벨 조합마다 하나의 값을 가집니다. 값의 형태가 다른 지표(Histogram)는 재정의합니다.
+        return _Value()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child):
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}']
+
+
+class _Value:
+    __slots__ = ('_value', '_lock', '_function')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+        self._function = None
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        self._value = value
+
+    def set_function(self, function):
+        # 조회 시점에 값을 계산합니다. 대기열 길이처럼 이미 관리되는 값을 따로 갱신하지 않아도 됩니다.
+        self._function = function
+
+    def get(self):
+        return self._function() if self._function is not None else self._value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+
+class _Buckets:
+    __slots__ = ('_bounds', '_counts', '_sum', '_lock')
+
+    def __init__(self, bounds):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def _render_child(self, values, child):
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, ('le', _format_value(float(bound))))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry)
+
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+UPLOADS = Counter('uec_uploads_total', 'Uploaded JAR files by result.', ('service', 'result'))
+UPLOAD_BYTES = Histogram('uec_upload_bytes', 'Size of uploaded JAR files.', ('service',), BYTES_BUCKETS)
+UPLOAD_DURATION = Histogram('uec_upload_duration_seconds', 'Time from request start to the published file.',
+                            ('service',))
+DETECT_LATENCY = Histogram('uec_detect_latency_seconds', 'Time from saving a JAR to its detection by the observer.',
+                           ('service',))
+
+QUEUE_DEPTH = Gauge('uec_queue_depth', 'Tasks that are queued or deploying.', ('service',))
+TASK_WAIT = Histogram('uec_task_wait_seconds', 'Time a task waited in the queue before its deploy started.',
+                      ('service',))
+
+TERMINATE_DURATION = Histogram('uec_terminate_duration_seconds', 'Time to shut down the previous server.', ('service',))
+LAUNCH_DURATION = Histogram('uec_launch_duration_seconds', 'Time to spawn the backend process.', ('service',))
+READY_DURATION = Histogram('uec_ready_duration_seconds', 'Time from launch until the backend was ready.', ('service',))
+
+DEPLOYS = Counter('uec_deploys_total', 'Finished deploys by result.', ('service', 'result'))
+DEPLOY_FAILURES = Counter('uec_deploy_failures_total', 'Failed deploys by reason.', ('service', 'reason'))
+BACKEND_RESTARTS = Counter('uec_backend_restarts_total', 'Restarts of crashed backends by action.',
+                           ('service', 'action'))
+ROLLBACKS = Counter('uec_rollbacks_total', 'Rollbacks to the previous JAR by result.', ('service', 'result'))
+
+RETENTION_DELETIONS = Counter('uec_retention_deleted_files_total', 'Old versions deleted by retention.', ('service',))
+RETENTION_FREED_BYTES = Counter('uec_retention_freed_bytes_total', 'Bytes freed by deleting old versions.',
+                                ('service',))
+
+REPLICATIONS = Counter('uec_replications_total', 'Uploads replicated to peer nodes by transfer.',
+                       ('service', 'transfer'))
+REPLICATION_BYTES = Counter('uec_replication_bytes_total', 'Bytes of JAR files sent to peer nodes.', ('service',))
+REPLICATION_DURATION = Histogram('uec_replication_duration_seconds', 'Time to replicate an upload to one peer.',
+                                 ('service',))
@@ -0,0 +1,103 @@
+import re
+import threading
+from collections import OrderedDict, deque
+
+from logger.log import create_logger
+
+# 백엔드 출력은 양이 많으므로 콘솔에는 내보내지 않고 backend.log 에만 기록합니다.
+log = create_logger('BE_Log', 'backend.log', console_level=None)
+
+DEFAULT_BUFFER_BYTES = 256 * 1024
+MAX_LINE_BYTES = 8 * 1024
+# 출력을 보관할 최근 배포 수입니다.
+KEEP_DEPLOYS = 32
+
+# 백엔드 출력에 나타나는 문구 -> 실행 실패 원인
+_FAILURE_PATTERNS = (
+    (re.compile(r'Address already in use|Port \d+ was already in use'), 'port_in_use'),
+    (re.compile(r'OutOfMemoryError'), 'out_of_memory'),
+    (re.compile(r'UnsupportedClassVersionError'), 'unsupported_java_version'),
+    (re.compile(r'Invalid or corrupt jarfile|no main manifest attribute|Could not find or load main class|'
+                r'Unable to access jarfile'), 'invalid_jar'),
+    (re.compile(r'APPLICATION FAILED TO START'), 'application_failed'),
+)
+
+
+class OutputBuffer:
+    # 백엔드 출력의 마지막 max_bytes 만큼을 줄 단위로 보관합니다.
+    def __init__(self, max_bytes=DEFAULT_BUFFER_BYTES):
+        self.max_bytes = max_bytes
+        self._lines = deque()
+        self._size = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self.closed = threading.Event()
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append(line)
+            self._size += len(line)
+            while self._size > self.max_bytes and len(self._lines) > 1:
+                self._size -= len(self._lines.popleft())
+                self._dropped += 1
+
+    def tail(self, count=None):
+        with self._lock:
+            lines = list(self._lines)
+        return lines if count is None else lines[-count:] if count > 0 else []
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+
+def classify(buffer, exited):
+    # 출력에서 알려진 실패 원인을 찾고, 없으면 프로세스 종료 여부로 구분합니다.
+    if buffer is not None:
+        for line in reversed(buffer.tail()):
+            for pattern, reason in _FAILURE_PATTERNS:
+                if pattern.search(line):
+                    return reason
+    return 'exited' if exited else 'not_ready'
+
+
+def _drain(stream, buffer, service, uuid, spill):
+    extra = {'service': service, 'uuid': uuid}
+    try:
+        for raw in iter(lambda: stream.readline(MAX_LINE_BYTES), b''):
+            line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+            buffer.append(line)
+            if spill:
+                log.info(line, extra=extra)
+    except (OSError, ValueError):
+        pass
+    finally:
+        stream.close()
+        buffer.closed.set()
+
+
+def capture(process, buffer, service=None, uuid=None, spill=False):
+    # 파이프가 가득 차 백엔드가 멈추지 않도록, 프로세스가 끝날 때까지 별도 스레드에서 계속 읽습니다.
+    thread = threading.Thread(target=_drain, args=(process.stdout, buffer, service, uuid, spill), daemon=True)
+    thread.setName(f'UEC Output ({process.pid})')
+    thread.start()
+    return thread
+
+
+class OutputStore:
+    # 작업 번호 -> 해당 배포에서 실행한 백엔드의 출력
+    def __init__(self, keep=KEEP_DEPLOYS):
+        self.keep = keep
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, uuid, buffer):
+        with self._lock:
+            self._buffers[uuid] = buffer
+            self._buffers.move_to_end(uuid)
+            while len(self._buffers) > self.keep:
+                self._buffers.popitem(last=False)
+
+    def get(self, uuid):
+        with self._lock:
+            return self._buffers.get(uuid)
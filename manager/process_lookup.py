@@ -0,0 +1,92 @@
+import os
+import time
+
+import psutil
+
+from logger.log import create_logger
+
+log = create_logger('PL_Log', 'runner_manager.log')
+
+_PROC_NET_TABLES = ('/proc/net/tcp', '/proc/net/tcp6')
+_TCP_LISTEN = '0A'
+
+
+def _listening_inodes(port):
+    inodes = set()
+    for table in _PROC_NET_TABLES:
+        try:
+            with open(table, 'r') as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    local_address, state, inode = fields[1], fields[3], fields[9]
+                    if state == _TCP_LISTEN and int(local_address.rsplit(':', 1)[1], 16) == port:
+                        inodes.add(inode)
+        except FileNotFoundError:
+            continue
+    return inodes
+
+
+def _pid_from_inodes(inodes):
+    targets = {f'socket:[{inode}]' for inode in inodes}
+
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+
+        fd_dir = f'/proc/{pid}/fd'
+        try:
+            for fd in os.listdir(fd_dir):
+                if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                    return int(pid)
+        except (FileNotFoundError, PermissionError, ProcessLookupError):
+            continue
+    return None
+
+
+def _pid_from_proc(port):
+    inodes = _listening_inodes(port)
+    return _pid_from_inodes(inodes) if inodes else None
+
+
+def _pid_from_psutil(port):
+    for conn in psutil.net_connections(kind='inet'):
+        if conn.status == psutil.CONN_LISTEN and conn.laddr.port == port:
+            return conn.pid
+    return None
+
+
+# 해당 포트에서 LISTEN 중인 프로세스를 찾습니다. UEC가 실행하지 않은 서버를 넘겨받을 때만 사용합니다.
+def find_listener(port):
+    start_time = time.perf_counter()
+
+    if os.path.isdir('/proc/net'):
+        method = '/proc/net'
+        pid = _pid_from_proc(port)
+    else:
+        method = 'psutil'
+        pid = _pid_from_psutil(port)
+
+    log.debug(f'Listener lookup for port {port} via {method} took '
+              f'{(time.perf_counter() - start_time) * 1000:.1f} ms. pid : {pid}')
+
+    if pid is None:
+        return None
+
+    try:
+        return psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return None
+
+
+def jar_of(process: psutil.Process):
+    try:
+        with process.oneshot():
+            cwd = process.cwd()
+            jars = [os.path.join(cwd, arg) for arg in process.cmdline() if arg.endswith('.jar')]
+            if not jars:
+                jars = [file.path for file in process.open_files() if file.path.endswith('.jar')]
+    except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+        log.error(f'The JAR used by the process could not be found. \n{e}')
+        return []
+    return jars
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from logger.log import create_logger
+
+log = create_logger('PX_Log', 'runner_manager.log')
+
+BUFFER_SIZE = 64 * 1024
+DEFAULT_DRAIN_TIMEOUT = 30
+
+
+class TcpProxy:
+    def __init__(self, listen_port, host='0.0.0.0'):
+        self.listen_port = listen_port
+        self.host = host
+        # 새 연결을 전달할 내부 포트입니다. 이미 맺어진 연결은 기존 포트로 계속 전달됩니다.
+        self.target_port = None
+
+        # 내부 포트 -> 전달 중인 연결 수. 새 연결은 target_port 를 읽는 것과 같은 잠금 안에서 세므로,
+        # switch() 가 끝난 뒤 drain() 이 이전 포트로 가는 연결을 놓치지 않습니다.
+        self._active = Counter()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._server = None
+        self._started = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self.__run_event_loop, daemon=True)
+        thread.setName('UEC Proxy')
+        thread.start()
+        self._started.wait()
+        return self
+
+    def __run_event_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._started.set()
+        self._loop.run_forever()
+
+    @property
+    def bound(self):
+        return self._server is not None
+
+    def bind(self):
+        return asyncio.run_coroutine_threadsafe(self.__bind(), self._loop).result()
+
+    async def __bind(self):
+        if self._server is not None:
+            return True
+
+        try:
+            self._server = await asyncio.start_server(self.__handle, self.host, self.listen_port)
+        except OSError as e:
+            log.warning(f'The proxy could not bind port {self.listen_port}. : {e}')
+            return False
+
+        log.info(f'The proxy is listening. port : {self.listen_port}')
+        return True
+
+    def switch(self, port):
+        with self._lock:
+            previous, self.target_port = self.target_port, port
+        log.info(f'New connections are forwarded to port {port}. previous port : {previous}')
+
+    def active(self, port):
+        with self._lock:
+            return self._active[port]
+
+    def drain(self, port, timeout=DEFAULT_DRAIN_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while self.active(port) > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        remaining = self.active(port)
+        if remaining:
+            log.warning(f'{remaining} connections to port {port} were not drained within {timeout} seconds.')
+        return remaining == 0
+
+    async def __handle(self, reader, writer):
+        with self._lock:
+            port = self.target_port
+            if port is not None:
+                self._active[port] += 1
+        if port is None:
+            writer.close()
+            return
+
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError as e:
+            log.debug(f'Could not connect to port {port}. : {e}')
+            self.__release(port)
+            writer.close()
+            return
+
+        try:
+            await asyncio.gather(self.__pipe(reader, upstream_writer), self.__pipe(upstream_reader, writer))
+        finally:
+            self.__release(port)
+            upstream_writer.close()
+            writer.close()
+
+    def __release(self, port):
+        with self._lock:
+            self._active[port] -= 1
+
+    @staticmethod
+    async def __pipe(reader, writer):
+        try:
+            while data := await reader.read(BUFFER_SIZE):
+                writer.write(data)
+                await writer.drain()
+
+            if writer.can_write_eof():
+                writer.write_eof()
+        except (ConnectionError, OSError):
+            writer.close()
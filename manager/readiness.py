@@ -0,0 +1,85 @@
+import http.client
+import socket
+import time
+
+import psutil
+
+from manager.process_lookup import find_listener
+
+DEFAULT_TIMEOUT = 60
+INITIAL_DELAY = 0.05
+MAX_DELAY = 1.0
+PROBE_TIMEOUT = 1.0
+
+
+def _port_open(host, port):
+    try:
+        with socket.create_connection((host, port), timeout=PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def _health_ok(host, port, health_path):
+    connection = http.client.HTTPConnection(host, port, timeout=PROBE_TIMEOUT)
+    try:
+        connection.request('GET', health_path)
+        return 200 <= connection.getresponse().status < 300
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        connection.close()
+
+
+def probe(host, port, health_path=None):
+    if health_path:
+        return _health_ok(host, port, health_path)
+    return _port_open(host, port)
+
+
+def _listener_of(process, port):
+    # 포트에서 LISTEN 중인 프로세스가 실행한 프로세스이거나 그 자식(셸, 래퍼 스크립트로 실행한 경우)이면 None,
+    # 아니면 포트를 점유한 프로세스 번호를 반환합니다. 이전 서버가 아직 포트를 점유하고 있으면 응답은 이전 서버의 것입니다.
+    try:
+        listener = find_listener(port)
+    except psutil.AccessDenied:
+        # 다른 프로세스의 연결을 조회할 권한이 없는 플랫폼에서는 응답 여부만으로 판단합니다.
+        return None
+    if listener is None:
+        return 'unknown'
+    if listener.pid == process.pid:
+        return None
+
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        children = []
+    return None if any(child.pid == listener.pid for child in children) else listener.pid
+
+
+# 프로세스가 포트에서 응답할 때까지 간격을 늘려가며 확인합니다. 응답하면 포트를 점유한 프로세스가 실행한 프로세스인지 확인합니다.
+# 준비되면 즉시 (True, 소요 시간, None), 프로세스가 종료되거나 시간이 초과되면 (False, 소요 시간, 사유) 를 반환합니다.
+def wait_until_ready(process, port, host='127.0.0.1', health_path=None, timeout=DEFAULT_TIMEOUT):
+    start_time = time.monotonic()
+    delay = INITIAL_DELAY
+    other = None
+
+    while True:
+        return_code = process.poll()
+        if return_code is not None:
+            return False, time.monotonic() - start_time, f'The process exited with code {return_code}.'
+
+        if probe(host, port, health_path):
+            other = _listener_of(process, port)
+            if other is None:
+                return True, time.monotonic() - start_time, None
+
+        elapsed = time.monotonic() - start_time
+        if elapsed >= timeout:
+            if other is not None:
+                return False, elapsed, (f'The server was not ready within {timeout} seconds. '
+                                        f'The port {port} is used by another process. pid : {other}')
+            return False, elapsed, f'The server was not ready within {timeout} seconds.'
+
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * 2, MAX_DELAY)
@@ -0,0 +1,260 @@
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from logger.log import create_logger
+from manager.metrics import REPLICATION_BYTES, REPLICATION_DURATION, REPLICATIONS
+from manager.task_registry import COMPLETED, FAILED, IN_PROGRESS, UNKNOWN
+from manager.version_index import parse_version
+
+log = create_logger('RP_Log', 'uec.log')
+
+# 다른 UEC 가 복제한 요청임을 표시합니다. 이 헤더가 있는 업로드는 다시 복제하지 않습니다.
+REPLICA_HEADER = 'X-UEC-Replica'
+
+POOL_SIZE = 4
+TRANSFER_TIMEOUT = 600
+STATUS_TIMEOUT = 5
+READ_SIZE = 1024 * 1024
+HISTORY_SIZE = 1024
+
+# 노드별 복제 상태입니다.
+REPLICATING = 'replicating'
+REPLICATED = 'replicated'
+REPLICATION_FAILED = 'failed'
+# 전체 배포 상태입니다. 정족수 이상의 노드가 completed 이면 completed 입니다.
+QUORUM_PENDING = 'in_progress'
+QUORUM_COMPLETED = 'completed'
+QUORUM_FAILED = 'failed'
+
+
+class PeerError(Exception):
+    pass
+
+
+def parse_peer(address):
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f'The peer address must be host:port. : {address}')
+    return host.strip('[]'), int(port)
+
+
+def _json(data):
+    try:
+        return json.loads(data) if data else None
+    except ValueError:
+        return None
+
+
+def _multipart(path, filename):
+    # 파일을 메모리에 올리지 않고 읽는 대로 보내도록, 본문을 만드는 함수와 전체 길이를 반환합니다.
+    boundary = uuid.uuid4().hex
+    head = (f'--{boundary}\r\nContent-Disposition: form-data; name="jar"; filename="{filename.replace(chr(34), "%22")}"'
+            f'\r\nContent-Type: application/java-archive\r\n\r\n').encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+    length = len(head) + os.path.getsize(path) + len(tail)
+
+    def body():
+        yield head
+        with open(path, 'rb') as f:
+            while chunk := f.read(READ_SIZE):
+                yield chunk
+        yield tail
+
+    return boundary, length, body
+
+
+class PeerPool:
+    # 피어 하나에 대한 keep-alive 연결 묶음입니다. 가장 최근에 사용한 연결부터 다시 사용합니다.
+    def __init__(self, address, size=POOL_SIZE, timeout=TRANSFER_TIMEOUT):
+        self.address = address
+        self.host, self.port = parse_peer(address)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(size)
+
+    def __acquire(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def __release(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, body=None, headers=None):
+        # body 가 함수이면 호출하여 얻은 iterable 을 보냅니다. 다시 보낼 때 처음부터 새로 만들 수 있습니다.
+        connection, reused = self.__acquire()
+        try:
+            connection.request(method, path, body() if callable(body) else body, headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            if reused:
+                # 재사용한 연결은 피어가 이미 닫았을 수 있으므로 새 연결로 한 번 더 보냅니다.
+                return self.request(method, path, body, headers)
+            raise
+
+        self.__release(connection)
+        return response.status, _json(data)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Replicator:
+    # 저장된 업로드를 모든 피어 UEC 에 병렬로 복제하고, 노드별 배포 상태를 모아 정족수(quorum) 달성 여부를 판단합니다.
+    # 피어가 같은 내용을 이미 가지고 있으면 sha256 만 보내고, 없을 때만 파일을 전송합니다.
+    def __init__(self, manager, peers=None, quorum=None):
+        self.manager = manager
+        peers = list(peers or ())
+        self._transfer = [PeerPool(address) for address in peers]
+        self._status = {address: PeerPool(address, timeout=STATUS_TIMEOUT) for address in peers}
+
+        nodes = len(peers) + 1
+        self.quorum = min(quorum, nodes) if quorum else nodes // 2 + 1
+
+        # 작업 번호 -> {피어 주소: 복제 기록}
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._poller = None
+        if peers:
+            self._executor = ThreadPoolExecutor(max_workers=len(peers) * 2,
+                                                thread_name_prefix=f'UEC Replication ({manager.name})')
+            self._poller = ThreadPoolExecutor(max_workers=len(peers), thread_name_prefix='UEC Peer Status')
+
+    @property
+    def enabled(self):
+        return bool(self._transfer)
+
+    @property
+    def peers(self):
+        return [peer.address for peer in self._transfer]
+
+    def replicate(self, task_uuid, path, digest):
+        # 같은 작업을 다시 복제하지 않습니다. (중복 업로드가 기존 작업 번호를 반환한 경우)
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if task_uuid in self._records:
+                return False
+            self._records[task_uuid] = {peer.address: {'node': peer.address, 'replication': REPLICATING}
+                                        for peer in self._transfer}
+            while len(self._records) > HISTORY_SIZE:
+                self._records.popitem(last=False)
+
+        filename = f'{parse_version(os.path.basename(path))[0]}.jar'
+        for peer in self._transfer:
+            self._executor.submit(self.__send, peer, task_uuid, path, filename, digest)
+        return True
+
+    def __update(self, task_uuid, address, **values):
+        with self._lock:
+            records = self._records.get(task_uuid)
+            if records is not None:
+                records[address].update(values)
+
+    def __send(self, peer, task_uuid, path, filename, digest):
+        service = quote(self.manager.name)
+        start_time = time.monotonic()
+        transfer = 'hash'
+        try:
+            missing = True
+            if digest is not None:
+                request = json.dumps({'filename': filename, 'sha256': digest}).encode()
+                status, body = peer.request('POST', f'/jar_upload/replica?service={service}', request,
+                                            {'Content-Type': 'application/json', REPLICA_HEADER: '1'})
+                # 서비스가 없는 경우처럼 다른 이유의 404 는 파일을 보내도 실패하므로 복제 실패로 처리합니다.
+                missing = status == 404 and bool(body) and body.get('missing') is True
+
+            if missing:
+                # 피어에 같은 내용이 없으므로 파일을 보냅니다.
+                transfer = 'upload'
+                boundary, length, stream = _multipart(path, filename)
+                status, body = peer.request('POST', f'/jar_upload?service={service}', stream, {
+                    'Content-Type': f'multipart/form-data; boundary={boundary}',
+                    'Content-Length': str(length),
+                    REPLICA_HEADER: '1',
+                })
+                REPLICATION_BYTES.labels(self.manager.name).inc(length)
+
+            if status not in (200, 202) or not body or 'uuid' not in body:
+                raise PeerError(f'The peer responded with {status}. {body}')
+        except (OSError, http.client.HTTPException, PeerError) as e:
+            self.__update(task_uuid, peer.address, replication=REPLICATION_FAILED, error=str(e))
+            REPLICATIONS.labels(self.manager.name, REPLICATION_FAILED).inc()
+            log.warning(f'The upload could not be replicated to {peer.address}. : {e}',
+                        extra={'service': self.manager.name, 'uuid': task_uuid})
+            return
+
+        elapsed = time.monotonic() - start_time
+        self.__update(task_uuid, peer.address, replication=REPLICATED, transfer=transfer, uuid=body['uuid'],
+                      seconds=round(elapsed, 3))
+        REPLICATIONS.labels(self.manager.name, transfer).inc()
+        REPLICATION_DURATION.labels(self.manager.name).observe(elapsed)
+        log.info(f'The upload has been replicated to {peer.address}. '
+                 f'transfer : {transfer}, task number : {body["uuid"]}',
+                 extra={'service': self.manager.name, 'uuid': task_uuid})
+
+    def __peer_status(self, record):
+        record = dict(record)
+        if record['replication'] == REPLICATION_FAILED:
+            record['status'] = FAILED
+        if record['replication'] != REPLICATED:
+            return record
+
+        peer = self._status[record['node']]
+        try:
+            status, body = peer.request('GET', f'/tasking?uuid={record["uuid"]}&service={quote(self.manager.name)}')
+        except (OSError, http.client.HTTPException) as e:
+            # 응답하지 않는 피어는 다시 응답할 수 있으므로 진행 중으로 봅니다.
+            record['status'] = None
+            record['error'] = str(e)
+            return record
+
+        body = body or {}
+        record['status'] = body.get('status', UNKNOWN if status == 404 else None)
+        if body.get('message'):
+            record['message'] = body['message']
+        return record
+
+    def status(self, task_uuid, local):
+        # local 은 이 노드의 (상태, 대기 번호, 메시지, 단계) 입니다. 피어의 /tasking 은 병렬로 조회합니다.
+        nodes = [{'node': 'local', 'status': local[0], 'message': local[2]}]
+        with self._lock:
+            records = [dict(record) for record in self._records.get(task_uuid, {}).values()]
+        if records:
+            nodes.extend(self._poller.map(self.__peer_status, records))
+
+        succeeded = sum(1 for node in nodes if node.get('status') == COMPLETED)
+        pending = sum(1 for node in nodes
+                      if node.get('replication') == REPLICATING or node.get('status') in (*IN_PROGRESS, None))
+        if succeeded >= self.quorum:
+            status = QUORUM_COMPLETED
+        elif succeeded + pending < self.quorum:
+            status = QUORUM_FAILED
+        else:
+            status = QUORUM_PENDING
+
+        return {
+            'status': status,
+            'quorum': {'required': self.quorum, 'nodes': len(self._transfer) + 1, 'succeeded': succeeded,
+                       'reached': succeeded >= self.quorum},
+            'nodes': nodes,
+        }
@@ -0,0 +1,179 @@
+import math
+import os
+import threading
+import time
+
+from logger.log import create_logger
+from manager.content_store import get_content_store
+from manager.metrics import RETENTION_DELETIONS, RETENTION_FREED_BYTES
+from manager.version_index import get_index
+
+log = create_logger('RT_Log', 'uec.log')
+
+# 한 번에 삭제하는 파일 수입니다. 묶음마다 보호 대상을 다시 확인하고 해시 맵을 한 번만 저장합니다.
+BATCH_SIZE = 32
+
+COUNT = 'count'
+AGE = 'age'
+BYTES = 'bytes'
+
+
+class RetentionPolicy:
+    # 아티팩트별 유지 개수, 전체 용량(byte), 보관 기간(초) 입니다. inf 이면 제한하지 않습니다.
+    def __init__(self, max_count=math.inf, max_bytes=math.inf, max_age=math.inf):
+        self.max_count = _or_inf(max_count)
+        self.max_bytes = _or_inf(max_bytes)
+        self.max_age = _or_inf(max_age)
+
+    @property
+    def enabled(self):
+        return not (math.isinf(self.max_count) and math.isinf(self.max_bytes) and math.isinf(self.max_age))
+
+    def to_dict(self):
+        return {key: None if math.isinf(value) else value
+                for key, value in (('max_count', self.max_count), ('max_bytes', self.max_bytes),
+                                   ('max_age', self.max_age))}
+
+
+def _or_inf(value):
+    return math.inf if value is None else value
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime
+
+
+def plan(target_dir, policy, protected=(), now=None):
+    # 삭제할 파일을 정하기만 하고 지우지는 않습니다. (이름, 크기, 사유) 목록과 현재 용량을 반환합니다.
+    # 각 아티팩트의 최신 버전과 protected 에 있는 파일은 어떤 제한을 넘어도 삭제하지 않습니다.
+    index = get_index(target_dir)
+    now = time.time() if now is None else now
+    keep = {os.path.basename(name) for name in protected if name}
+
+    files = {}
+    for artifact, names in index.versions().items():
+        keep.add(names[-1])
+        for name in names:
+            stat = _stat(os.path.join(target_dir, name))
+            if stat is not None:
+                files[name] = stat
+
+    candidates = {}
+    if not math.isinf(policy.max_count):
+        for name in index.evict(policy.max_count, keep):
+            candidates.setdefault(name, COUNT)
+    if not math.isinf(policy.max_age):
+        for name, (_, mtime) in files.items():
+            if name not in keep and now - mtime > policy.max_age:
+                candidates.setdefault(name, AGE)
+
+    total = sum(size for size, _ in files.values())
+    remaining = total - sum(files[name][0] for name in candidates if name in files)
+    if remaining > policy.max_bytes:
+        # 용량을 넘으면 남은 파일 중 오래된 것부터 삭제합니다.
+        for name in sorted(files, key=lambda name: files[name][1]):
+            if remaining <= policy.max_bytes:
+                break
+            if name in keep or name in candidates:
+                continue
+            candidates[name] = BYTES
+            remaining -= files[name][0]
+
+    removals = [(name, files[name][0], reason) for name, reason in candidates.items() if name in files]
+    return removals, total, sorted(keep)
+
+
+class RetentionCollector:
+    # 이전 버전 정리를 배포 작업과 분리된 스레드에서 진행합니다.
+    # 요청은 모아서 한 번의 정리로 처리되므로, 배포가 연속되어도 대기열의 다음 작업을 늦추지 않습니다.
+    def __init__(self, manager, policy):
+        self.manager = manager
+        self.policy = policy
+        self.last_report = None
+
+        self._requested = threading.Event()
+        self._thread = None
+
+    def __protected(self):
+        # 실행 중인 JAR, 마지막 정상 버전, 대기 중이거나 배포 중인 JAR 입니다.
+        _, running = self.manager.current_backend()
+        return [*running, self.manager.supervisor.last_known_good, *self.manager.tasks.pending_paths()]
+
+    def start(self):
+        if not self.policy.enabled:
+            return self
+
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.setName(f'UEC Retention ({self.manager.name})')
+        self._thread.start()
+        self.request()
+        return self
+
+    def request(self):
+        self._requested.set()
+
+    def dry_run(self):
+        return self.__report(*plan(self.manager.target_dir, self.policy, self.__protected()), dry_run=True)
+
+    def __report(self, removals, total, protected, dry_run, removed=None):
+        removed = removals if removed is None else removed
+        freed = sum(size for _, size, _ in removed)
+        return {
+            'time': time.time(),
+            'dry_run': dry_run,
+            'policy': self.policy.to_dict(),
+            'total_bytes': total,
+            'freed_bytes': freed,
+            'remaining_bytes': total - freed,
+            'protected': protected,
+            'removed': [{'name': name, 'size': size, 'reason': reason} for name, size, reason in removed],
+        }
+
+    def __run(self):
+        while True:
+            self._requested.wait()
+            self._requested.clear()
+            try:
+                self.collect()
+            except Exception as e:
+                log.error(f'The retention pass failed. : {e}')
+
+    def collect(self):
+        target_dir = self.manager.target_dir
+        removals, total, protected = plan(target_dir, self.policy, self.__protected())
+        index = get_index(target_dir)
+        content_store = get_content_store(target_dir)
+        removed = []
+
+        for offset in range(0, len(removals), BATCH_SIZE):
+            # 정리 중에 배포가 시작된 JAR은 삭제하지 않습니다.
+            protected_now = {os.path.basename(name) for name in self.__protected() if name}
+            batch = []
+            for name, size, reason in removals[offset:offset + BATCH_SIZE]:
+                if name in protected_now:
+                    continue
+                try:
+                    os.remove(os.path.join(target_dir, name))
+                except FileNotFoundError:
+                    pass
+                except PermissionError as e:
+                    log.warning(f'The old version could not be deleted. : {e}')
+                    continue
+                index.discard(name)
+                batch.append((name, size, reason))
+
+            content_store.discard_many(name for name, _, _ in batch)
+            removed.extend(batch)
+
+        if removed:
+            RETENTION_DELETIONS.labels(self.manager.name).inc(len(removed))
+            RETENTION_FREED_BYTES.labels(self.manager.name).inc(sum(size for _, size, _ in removed))
+            log.info(f'The following files were deleted: {[name for name, _, _ in removed]}',
+                     extra={'service': self.manager.name})
+
+        self.last_report = self.__report(removals, total, protected, False, removed)
+        return self.last_report
@@ -1,4 +1,4 @@
-import asyncio
+import functools
 import logging
 import math
 import os
@@ -6,45 +6,37 @@ import subprocess
 import sys
 import threading
 import time
-from multiprocessing import Queue
+from uuid import UUID, uuid4
 
 import psutil
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-from logger.log import create_logger
-from manager.file_manager import matching_files, old_file_remove
+from logger.log import create_logger, set_console_level
+from manager.content_store import get_content_store
+from manager.file_manager import remove_stale_temp_files
+from manager.ingest import DEFAULT_QUIET, DirectoryIngest, is_temp_name
+from manager.jar_validator import JarValidator
+from manager.metrics import DEPLOYS, DEPLOY_FAILURES, DETECT_LATENCY, LAUNCH_DURATION, QUEUE_DEPTH, READY_DURATION, \
+    ROLLBACKS, TASK_WAIT, TERMINATE_DURATION
+from manager.output_capture import OutputBuffer, OutputStore, capture, classify
+from manager.process_lookup import find_listener, jar_of
+from manager.proxy import DEFAULT_DRAIN_TIMEOUT, TcpProxy
+from manager.readiness import DEFAULT_TIMEOUT, wait_until_ready
+from manager.replication import Replicator
+from manager.retention import RetentionCollector, RetentionPolicy
+from manager.scheduler import DeployScheduler
+from manager.supervisor import DEFAULT_RESTART_LIMIT, Supervisor
+from manager.task_journal import get_journal
+from manager.task_registry import CANCELLED_MESSAGE, COMPLETED, FAILED, FINISHED, SKIPPED, TaskRegistry
+from manager.version_index import get_index, parse_version
 
 ob_log = create_logger('Observer_Log', 'runner_manager.log')
 log = create_logger('RM_Log', 'runner_manager.log')
 
-ready = True
-
-_loop_thread = None
-_task_list = []
-_managed_file_count = 0
-
-
-def is_ready():
-    return ready and _loop_thread is None
-
-
-def task_count():
-    return len(_task_list)
-
-
-def _wait_for_file(file_path, timeout=10):
-    start_time = time.time()
-
-    while time.time() - start_time < timeout:
-        if os.path.exists(file_path):
-            initial_size = os.path.getsize(file_path)
-            time.sleep(0.1)
-
-            if os.path.getsize(file_path) == initial_size:
-                return True
-        time.sleep(0.1)
-    return False
+DEFAULT_COMMAND = ('java', '-jar', '{jar}')
+# 게시한 업로드 파일의 감시 이벤트를 이 시간(초) 안에 받지 못하면, 이벤트 없이 작업을 실행할 수 있게 합니다.
+DETECT_TIMEOUT = 5.0
 
 
 def _require_else(obj, default_value):
@@ -52,60 +44,208 @@ def _require_else(obj, default_value):
 
 
 class Manager(FileSystemEventHandler):
-    def __init__(self, target_dir, server_port, maintenance_count=math.inf, debug=False):
+    def __init__(self, target_dir, server_port, maintenance_count=math.inf, maintenance_bytes=math.inf,
+                 maintenance_age=math.inf, coalesce=False,
+                 ready_timeout=DEFAULT_TIMEOUT, health_path=None,
+                 internal_ports=None, drain_timeout=DEFAULT_DRAIN_TIMEOUT,
+                 restart_limit=DEFAULT_RESTART_LIMIT, backend_log=False, validate=True,
+                 ingest_quiet=DEFAULT_QUIET, peers=None, quorum=None, name='default', command=None, debug=False):
         super().__init__()
 
+        self.name = name
         self.target_dir = _require_else(target_dir, os.getcwd())
         self.server_port = _require_else(server_port, 8080)
+        # 실행 명령의 {jar}, {port} 는 실행할 JAR 경로와 서버 포트로 치환됩니다.
+        self.command = list(_require_else(command, DEFAULT_COMMAND))
+        # 실행한 서버가 포트를 열거나 health_path 가 2xx 로 응답하면 준비된 것으로 판단합니다.
+        self.ready_timeout = ready_timeout
+        self.health_path = health_path
+        # UEC가 실행한 백엔드 프로세스입니다. 포트 조회 없이 종료 대상과 실행 중인 JAR을 알 수 있습니다.
+        self.backend = None
+        self.backend_jar = None
+        self.backend_port = None
+        # 실행 중인 서버를 종료하기 전에 새 JAR 이 실행 가능한 형태인지 확인합니다.
+        self.validator = JarValidator(validate)
+        # 백엔드 출력은 배포마다 메모리에 보관하며, backend_log 가 켜져 있으면 로그 파일에도 기록합니다.
+        self.outputs = OutputStore()
+        self.backend_log = backend_log
+        # 배포와 비정상 종료된 백엔드의 재시작이 동시에 진행되지 않도록 합니다.
+        self.deploy_lock = threading.Lock()
+        self.supervisor = Supervisor(self, _popen_observer, _terminate_process, restart_limit)
+
+        # 내부 포트가 주어지면 UEC가 server_port 를 점유하고, 새 버전이 준비된 뒤에 연결을 넘깁니다.
+        self.internal_ports = tuple(internal_ports) if internal_ports else None
+        self.drain_timeout = drain_timeout
+        self.proxy = TcpProxy(self.server_port) if self.internal_ports else None
 
         self.observer = Observer()
         self.observer.schedule(self, self.target_dir, recursive=False)
 
-        self.queue = Queue()
-        # 해당 UUID는 어디까지나 새로운 작업을 queue에 전달하기 위해 임의적으로 받아들이는 변수입니다.
-        # queue에서 작업 번호를 부여하기 위한 목적을 제외하고선 사용하지 마십시오.
-        # 해당 uuid를 사용하게 되면 가장 마지막에 할당된 작업 번호로 고정될 확률이 높습니다.
-        self.uuid = None
+        # 작업 목록이 곧 실행 순서로 정렬된 대기열이며, 하나의 스케줄러 스레드가 앞에서부터 실행합니다.
+        self.tasks = TaskRegistry()
+        self.scheduler = DeployScheduler(self.tasks, self.__deploy, self.name)
+        # 업로드 경로에서 rename 전에 등록한 작업 번호입니다. 절대 경로 -> (uuid, 등록 시각)
+        self._reserved = {}
+        # 업로드 경로를 거치지 않고 직접 복사되는 중인 파일의 작업 번호입니다. 절대 경로 -> uuid
+        self._ingesting = {}
+        self.ingest = DirectoryIngest(self.__ingested, self.__dropped, ingest_quiet, self.name)
 
         self.maintenance_count = maintenance_count
-        global _managed_file_count
-        _managed_file_count = len(matching_files(self.target_dir, '.jar'))
+        # 같은 아티팩트의 새 업로드가 들어오면, 아직 시작되지 않은 이전 작업은 실행하지 않습니다.
+        self.coalesce = coalesce
+        # 디렉토리는 시작 시 한 번만 읽고, 이후에는 감시 이벤트로 색인을 갱신합니다.
+        self.index = get_index(self.target_dir)
+        self.content_store = get_content_store(self.target_dir)
+        # 이전 버전은 개수, 용량, 보관 기간 기준으로 별도 스레드에서 정리합니다.
+        self.retention = RetentionCollector(self,
+                                            RetentionPolicy(maintenance_count, maintenance_bytes, maintenance_age))
+        # 업로드를 같은 서비스를 실행하는 다른 노드의 UEC 에도 복제합니다.
+        self.replication = Replicator(self, peers, quorum)
+        # 재시작되어도 작업이 사라지지 않도록 작업의 등록과 종료를 save_dir 에 기록합니다.
+        self.journal = get_journal(self.target_dir)
+        self._unfinished, finished = self.journal.replay()
+        for entry in finished:
+            self.tasks.restore(UUID(entry['uuid']), entry.get('path'), entry.get('artifact'), entry['status'],
+                               entry['message'], entry['time'])
+        QUEUE_DEPTH.labels(self.name).set_function(self.task_count)
 
         if debug:
-            global ob_log
-            console = ob_log.handlers['console_handler']
-            console.setLevel(logging.DEBUG)
-            ob_log.handlers['console_handler'] = console
+            set_console_level(logging.DEBUG, ('Observer_Log', 'RM_Log'))
+
+    def reserve(self, uuid, path):
+        # 업로드 경로에서 rename 직전에 호출됩니다. 응답 직후의 /tasking, /ready 에도 보이도록 작업을 먼저 등록하고,
+        # 감시자가 파일을 감지하면 실행할 수 있게 됩니다.
+        # 게시에 실패하면 첫 번째 함수로 작업을 끝내고, 게시에 성공하면 두 번째 함수로 감지 마감 시각을 설정합니다.
+        key = os.path.abspath(path)
+        self._reserved[key] = (uuid, time.monotonic())
+        self.__add_queue((uuid, path), held=True)
+        return functools.partial(self.__unreserve, uuid, key), functools.partial(self.__published, key)
+
+    def __unreserve(self, uuid, key):
+        self._reserved.pop(key, None)
+        self.complete_tasking(uuid, FAILED, 'The uploaded file could not be saved.')
+
+    def __published(self, key):
+        # 감시자가 rename 이벤트를 놓치면(감시자 중지, 이벤트 큐 넘침) 작업이 계속 대기하므로,
+        # 등록 시각부터 DETECT_TIMEOUT 이 지나도 감지되지 않은 작업은 직접 실행할 수 있게 합니다.
+        reserved = self._reserved.get(key)
+        if reserved is None:
+            return
+        timer = threading.Timer(max(0.0, reserved[1] + DETECT_TIMEOUT - time.monotonic()), self.__detect_timeout,
+                                (key, reserved))
+        timer.daemon = True
+        timer.start()
+
+    def __detect_timeout(self, key, reserved):
+        if self._reserved.get(key) is not reserved:
+            return
+        # 늦게 도착한 이벤트가 같은 파일을 새 작업으로 등록하지 않도록, 등록 정보는 이벤트를 받을 때까지 남겨 둡니다.
+        if self.__release_upload(key, *reserved):
+            ob_log.warning(f'The uploaded file was not detected within {DETECT_TIMEOUT} seconds. '
+                           f'It has been queued without the event. task number : {reserved[0]}')
+
+    def __release_upload(self, path, uuid, saved_at):
+        # 업로드 경로는 완성된 임시 파일을 rename 하므로 바로 실행할 수 있습니다.
+        # 감시 이벤트와 감지 마감 중 먼저 처리한 쪽만 작업을 실행할 수 있게 하고 True 를 반환합니다.
+        self.index.add(path)
+        if self.tasks.release(uuid) is None:
+            return False
+        DETECT_LATENCY.labels(self.name).observe(time.monotonic() - saved_at)
+        self.validator.submit(path)
+        return True
+
+    def __is_target_jar(self, path):
+        return path.startswith(self.target_dir) and path.endswith('.jar') and not is_temp_name(path)
+
+    # 감시자 스레드에서 호출되는 아래 함수들은 기다리지 않습니다. 파일이 완성되었는지는 DirectoryIngest 가 확인합니다.
+    def __detected(self, path, closed):
+        key = os.path.abspath(path)
+        reserved = self._reserved.pop(key, None)
+        if reserved is not None:
+            self.__release_upload(path, *reserved)
+            ob_log.debug(f'The uploaded file has been detected. task number : {reserved[0]}')
+            return
+
+        if key not in self._ingesting:
+            # 직접 복사되는 파일도 첫 이벤트에서 작업 번호를 발급하여, 복사가 끝나기 전부터 /tasking, /ready 에 보이도록 합니다.
+            # 작업 기록은 fsync 를 기다리므로, 파일이 완성된 뒤 ingest 스레드에서 남깁니다.
+            uuid = uuid4()
+            self._ingesting[key] = uuid
+            self.__add_queue((uuid, path), journaled=True, held=True)
+            ob_log.debug(f'A new file has been detected. It will be queued once written. task number : {uuid}')
+
+        if closed:
+            self.ingest.closed(key)
+        else:
+            self.ingest.touch(key)
 
-    def on_created(self, event):
-        is_dir = event.is_directory
-        is_target_dir = event.src_path.startswith(self.target_dir)
-        is_extension_jar = event.src_path.endswith('.jar')
+    def __ingested(self, path):
+        uuid = self._ingesting.pop(path, None)
+        try:
+            DETECT_LATENCY.labels(self.name).observe(max(0.0, time.time() - os.path.getmtime(path)))
+        except OSError:
+            pass
+        # 같은 이름으로 덮어쓴 파일일 수 있으므로 이전 내용의 sha256 은 버립니다.
+        self.content_store.discard(path)
+        self.index.add(path)
 
-        if not is_dir and is_target_dir and is_extension_jar:
-            ob_log.debug('A new file has been detected. A task has been added to the queue.')
-            ob_log.debug(f'task number : {self.uuid}')
-            _wait_for_file(event.src_path)
+        if uuid is None:
+            uuid = uuid4()
+            self.__add_queue((uuid, path))
+        else:
+            self.journal.sync(self.journal.add(uuid, path, self.index.artifact_of(path)))
+            if self.tasks.release(uuid) is not None:
+                self.validator.submit(path)
+            else:
+                # 기다리는 동안 취소되었거나 다른 업로드로 대체된 작업입니다. 작업 기록에도 끝난 것으로 남깁니다.
+                task = self.tasks.get(uuid)
+                if task is not None and task.status in FINISHED:
+                    self.journal.finish(uuid, task.status, task.message)
+        log.info(f'A file copied into the directory has been queued. : {os.path.basename(path)}',
+                 extra={'service': self.name, 'uuid': uuid})
+
+    def __dropped(self, path):
+        uuid = self._ingesting.pop(path, None)
+        if uuid is None:
+            return
+        ob_log.debug(f'The file was removed before it was completely written. : {path}')
+        task = self.tasks.complete(uuid, SKIPPED, 'The file was removed before it was completely written.')
+        if task is not None:
+            DEPLOYS.labels(self.name, SKIPPED).inc()
+
+    def __forget(self, path):
+        # 기록이 끝나기 전에 삭제되거나 다른 이름으로 옮겨진 파일입니다.
+        key = os.path.abspath(path)
+        if self.ingest.discard(key):
+            self.__dropped(key)
 
-            self.__add_queue((self.uuid, event))
-            global _managed_file_count
-            _managed_file_count += 1
+    def on_created(self, event):
+        if not event.is_directory and self.__is_target_jar(event.src_path):
+            self.__detected(event.src_path, False)
+
+    def on_modified(self, event):
+        # 기록 중인 파일의 수정만 추적합니다. 이미 저장된 파일을 덮어쓰면 close-write 로 감지됩니다.
+        if not event.is_directory and os.path.abspath(event.src_path) in self._ingesting:
+            self.ingest.touch(os.path.abspath(event.src_path))
+
+    def on_closed(self, event):
+        # close-write 를 지원하는 플랫폼(inotify)에서 파일을 쓰기 모드로 열었다가 닫은 경우입니다.
+        if not event.is_directory and self.__is_target_jar(event.src_path):
+            self.__detected(event.src_path, True)
+
+    def on_moved(self, event):
+        # 임시 파일(업로드, rsync)이 완성된 뒤 버전 이름으로 rename 되는 경우입니다.
+        if not event.is_directory and self.__is_target_jar(event.src_path):
+            self.index.discard(event.src_path)
+            self.__forget(event.src_path)
+        if not event.is_directory and self.__is_target_jar(event.dest_path):
+            self.__detected(event.dest_path, True)
 
     def on_deleted(self, event):
-        global _managed_file_count
-        if (not event.is_directory
-                and event.src_path.endswith('.jar')
-                and _managed_file_count > 0
-        ): _managed_file_count -= 1
-
-    def __file_maintenance(self):
-        global _managed_file_count
-        if _managed_file_count > self.maintenance_count:
-            ob_log.info(
-                f'Delete older versions when the file exceeds its maintenance size. '
-                f'Number of files currently being managed : {_managed_file_count}'
-            )
-            old_file_remove(self.target_dir, '.jar', self.maintenance_count, _task_list)
+        if not event.is_directory:
+            self.index.discard(event.src_path)
+            self.content_store.discard(event.src_path, wait=False)
+            self.__forget(event.src_path)
 
     def __start_observer(self):
         log.debug(f'{self.server_port} Starts port process monitoring.')
@@ -114,196 +254,441 @@ class Manager(FileSystemEventHandler):
             self.observer.start()
         except FileNotFoundError:
             log.error(f"Directory : {self.target_dir} Location could not be found. Observer is not Started.")
-            self.queue.close()
             sys.exit(1)
 
-    @staticmethod
-    def __get_task_by_uuid(uuid):
-        global _task_list
-        for task in _task_list:
-            if task[0] == uuid:
-                return task
-        return None
-
-    def is_tasking(self, uuid) -> (bool, int):
-        global _task_list
-        task = self.__get_task_by_uuid(uuid)
-
-        if task is None:
-            return False, 0
-
-        tasking = task is not None
-        waiting = _task_list.index(task)
-
-        return tasking, waiting
+    def track_backend(self, process, jar, port=None):
+        self.backend = process
+        self.backend_jar = jar
+        self.backend_port = port
+        self.supervisor.watch(process, jar, port)
+
+    def backend_status(self):
+        return self.supervisor.status()
+
+    # 저장된 버전을 업로드나 복사 없이 다시 배포합니다. 대기 중인 업로드보다 먼저 실행됩니다.
+    def redeploy(self, version):
+        path = os.path.join(self.target_dir, os.path.basename(version))
+        if not self.__is_target_jar(path) or not os.path.isfile(path):
+            return None
+
+        uuid = uuid4()
+        log.info(f'A stored version has been queued for redeploy. version : {version}, task number : {uuid}',
+                 extra={'service': self.name, 'uuid': uuid})
+        self.__add_queue((uuid, path), priority=True)
+        return uuid
+
+    def deploy_stored(self, path, digest):
+        # 업로드된 내용이 이미 저장된 버전(path)과 같을 때 호출됩니다. (작업 번호, 성공 여부, 중복 여부)
+        # 대기 중인 작업이 모두 끝난 뒤 실행될 버전과 같으면 건너뛰고, 아니면 저장된 파일을 복사 없이 다시 배포합니다.
+        last = self.tasks.last_pending()
+        if last is not None:
+            target, target_uuid = last.path, last.uuid
+        else:
+            _, running = self.current_backend()
+            target = running[0] if running else None
+            target_uuid = self.latest_task(target) if target else None
+
+        if target and self.content_store.digest_of(target) == digest:
+            if target_uuid is None:
+                # UEC 재시작 등으로 배포 기록이 없는 경우, 해당 버전을 등록한 작업 번호를 반환합니다.
+                target_uuid = self.content_store.lookup(digest)[1]
+            log.info(f'The same content is already running or queued. The upload is skipped. : '
+                     f'{os.path.basename(target)}',
+                     extra={'service': self.name, 'uuid': target_uuid})
+            return target_uuid, True, True
+
+        uuid = uuid4()
+        log.info(f'The same content is stored as {os.path.basename(path)}. It has been queued for deploy.',
+                 extra={'service': self.name, 'uuid': uuid})
+        self.__add_queue((uuid, path))
+        return uuid, True, False
+
+    def versions(self):
+        running = os.path.basename(self.backend_jar) if self.backend_jar else None
+        last_known_good = self.supervisor.last_known_good
+        last_known_good = os.path.basename(last_known_good) if last_known_good else None
+        deploys = self.tasks.tasks_by_name()
+
+        versions = []
+        for artifact, names in sorted(self.index.versions().items()):
+            for name in reversed(names):
+                try:
+                    stat = os.stat(os.path.join(self.target_dir, name))
+                except FileNotFoundError:
+                    continue
+                versions.append({
+                    'name': name,
+                    'artifact': artifact,
+                    'version': parse_version(name)[1],
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'sha256': self.content_store.digest_of(name),
+                    'running': name == running,
+                    'last_known_good': name == last_known_good,
+                    'deploys': [{'uuid': str(task.uuid), 'status': task.status, 'message': task.message,
+                                 'time': task.finished_at or task.created_at} for task in deploys.get(name, ())],
+                })
+        return {'running': running, 'last_known_good': last_known_good, 'versions': versions}
+
+    def retention_report(self):
+        return {'plan': self.retention.dry_run(), 'last': self.retention.last_report}
+
+    def backend_output(self, uuid=None):
+        if uuid is not None:
+            return self.outputs.get(uuid)
+        return getattr(self.backend, 'output', None)
+
+    def __start_proxy(self):
+        self.proxy.start()
+
+        # UEC가 재시작된 경우, 내부 포트에서 실행 중인 서버를 넘겨받습니다.
+        for port in self.internal_ports:
+            process = find_listener(port)
+            if process is not None:
+                jars = jar_of(process)
+                self.track_backend(process, jars[0] if jars else None, port)
+                self.proxy.switch(port)
+                break
 
-    def complete_tasking(self):
-        try:
-            global _task_list
-            _task_list.remove(self.__get_task_by_uuid(self.uuid))
-        except ValueError:
-            pass
+        if not self.proxy.bind():
+            log.warning('The port is used by another server. It will be taken over after the next successful deploy.')
+
+    def current_backend(self):
+        if self.backend is not None and _is_alive(self.backend):
+            return self.backend, [self.backend_jar]
+
+        # 직접 실행하지 않았거나 이미 종료된 경우에만 포트에서 LISTEN 중인 프로세스를 찾습니다.
+        process = find_listener(self.server_port)
+        if process is None:
+            return None, [self.backend_jar] if self.backend_jar else []
+
+        return process, jar_of(process)
+
+    def is_ready(self):
+        return len(self.tasks) == 0
+
+    def task_count(self):
+        return len(self.tasks)
+
+    def task_status(self, uuid) -> (str, int, str, str):
+        return self.tasks.status(uuid)
+
+    def replicate(self, uuid):
+        # 업로드로 게시된(또는 같은 내용이 이미 있던) 작업의 파일을 피어에 복제합니다.
+        task = self.tasks.get(uuid)
+        if task is None or not task.path or not os.path.isfile(task.path):
+            return False
+        return self.replication.replicate(uuid, task.path, self.content_store.digest_of(task.path))
+
+    def cluster_status(self, uuid):
+        return self.replication.status(uuid, self.task_status(uuid))
+
+    def latest_task(self, name):
+        tasks = self.tasks.tasks_by_name().get(os.path.basename(name))
+        return max(tasks, key=lambda task: task.created_at).uuid if tasks else None
+
+    def wait_for_change(self, uuid, previous, timeout):
+        return self.tasks.wait_for_change(uuid, previous, timeout)
+
+    async def wait_for_change_async(self, uuid, previous, timeout):
+        return await self.tasks.wait_for_change_async(uuid, previous, timeout)
+
+    def set_phase(self, uuid, phase):
+        self.tasks.set_phase(uuid, phase)
+        log.debug(f'The task phase has changed. phase : {phase}',
+                  extra={'service': self.name, 'uuid': uuid, 'phase': phase})
+
+    def complete_tasking(self, uuid, status=COMPLETED, message=None):
+        task = self.tasks.get(uuid)
+        if task is None or task.status in FINISHED:
+            return
+        self.journal.finish(uuid, status, message)
+        self.tasks.complete(uuid, status, message)
+        DEPLOYS.labels(self.name, status).inc()
+        log.debug(f'The task has finished. status : {status}',
+                  extra={'service': self.name, 'uuid': uuid, 'phase': status})
+
+    # 대기 중인 작업은 바로 건너뛴 것으로 끝나고, 검증 중인 작업은 배포 전에 멈춥니다.
+    # (이번 요청으로 취소되었는지, 작업 상태) 를 반환합니다.
+    def cancel(self, uuid):
+        task, status = self.tasks.cancel(uuid)
+        if task is None or status != SKIPPED:
+            return False, status
+
+        # 재시작 후 다시 실행되지 않도록, 취소가 디스크에 반영된 뒤에 응답합니다.
+        self.journal.sync(self.journal.finish(uuid, SKIPPED, CANCELLED_MESSAGE))
+        self.validator.discard(task.path)
+        DEPLOYS.labels(self.name, SKIPPED).inc()
+        log.info(f'The task has been cancelled. task number : {uuid}', extra={'service': self.name, 'uuid': uuid})
+        return True, status
 
     def start(self):
+        remove_stale_temp_files(self.target_dir)
+        if self.proxy is not None:
+            self.__start_proxy()
+        self.__recover()
+        self.scheduler.start()
+        self.ingest.start()
+        self.retention.start()
+
         thread = threading.Thread(target=self.__start_observer, daemon=True)
-        thread.setName('UEC Observer')
+        thread.setName(f'UEC Observer ({self.name})')
         thread.start()
         return self
 
-    def __add_queue(self, obj):
-        global _task_list
-        _, event = obj
-        _task_list.append((self.uuid, event.src_path))
-
-        global ready
-        if ready: ready = not ready
-
-        self.queue.put(obj)
-        asyncio.run(self.__start_processing())
-
-    async def __start_processing(self):
-        global _loop_thread
-        if _loop_thread is None:
-            _loop_thread = threading.Thread(target=self.__run_event_loop, daemon=True)
-            _loop_thread.start()
-
-    def __run_event_loop(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self.__process_queue())
-        loop.close()
-
-    async def __process_queue(self):
-        while True:
-            uuid, event = self.queue.get()
-            if event is None:
-                global ready
-                ready = True
-
-                global _loop_thread
-                _loop_thread = None
-                break
-
-            await _start_server(self, uuid, event)
-            self.__file_maintenance()
-
-
-def _get_process_from_port(port):
-    log.debug('Search for process from port...')
-    connections = psutil.net_connections(kind='inet')
-    for conn in connections:
-        if conn.laddr.port == port:
-            try:
-                return psutil.Process(conn.pid)
-            except psutil.NoSuchProcess:
-                return None
-
-
-def _get_files_used_by_pid(process):
-    if process is None:
-        return []
-
-    pid = process.pid
+    # 재시작 전에 끝나지 않은 작업을 등록된 순서대로 다시 대기열에 넣습니다.
+    def __recover(self):
+        for entry in self._unfinished:
+            uuid = UUID(entry['uuid'])
+            if os.path.isfile(entry['path']):
+                log.info(f'An unfinished task has been recovered. task number : {uuid}')
+                self.__add_queue((uuid, entry['path']), journaled=True, priority=entry.get('priority', False))
+            else:
+                message = f'The file was removed before the task started. : {entry["path"]}'
+                self.journal.finish(uuid, FAILED, message)
+                self.tasks.restore(uuid, entry['path'], entry['artifact'], FAILED, message)
+        self._unfinished = []
+
+    def __add_queue(self, obj, journaled=False, priority=False, held=False):
+        uuid, path = obj
+        artifact = self.index.artifact_of(path)
+        if not journaled:
+            # 응답한 작업 번호가 재시작 후에도 남도록, 등록은 디스크에 반영될 때까지 기다립니다.
+            self.journal.sync(self.journal.add(uuid, path, artifact, priority))
+
+        task, superseded = self.tasks.add(uuid, path, artifact, self.coalesce, priority, held)
+        if not held:
+            # 업로드가 끝나는 즉시, 앞선 작업의 배포와 별개로 검증을 시작합니다.
+            self.validator.submit(path)
+        if superseded:
+            # 새 작업이 대체된 작업의 실행 순서를 그대로 이어받습니다.
+            # 감시자 스레드에서도 호출되므로, 대체된 작업의 종료 기록이 디스크에 반영되기를 기다리지 않습니다.
+            self.validator.discard(superseded.path)
+            self.journal.finish(superseded.uuid, SKIPPED, superseded.message)
+            log.info(f'A queued task has been superseded. The new task takes its place. task number : {uuid}')
+            DEPLOYS.labels(self.name, SKIPPED).inc()
+
+    # 스케줄러 스레드에서 작업 하나를 검증부터 배포까지 실행합니다.
+    def __deploy(self, task):
+        TASK_WAIT.labels(self.name).observe(time.time() - task.created_at)
+
+        valid, message = self.validator.result(task.path)
+        if not valid:
+            DEPLOY_FAILURES.labels(self.name, 'invalid_jar').inc()
+            self.complete_tasking(task.uuid, FAILED, f'The JAR was rejected before deploy. {message}')
+            return
+
+        if not self.tasks.begin_deploy(task.uuid):
+            self.complete_tasking(task.uuid, SKIPPED, CANCELLED_MESSAGE)
+            return
 
+        try:
+            with self.deploy_lock:
+                if self.proxy is not None:
+                    _switch_server(self, task.uuid, task.path)
+                else:
+                    _start_server(self, task.uuid, task.path)
+        except Exception as e:
+            log.exception(f'An unexpected error occurred during the deploy. task number : {task.uuid}')
+            self.complete_tasking(task.uuid, FAILED, f'An unexpected error occurred during the deploy. : {e}')
+        self.retention.request()
+
+
+def _is_alive(process):
+    # 직접 실행한 서버는 Popen 이고, 재시작 후 내부 포트에서 넘겨받은 서버는 psutil.Process 입니다.
+    if isinstance(process, subprocess.Popen):
+        return process.poll() is None
     try:
-        log.debug(f'PID : {pid} the list of files used by...')
-        file = None
-        with process.oneshot():
-            file = process.open_files()
-    except psutil.NoSuchProcess as e:
-        log.error(f'The Process cannot be found. \n{e}')
-    finally:
-        return file
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
 
 
-def _terminate_server(port):
-    process = _get_process_from_port(port)
-    files = _get_files_used_by_pid(process)
-    jars = list(file.path for file in filter(lambda file: str(file.path).endswith('.jar'), files))
+def _terminate_process(process):
+    if process is None:
+        return
 
     try:
-        if process is not None:
-            log.info('Shut down the server to operate the next version.')
-            process.terminate()
-            process.wait(timeout=5)
+        process.terminate()
+        process.wait(timeout=5)
 
     except psutil.NoSuchProcess as e:
         log.error(f'The Process cannot be found. \n{e}')
-    except psutil.TimeoutExpired:
+    except (psutil.TimeoutExpired, subprocess.TimeoutExpired):
         log.debug('The server shutdown is delayed, so we will force it to shut down.')
         process.kill()
         process.wait()
 
-    return jars
-
-
-def _popen_observer(jar_file):
-    process = None
-    try:
-        if os.name == 'nt':
-            process = subprocess.Popen(
-                ['java', '-jar', jar_file], creationflags=subprocess.CREATE_NO_WINDOW
-            )
-        else:
-            process = subprocess.Popen(['java', '-jar', jar_file], preexec_fn=os.setsid)
-
-        time.sleep(5)
-
-        stdout, stderr = process.communicate(timeout=10)
-        return_code = process.returncode
-        is_running = process.poll() is None
 
-        ignore = return_code == 0 or return_code == 15
+def _terminate_server(manager: Manager):
+    process, jars = manager.current_backend()
+    if process is None:
+        return jars
 
-        error_message = stderr.decode() if stderr and stderr != b'' else None
-        if not is_running or (not ignore and stderr):
-            return process, error_message, True
-        else:
-            return process, None, False
-    except subprocess.TimeoutExpired:
-        return process, None, False
+    log.info('Shut down the server to operate the next version.')
+    # 감시 중인 프로세스의 종료가 비정상 종료로 처리되지 않도록 먼저 관리 대상에서 제외합니다.
+    manager.track_backend(None, None)
+    _terminate_process(process)
+    return jars
 
 
-def _rollback_server(before_jar):
+def _popen_observer(manager: Manager, jar_file, port=None, uuid=None):
+    command = [arg.format(jar=jar_file, port=port or manager.server_port) for arg in manager.command]
+    if port is not None and not any('{port}' in arg for arg in manager.command):
+        command.append(f'--server.port={port}')
+
+    start_time = time.monotonic()
+    # stdout, stderr 는 하나의 파이프로 받아 별도 스레드가 계속 비웁니다.
+    if os.name == 'nt':
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   creationflags=subprocess.CREATE_NO_WINDOW)
+    else:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, preexec_fn=os.setsid)
+    LAUNCH_DURATION.labels(manager.name).observe(time.monotonic() - start_time)
+
+    process.output = OutputBuffer()
+    capture(process, process.output, manager.name, uuid, manager.backend_log)
+    if uuid is not None:
+        manager.outputs.add(uuid, process.output)
+
+    is_ready, elapsed, error_message = wait_until_ready(
+        process, port or manager.server_port, health_path=manager.health_path, timeout=manager.ready_timeout
+    )
+    if is_ready:
+        READY_DURATION.labels(manager.name).observe(elapsed)
+    else:
+        reason = _failure_reason(process)
+        last_line = next((line for line in reversed(process.output.tail()) if line.strip()), None)
+        error_message = f'{error_message} [{reason}]' + (f' {last_line.strip()}' if last_line else '')
+    return process, error_message, not is_ready, elapsed
+
+
+def _failure_reason(process):
+    exited = process.poll() is not None
+    if exited:
+        # 종료된 프로세스의 남은 출력을 마저 읽을 때까지 잠시 기다립니다.
+        process.output.closed.wait(1)
+    return classify(process.output, exited)
+
+
+def _rollback_server(manager: Manager, before_jar):
     try:
         log.info('Roll back to the previous server.')
-        process, error_message, has_error = _popen_observer(before_jar[0])
+        process, error_message, has_error, elapsed = _popen_observer(manager, before_jar)
 
         if has_error:
-            log.error(f'An attempt was made to run the previous JAR {before_jar[0]}, '
-                      f'but an error occurred. The server failed to start.')
+            ROLLBACKS.labels(manager.name, 'failed').inc()
+            _terminate_process(process)
+            log.error(f'An attempt was made to run the previous JAR {before_jar}, '
+                      f'but an error occurred. The server failed to start. : {error_message}')
+        else:
+            ROLLBACKS.labels(manager.name, 'succeeded').inc()
+            log.info(f'The previous server is ready. time to ready : {elapsed:.2f}s')
+            manager.track_backend(process, before_jar)
 
     except FileNotFoundError:
-        log.error(f'Tried to run previous JAR: {before_jar[0]}, but could not find the file.')
+        ROLLBACKS.labels(manager.name, 'failed').inc()
+        log.error(f'Tried to run previous JAR: {before_jar}, but could not find the file.')
 
 
-async def _start_server(manager: Manager, uuid, event):
-    jar = event.src_path
-    before_jar = _terminate_server(manager.server_port)
-    jar_error = False
+def _start_server(manager: Manager, uuid, jar):
+    manager.set_phase(uuid, 'terminating')
+    start_time = time.monotonic()
+    before_jar = _terminate_server(manager)
+    TERMINATE_DURATION.labels(manager.name).observe(time.monotonic() - start_time)
+    jar_error = None
 
     try:
         log.info('Start a new version of the server.')
-        process, error_message, has_error = _popen_observer(jar)
+        manager.set_phase(uuid, 'launching')
+        process, error_message, has_error, elapsed = _popen_observer(manager, jar, uuid=uuid)
 
         if has_error and not process.returncode == 3221225786:
             log.debug(f'An error occurred while running the JAR file. :{error_message} \n'
                       f'Switch to the previous executable JAR server.')
-            jar_error = True
+            DEPLOY_FAILURES.labels(manager.name, _failure_reason(process)).inc()
+            _terminate_process(process)
+            jar_error = error_message
+        else:
+            log.info(f'The server is ready. time to ready : {elapsed:.2f}s, task number : {uuid}',
+                     extra={'service': manager.name, 'uuid': uuid})
+            manager.track_backend(process, jar)
 
     except FileNotFoundError as e:
         log.error(f'JAR file not found. Location of the delivered file {jar} \n{e}')
+        DEPLOY_FAILURES.labels(manager.name, 'jar_not_found').inc()
+        jar_error = str(e)
 
     if jar_error:
         if before_jar:
-            _rollback_server(before_jar[0])
+            manager.set_phase(uuid, 'rollback')
+            _rollback_server(manager, before_jar[0])
         else:
             log.warning('The rollback attempt failed because the previously running process did not exist. '
                         'There is no running server.')
 
-    manager.complete_tasking()
-    if manager.queue.empty():
-        global ready
-        ready = True
+        manager.complete_tasking(uuid, FAILED, jar_error)
+    else:
+        manager.complete_tasking(uuid)
+
+    log.info(f'That task has been completed. Completed task number : {uuid}',
+             extra={'service': manager.name, 'uuid': uuid})
+
+
+# 내부 포트에서 새 버전을 실행하고, 준비가 확인된 경우에만 프록시의 연결을 넘깁니다.
+# 실패한 배포는 실행 중인 서버에 영향을 주지 않습니다.
+def _switch_server(manager: Manager, uuid, jar):
+    old_process, old_port = manager.backend, manager.backend_port
+    new_port = next(port for port in manager.internal_ports if port != old_port)
 
-    log.info(f'That task has been completed. Completed task number : {uuid}')
+    stray = find_listener(new_port)
+    if stray is not None:
+        log.info(f'Shut down the leftover server on port {new_port}.')
+        _terminate_process(stray)
+
+    jar_error = None
+    try:
+        log.info(f'Start a new version of the server. port : {new_port}')
+        manager.set_phase(uuid, 'launching')
+        process, error_message, has_error, elapsed = _popen_observer(manager, jar, new_port, uuid)
+
+        if has_error:
+            log.debug(f'An error occurred while running the JAR file. :{error_message} \n'
+                      f'The running server keeps receiving connections.')
+            DEPLOY_FAILURES.labels(manager.name, _failure_reason(process)).inc()
+            _terminate_process(process)
+            jar_error = error_message
+        else:
+            log.info(f'The server is ready. time to ready : {elapsed:.2f}s, task number : {uuid}',
+                     extra={'service': manager.name, 'uuid': uuid})
+
+    except FileNotFoundError as e:
+        log.error(f'JAR file not found. Location of the delivered file {jar} \n{e}')
+        DEPLOY_FAILURES.labels(manager.name, 'jar_not_found').inc()
+        jar_error = str(e)
+
+    if jar_error:
+        manager.complete_tasking(uuid, FAILED, jar_error)
+    else:
+        if not manager.proxy.bound:
+            # 프록시 도입 전부터 server_port 를 직접 사용하던 서버를 넘겨받습니다.
+            legacy = find_listener(manager.server_port)
+            if legacy is not None:
+                log.info('Shut down the server that was using the port directly.')
+                _terminate_process(legacy)
+            manager.proxy.bind()
+
+        manager.set_phase(uuid, 'switching')
+        manager.proxy.switch(new_port)
+        manager.track_backend(process, jar, new_port)
+
+        if old_process is not None:
+            manager.set_phase(uuid, 'draining')
+            manager.proxy.drain(old_port, manager.drain_timeout)
+            log.info(f'Shut down the previous server. port : {old_port}')
+            _terminate_process(old_process)
+
+        manager.complete_tasking(uuid)
+
+    log.info(f'That task has been completed. Completed task number : {uuid}',
+             extra={'service': manager.name, 'uuid': uuid})
@@ -0,0 +1,43 @@
+import threading
+
+from logger.log import create_logger
+
+log = create_logger('SC_Log', 'runner_manager.log')
+
+
+class DeployScheduler:
+    # 서비스마다 하나의 스레드가 계속 실행되며, 작업 목록(TaskRegistry)에서 실행 순서가 가장 앞선 작업을 하나씩 꺼내 실행합니다.
+    # 작업 목록 자체가 우선순위 대기열이므로, 작업 등록은 잠금 한 번과 대기 중인 스레드를 깨우는 것으로 끝납니다.
+    def __init__(self, tasks, run, name='default'):
+        self.tasks = tasks
+        # run(task) 는 작업을 끝낼 때까지 실행하고 complete 를 호출해야 합니다.
+        self._run = run
+        self.name = name
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        self._thread = threading.Thread(target=self.__loop, daemon=True)
+        self._thread.setName(f'UEC Scheduler ({self.name})')
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        # 진행 중인 작업이 끝나면 멈춥니다. 대기 중인 작업은 작업 기록에 남아 다음 실행 시 복구됩니다.
+        self.tasks.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def __loop(self):
+        while (task := self.tasks.claim_next()) is not None:
+            try:
+                self._run(task)
+            except Exception:
+                # 스레드가 끝나면 이후 작업이 실행되지 않으므로, 기록만 남기고 다음 작업을 계속 진행합니다.
+                log.exception(f'An unexpected error occurred while running the task. task number : {task.uuid}')
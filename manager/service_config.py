@@ -0,0 +1,78 @@
+import json
+import math
+import os
+
+# 서비스 설정 파일의 키 -> Manager 인자
+_KEYS = {
+    'name': 'name',
+    'save_dir': 'target_dir',
+    'port': 'server_port',
+    'maintenance_count': 'maintenance_count',
+    'maintenance_bytes': 'maintenance_bytes',
+    'maintenance_age': 'maintenance_age',
+    'command': 'command',
+    'coalesce': 'coalesce',
+    'ready_timeout': 'ready_timeout',
+    'health_path': 'health_path',
+    'internal_ports': 'internal_ports',
+    'drain_timeout': 'drain_timeout',
+    'restart_limit': 'restart_limit',
+    'backend_log': 'backend_log',
+    'validate': 'validate',
+    'ingest_quiet': 'ingest_quiet',
+    'peers': 'peers',
+    'quorum': 'quorum',
+}
+
+
+class ServiceConfigError(ValueError):
+    pass
+
+
+def load_service_configs(path, defaults=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    services = config.get('services') if isinstance(config, dict) else config
+    if not services:
+        raise ServiceConfigError(f'No services are defined in {path}.')
+
+    results = []
+    names = set()
+    # 저장 디렉토리 -> 서비스 이름. 감시, 색인, 작업 기록이 save_dir 단위이므로 서비스끼리 공유할 수 없습니다.
+    save_dirs = {}
+    # 포트 -> 서비스 이름. 내부 포트를 포함해 서비스끼리 같은 포트를 사용하면 서로의 백엔드를 종료하게 됩니다.
+    ports = {}
+    for service in services:
+        unknown = set(service) - set(_KEYS)
+        if unknown:
+            raise ServiceConfigError(f'Unknown service settings : {sorted(unknown)}')
+
+        for required in ('name', 'save_dir', 'port'):
+            if required not in service:
+                raise ServiceConfigError(f'The service setting "{required}" is required. : {service}')
+
+        if service['name'] in names:
+            raise ServiceConfigError(f'The service name "{service["name"]}" is duplicated.')
+        names.add(service['name'])
+
+        save_dir = os.path.abspath(service['save_dir'])
+        if save_dir in save_dirs:
+            raise ServiceConfigError(f'The services "{save_dirs[save_dir]}" and "{service["name"]}" '
+                                     f'use the same save_dir. : {save_dir}')
+        save_dirs[save_dir] = service['name']
+
+        kwargs = dict(defaults or {})
+        kwargs.update({_KEYS[key]: value for key, value in service.items()})
+
+        for port in {kwargs['server_port'], *(kwargs.get('internal_ports') or ())}:
+            if port in ports:
+                raise ServiceConfigError(f'The services "{ports[port]}" and "{service["name"]}" '
+                                         f'use the same port. : {port}')
+            ports[port] = service['name']
+
+        if kwargs.get('maintenance_count') is None:
+            kwargs['maintenance_count'] = math.inf
+        results.append(kwargs)
+
+    return results
@@ -18,11 +18,14 @@ async def registration(args: ArgumentParser.parse_args):
     service_name = 'Upload-Event-Control'
     port = f'--backend_port={args.backend_port}'
     save_dir = f'--save_dir={args.save_dir}'
+    py_args = [port, save_dir]
+    if args.config:
+        py_args.append(f'--config={os.path.abspath(args.config)}')
 
     if os.name == 'nt':
-        command = _window_reg_service('C:/nssm', service_name, app_location, port, save_dir)
+        command = _window_reg_service('C:/nssm', service_name, app_location, *py_args)
     else:
-        _ubuntu_write_servie(service_name, app_location, port, save_dir)
+        _ubuntu_write_servie(service_name, app_location, *py_args)
         service_file = f'{service_name}.service'
         command = [
             ['systemctl', 'stop', service_file],
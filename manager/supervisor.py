@@ -0,0 +1,201 @@
+import os
+import select
+import subprocess
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from logger.log import create_logger
+from manager.metrics import BACKEND_RESTARTS
+
+log = create_logger('SV_Log', 'runner_manager.log')
+
+DEFAULT_RESTART_LIMIT = 3
+# 이 시간 이상 종료되지 않고 실행된 JAR은 정상 버전(last known good)으로 기록합니다.
+STABLE_AFTER = 60
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+HISTORY_SIZE = 100
+
+
+def _pidfd(pid):
+    if not hasattr(os, 'pidfd_open'):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def _wait_exit(process, timeout=None):
+    # 프로세스가 종료되거나 timeout 이 지날 때까지 기다립니다. 종료되었으면 True 를 반환합니다.
+    # 리눅스에서는 pidfd 로 종료 이벤트를 기다리므로 주기적으로 상태를 확인하지 않습니다.
+    fd = _pidfd(process.pid)
+    if fd is not None:
+        try:
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            if not poller.poll(None if timeout is None else int(timeout * 1000)):
+                return False
+        finally:
+            os.close(fd)
+
+    try:
+        process.wait(timeout)
+        return True
+    except (subprocess.TimeoutExpired, psutil.TimeoutExpired):
+        return False
+    except psutil.NoSuchProcess:
+        return True
+
+
+def _exit_code(process):
+    if isinstance(process, subprocess.Popen):
+        return process.returncode
+    try:
+        return process.wait(0)
+    except (psutil.Error, subprocess.TimeoutExpired):
+        return None
+
+
+class Supervisor:
+    # UEC가 실행한 백엔드를 프로세스마다 하나의 대기 스레드로 지켜보고, 예기치 않게 종료되면 다시 실행합니다.
+    # 같은 JAR이 restart_limit 번 연속으로 STABLE_AFTER 안에 종료되면 마지막 정상 버전으로 되돌립니다.
+    def __init__(self, manager, launch, terminate, restart_limit=DEFAULT_RESTART_LIMIT, stable_after=STABLE_AFTER):
+        self.manager = manager
+        # launch(manager, jar, port) -> (process, error_message, has_error, elapsed), terminate(process)
+        self._launch = launch
+        self._terminate = terminate
+        self.restart_limit = restart_limit
+        self.stable_after = stable_after
+
+        self.last_known_good = None
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self._crashes = 0
+        self._crashed_jar = None
+
+    @property
+    def enabled(self):
+        return self.restart_limit > 0
+
+    def watch(self, process, jar, port=None):
+        if not self.enabled or process is None:
+            return
+
+        thread = threading.Thread(target=self.__wait, args=(process, jar, port), daemon=True)
+        thread.setName(f'UEC Supervisor ({self.manager.name}, {process.pid})')
+        thread.start()
+
+    def __wait(self, process, jar, port):
+        started_at = time.monotonic()
+        if not _wait_exit(process, self.stable_after):
+            self.__mark_stable(process, jar)
+            _wait_exit(process)
+
+        # 배포 과정에서 교체되거나 종료된 프로세스는 더 이상 관리 대상이 아닙니다.
+        if self.manager.backend is not process:
+            return
+
+        exit_code = _exit_code(process)
+        uptime = time.monotonic() - started_at
+        log.warning(f'The backend exited unexpectedly. exit code : {exit_code}, uptime : {uptime:.1f}s, jar : {jar}')
+        self.__restart(process, jar, port, exit_code, uptime)
+
+    def __mark_stable(self, process, jar):
+        with self._lock:
+            if self.manager.backend is process:
+                self.last_known_good = jar
+                if self._crashed_jar == jar:
+                    self._crashes = 0
+                    self._crashed_jar = None
+
+    def __record(self, jar, exit_code, action, downtime=None, message=None):
+        event = {
+            'time': time.time(),
+            'jar': os.path.basename(jar) if jar else None,
+            'exit_code': exit_code,
+            'action': action,
+            'downtime': None if downtime is None else round(downtime, 3),
+            'message': message,
+        }
+        with self._lock:
+            self.history.append(event)
+        return event
+
+    def __restart(self, process, jar, port, exit_code, uptime):
+        exited_at = time.monotonic()
+        target = jar
+
+        while True:
+            with self._lock:
+                if self._crashed_jar != target or uptime >= self.stable_after:
+                    self._crashes = 0
+                self._crashed_jar = target
+                self._crashes += 1
+                crashes = self._crashes
+
+            action = 'restarted'
+            if crashes > self.restart_limit:
+                if self.last_known_good and self.last_known_good != target and os.path.isfile(self.last_known_good):
+                    action, target = 'fallback', self.last_known_good
+                    log.warning(f'The backend crashed {crashes - 1} times in a row. '
+                                f'Fall back to the last known good version. : {target}')
+                else:
+                    self.__record(target, exit_code, 'gave_up', message=f'Crashed {crashes - 1} times in a row.')
+                    BACKEND_RESTARTS.labels(self.manager.name, 'gave_up').inc()
+                    log.error(f'The backend keeps crashing and no other version is available. jar : {target}')
+                    return
+
+            if action == 'restarted':
+                # 배포 잠금 밖에서 기다리므로, 그 사이 들어온 배포가 먼저 진행될 수 있습니다.
+                time.sleep(min(INITIAL_BACKOFF * 2 ** (crashes - 1), MAX_BACKOFF))
+
+            with self.manager.deploy_lock:
+                if self.manager.backend is not process:
+                    return
+                if len(self.manager.tasks):
+                    # 대기 중인 배포가 새 버전을 실행하므로 다시 실행하지 않습니다.
+                    self.__record(target, exit_code, 'deferred', message='A queued deploy will start the next server.')
+                    return
+
+                try:
+                    new_process, error_message, has_error, _ = self._launch(self.manager, target, port)
+                except FileNotFoundError as e:
+                    new_process, error_message, has_error = None, str(e), True
+
+                if not has_error:
+                    self.manager.track_backend(new_process, target, port)
+                    break
+
+                self._terminate(new_process)
+
+            self.__record(target, exit_code, f'{action}_failed', message=error_message)
+            BACKEND_RESTARTS.labels(self.manager.name, 'failed').inc()
+            log.error(f'The backend could not be started. action : {action}, reason : {error_message}')
+            exit_code = None if new_process is None else new_process.poll()
+            uptime = 0
+
+        if action == 'fallback':
+            with self._lock:
+                self._crashes = 0
+                self._crashed_jar = None
+
+        downtime = time.monotonic() - exited_at
+        self.__record(target, exit_code, action, downtime)
+        BACKEND_RESTARTS.labels(self.manager.name, action).inc()
+        log.info(f'The backend is running again. action : {action}, downtime : {downtime:.2f}s, jar : {target}')
+
+    def status(self):
+        backend = self.manager.backend
+        with self._lock:
+            return {
+                'jar': os.path.basename(self.manager.backend_jar) if self.manager.backend_jar else None,
+                'pid': backend.pid if backend is not None else None,
+                'port': self.manager.backend_port or self.manager.server_port,
+                'last_known_good': os.path.basename(self.last_known_good) if self.last_known_good else None,
+                'consecutive_crashes': self._crashes,
+                'restarts': list(self.history),
+            }
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from logger.log import create_logger
+
+log = create_logger('TJ_Log', 'uec.log')
+
+JOURNAL_FILE_NAME = '.uec_tasks.journal'
+# 기록된 줄 수가 살아있는 항목 수보다 이만큼 많아지면 현재 상태만 남기고 새로 씁니다.
+COMPACT_THRESHOLD = 4096
+
+ADD = 'add'
+FINISH = 'finish'
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+class TaskJournal:
+    # 작업의 등록과 종료를 save_dir 의 파일에 한 줄씩 덧붙여 기록합니다.
+    # UEC가 재시작되면 기록을 다시 읽어, 끝나지 않은 작업은 순서대로 다시 대기열에 넣고
+    # 끝난 작업은 /tasking 에서 그대로 조회되도록 합니다.
+    def __init__(self, target_dir, history_size=1024):
+        self.target_dir = target_dir
+        self.path = os.path.join(target_dir, JOURNAL_FILE_NAME)
+
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._buffer = []
+        # 버퍼에 넣은 기록 번호와 디스크에 반영된 기록 번호입니다.
+        self._written = 0
+        self._synced = 0
+
+        # 압축에 사용할 현재 상태입니다. uuid -> 기록
+        self._unfinished = OrderedDict()
+        self._finished = OrderedDict()
+        self._history_size = history_size
+        self._lines = 0
+
+        self._file = None
+        self._thread = None
+        # 파일에 쓰는 기록 스레드와 파일을 교체하는 압축 스레드가 함께 사용합니다.
+        self._file_lock = threading.Lock()
+        # 압축이 진행 중이면, 그동안 기존 파일에 덧붙인 기록 줄입니다.
+        self._compacting = None
+        self._compact_skip = 0
+
+    def __track(self, entry):
+        uuid = entry['uuid']
+        if entry['event'] == ADD:
+            self._unfinished[uuid] = entry
+        else:
+            added = self._unfinished.pop(uuid, None)
+            if added is not None:
+                # 끝난 작업도 어떤 파일을 배포했는지 조회할 수 있도록 등록 시의 경로를 함께 남깁니다.
+                entry = dict(entry, path=added['path'], artifact=added['artifact'])
+            self._finished[uuid] = entry
+            self._finished.move_to_end(uuid)
+            while len(self._finished) > self._history_size:
+                self._finished.popitem(last=False)
+        self._lines += 1
+
+    def replay(self):
+        start_time = time.perf_counter()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+
+        broken_tail = False
+        for number, line in enumerate(lines):
+            try:
+                self.__track(json.loads(line))
+            except (ValueError, KeyError):
+                # 기록 도중 종료되어 잘린 마지막 줄은 버립니다.
+                if number != len(lines) - 1:
+                    log.warning(f'A broken journal line was skipped. line : {number + 1}')
+                else:
+                    broken_tail = True
+
+        if lines and not lines[-1].endswith('\n'):
+            self.__repair_tail(lines[-1], broken_tail)
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self.__run, daemon=True, name='UEC Journal')
+        self._thread.start()
+
+        log.info(f'The task journal has been replayed in {(time.perf_counter() - start_time) * 1000:.1f}ms. '
+                 f'unfinished : {len(self._unfinished)}, finished : {len(self._finished)}')
+        return list(self._unfinished.values()), list(self._finished.values())
+
+    def __repair_tail(self, tail, broken):
+        # 줄바꿈 없이 끝난 마지막 줄 뒤에 바로 덧붙이면 다음 기록까지 깨지므로,
+        # 깨진 줄은 잘라내고 온전한 줄은 줄바꿈으로 끝냅니다.
+        with open(self.path, 'r+b') as f:
+            if broken:
+                f.truncate(os.path.getsize(self.path) - len(tail.encode('utf-8')))
+            else:
+                f.seek(0, os.SEEK_END)
+                f.write(b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __append(self, entry):
+        # 버퍼에 넣은 뒤 기다리지 않고 기록 번호를 반환합니다. 디스크 반영이 필요하면 sync(기록 번호) 로 기다립니다.
+        with self._lock:
+            self.__track(entry)
+            self._buffer.append(json.dumps(entry, ensure_ascii=False))
+            self._written += 1
+            self._flushed.notify_all()
+            return self._written
+
+    def add(self, uuid, path, artifact=None, priority=False):
+        entry = {'event': ADD, 'uuid': str(uuid), 'path': path, 'artifact': artifact, 'time': time.time()}
+        if priority:
+            entry['priority'] = True
+        return self.__append(entry)
+
+    def finish(self, uuid, status, message=None):
+        return self.__append({'event': FINISH, 'uuid': str(uuid), 'status': status, 'message': message,
+                              'time': time.time()})
+
+    def sync(self, number=None, timeout=None):
+        # 해당 기록(생략하면 지금까지 넣은 모든 기록)이 디스크에 반영될 때까지 기다립니다.
+        # 동시에 들어온 기록은 한 번의 fsync 로 함께 반영되며, 압축이 진행 중이어도 기다리는 시간은 늘어나지 않습니다.
+        with self._lock:
+            target = self._written if number is None else number
+            return self._flushed.wait_for(lambda: self._synced >= target, timeout)
+
+    # 이전 fsync 가 진행되는 동안 쌓인 기록을 모아 한 번의 fsync 로 반영합니다.
+    def __run(self):
+        while True:
+            with self._lock:
+                self._flushed.wait_for(lambda: self._buffer)
+                lines, self._buffer = self._buffer, []
+                target = self._written
+
+            with self._file_lock:
+                try:
+                    self._file.write('\n'.join(lines) + '\n')
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                except OSError as e:
+                    log.error(f'The task journal could not be written. : {e}')
+                if self._compacting is not None:
+                    # 압축 중인 파일에는 없는 기록이므로, 파일을 교체할 때 새 파일에도 덧붙입니다.
+                    # 스냅샷을 만들 때 버퍼에 있던 기록은 스냅샷에 이미 반영되어 있으므로 건너뜁니다.
+                    skip = min(self._compact_skip, len(lines))
+                    self._compact_skip -= skip
+                    self._compacting.extend(lines[skip:])
+
+            with self._lock:
+                self._synced = target
+                self._flushed.notify_all()
+                snapshot = None
+                if self._compacting is None and \
+                        self._lines > COMPACT_THRESHOLD + len(self._unfinished) + len(self._finished):
+                    snapshot = list(self._finished.values()) + list(self._unfinished.values()), self._lines
+                    self._compacting = []
+                    self._compact_skip = len(self._buffer)
+
+            if snapshot is not None:
+                threading.Thread(target=self.__compact, args=snapshot, daemon=True,
+                                 name='UEC Journal Compaction').start()
+
+    # 별도 스레드에서 현재 상태만 임시 파일에 기록하므로, 그동안에도 기록과 fsync 는 계속 진행됩니다.
+    # 파일을 교체할 때만 기록 스레드를 멈추고, 압축하는 동안 기존 파일에 덧붙여진 기록을 새 파일에도 덧붙입니다.
+    def __compact(self, entries, lines):
+        temp_path = f'{self.path}.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            log.error(f'The task journal could not be compacted. : {e}')
+            self.__remove_temp(temp_path)
+            with self._file_lock:
+                self._compacting = None
+            return
+
+        with self._file_lock:
+            try:
+                if self._compacting:
+                    with open(temp_path, 'a', encoding='utf-8') as f:
+                        f.write('\n'.join(self._compacting) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                self._file.close()
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                log.error(f'The task journal could not be compacted. : {e}')
+                self.__remove_temp(temp_path)
+                return
+            finally:
+                self._compacting = None
+                if self._file.closed:
+                    self._file = open(self.path, 'a', encoding='utf-8')
+
+        with self._lock:
+            # 스냅샷 이후에 추적된 줄은 새 파일에 덧붙여졌거나 아직 버퍼에 있습니다.
+            self._lines = len(entries) + self._lines - lines
+
+        log.debug(f'The task journal has been compacted. lines : {lines} -> {len(entries)}')
+
+    @staticmethod
+    def __remove_temp(temp_path):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def get_journal(target_dir):
+    key = os.path.abspath(target_dir)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = TaskJournal(key)
+            _journals[key] = journal
+        return journal
@@ -0,0 +1,292 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+QUEUED = 'queued'
+VALIDATING = 'validating'
+DEPLOYING = 'deploying'
+COMPLETED = 'completed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+UNKNOWN = 'unknown'
+
+FINISHED = (COMPLETED, FAILED, SKIPPED, UNKNOWN)
+RUNNING = (VALIDATING, DEPLOYING)
+IN_PROGRESS = (QUEUED, VALIDATING, DEPLOYING)
+
+CANCELLED_MESSAGE = 'cancelled'
+
+
+class Task:
+    __slots__ = ('uuid', 'path', 'artifact', 'seq', 'priority', 'held', 'cancel_requested', 'status', 'phase',
+                 'message', 'created_at', 'finished_at')
+
+    def __init__(self, uuid, path, artifact, seq, priority=False, held=False):
+        self.uuid = uuid
+        self.path = path
+        self.artifact = artifact
+        self.seq = seq
+        self.priority = priority
+        # 업로드 경로에서 파일이 게시되기 전에 등록된 작업입니다. 감시자가 파일을 감지하면 풀려 실행될 수 있습니다.
+        self.held = held
+        self.cancel_requested = False
+        self.status = QUEUED
+        self.phase = None
+        self.message = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    # 실행 순서입니다. 실행 중인 작업, 우선 작업, 일반 작업 순이며 같은 묶음 안에서는 등록 순서를 따릅니다.
+    @property
+    def rank(self):
+        return -1 if self.status in RUNNING else 0 if self.priority else 1, self.seq
+
+
+class TaskRegistry:
+    def __init__(self, history_size=1024):
+        self._lock = threading.Lock()
+        # 작업 상태, 단계, 대기 번호가 바뀔 때마다 깨워 long-poll 과 SSE 가 타이머 없이 응답하도록 합니다.
+        self._changed = threading.Condition(self._lock)
+        # 이벤트 루프에서 기다리는 long-poll, SSE 를 깨우는 함수입니다.
+        self._listeners = set()
+
+        # 대기 중이거나 배포 중인 작업입니다. 대기 번호는 정렬된 실행 순서(rank) 목록에서 이진 탐색으로 계산합니다.
+        self._pending = OrderedDict()
+        self._ranks = []
+        self._by_uuid = {}
+        # 아직 시작되지 않은 작업이 있는 아티팩트 -> 해당 작업의 seq
+        self._queued_artifacts = {}
+
+        self._history = OrderedDict()
+        self._history_size = history_size
+
+        self._next_seq = 0
+        self._closed = False
+
+    def __notify(self):
+        self._changed.notify_all()
+        for listener in self._listeners:
+            listener()
+
+    def __archive(self, task, status, message=None):
+        task.status = status
+        task.phase = None
+        task.message = message
+        task.finished_at = time.time()
+
+        self._by_uuid.pop(task.uuid, None)
+        self._history[task.uuid] = task
+        while len(self._history) > self._history_size:
+            self._history.popitem(last=False)
+
+    def __unrank(self, task):
+        del self._ranks[bisect.bisect_left(self._ranks, task.rank)]
+
+    # (새 작업, 대체된 작업 또는 None) 을 반환합니다.
+    # 우선 작업(priority)은 대기 중인 일반 작업보다 먼저 실행되며, 다른 작업을 대체하거나 대체되지 않습니다.
+    def add(self, uuid, path, artifact=None, coalesce=False, priority=False, held=False):
+        with self._lock:
+            coalesce = coalesce and not priority and artifact is not None
+            seq = self._queued_artifacts.get(artifact) if coalesce else None
+
+            if seq is not None:
+                # 같은 아티팩트의 대기 중인 작업을 대체합니다. 새 작업은 기존 작업의 자리를 그대로 이어받습니다.
+                superseded = self._pending[seq]
+                task = Task(uuid, path, artifact, seq, held=held)
+                self._pending[seq] = task
+                self.__archive(superseded, SKIPPED, f'superseded by {uuid}')
+            else:
+                task = Task(uuid, path, artifact, self._next_seq, priority, held)
+                self._next_seq += 1
+                self._pending[task.seq] = task
+                bisect.insort(self._ranks, task.rank)
+
+            self._by_uuid[uuid] = task
+            if artifact is not None and not priority:
+                self._queued_artifacts[artifact] = task.seq
+
+            self.__notify()
+            return task, superseded if seq is not None else None
+
+    # 재시작 전에 끝난 작업을 조회할 수 있도록 기록에 되살립니다.
+    def restore(self, uuid, path, artifact, status, message=None, finished_at=None):
+        with self._lock:
+            if uuid in self._by_uuid:
+                return
+            task = Task(uuid, path, artifact, -1)
+            self.__archive(task, status, message)
+            if finished_at is not None:
+                task.finished_at = finished_at
+
+    def release(self, uuid):
+        with self._lock:
+            task = self._by_uuid.get(uuid)
+            if task is None or not task.held:
+                return None
+            task.held = False
+            self.__notify()
+            return task
+
+    def __next_queued(self):
+        # 실행 순서 목록에서 실행 중인 작업 다음부터, 감지를 기다리는 작업을 건너뛰고 찾습니다.
+        for index in range(bisect.bisect_left(self._ranks, (0,)), len(self._ranks)):
+            task = self._pending[self._ranks[index][1]]
+            if not task.held:
+                return task
+        return None
+
+    # 실행 순서가 가장 앞선 대기 작업을 검증 중 상태로 바꿔 반환합니다. 대기 작업이 없으면 생길 때까지 기다리며,
+    # close() 가 호출되면 None 을 반환합니다.
+    def claim_next(self):
+        with self._changed:
+            while (task := self.__next_queued()) is None:
+                if self._closed:
+                    return None
+                self._changed.wait()
+            if self._closed:
+                return None
+
+            self.__unrank(task)
+            task.status = VALIDATING
+            bisect.insort(self._ranks, task.rank)
+            if self._queued_artifacts.get(task.artifact) == task.seq:
+                del self._queued_artifacts[task.artifact]
+
+            self.__notify()
+            return task
+
+    # 검증이 끝난 작업을 배포 중 상태로 바꿉니다. 검증 중에 취소되었으면 False 를 반환합니다.
+    def begin_deploy(self, uuid):
+        with self._lock:
+            task = self._by_uuid.get(uuid)
+            if task is None or task.status != VALIDATING or task.cancel_requested:
+                return False
+            task.status = DEPLOYING
+            self.__notify()
+            return True
+
+    # 대기 중인 작업은 바로 건너뛴 것으로 끝내고 반환합니다. 검증 중인 작업은 배포 전에 멈추도록 표시만 합니다.
+    # (작업, 상태) 를 반환하며, 배포가 이미 시작된 작업은 취소할 수 없습니다.
+    def cancel(self, uuid):
+        with self._lock:
+            task = self._by_uuid.get(uuid)
+            if task is None:
+                return None, self.__status(uuid)[0]
+
+            if task.status == VALIDATING:
+                task.cancel_requested = True
+                return task, task.status
+            if task.status != QUEUED:
+                return task, task.status
+
+            self.__remove(task, SKIPPED, CANCELLED_MESSAGE)
+            return task, SKIPPED
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self.__notify()
+
+    def set_phase(self, uuid, phase):
+        with self._lock:
+            task = self._by_uuid.get(uuid)
+            if task is not None and task.phase != phase:
+                task.phase = phase
+                self.__notify()
+
+    def complete(self, uuid, status=COMPLETED, message=None):
+        with self._lock:
+            task = self._by_uuid.get(uuid)
+            if task is None:
+                return None
+
+            self.__remove(task, status, message)
+            return task
+
+    def __remove(self, task, status, message):
+        del self._pending[task.seq]
+        self.__unrank(task)
+        if self._queued_artifacts.get(task.artifact) == task.seq:
+            del self._queued_artifacts[task.artifact]
+        self.__archive(task, status, message)
+        self.__notify()
+
+    def __status(self, uuid):
+        task = self._by_uuid.get(uuid)
+        if task is not None:
+            return task.status, bisect.bisect_left(self._ranks, task.rank), task.message, task.phase
+
+        task = self._history.get(uuid)
+        if task is not None:
+            return task.status, 0, task.message, None
+
+        return UNKNOWN, 0, None, None
+
+    def status(self, uuid) -> (str, int, str, str):
+        with self._lock:
+            return self.__status(uuid)
+
+    # 작업의 (상태, 대기 번호, 메시지, 단계) 가 previous 와 달라지거나 timeout 이 지날 때까지 기다립니다.
+    def wait_for_change(self, uuid, previous, timeout):
+        with self._changed:
+            self._changed.wait_for(lambda: self.__status(uuid) != previous, timeout)
+            return self.__status(uuid)
+
+    # wait_for_change 와 같지만 스레드를 붙잡지 않고 호출한 이벤트 루프에서 기다립니다.
+    async def wait_for_change_async(self, uuid, previous, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        changed = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                pass
+
+        with self._lock:
+            self._listeners.add(wake)
+        try:
+            while True:
+                changed.clear()
+                with self._lock:
+                    state = self.__status(uuid)
+                remaining = deadline - loop.time()
+                if state != previous or remaining <= 0:
+                    return state
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._listeners.discard(wake)
+
+    def get(self, uuid):
+        with self._lock:
+            return self._by_uuid.get(uuid) or self._history.get(uuid)
+
+    # 대기 중이거나 실행 중인 작업 중 가장 마지막에 실행될 작업입니다. 모든 작업이 끝나면 이 작업의 JAR 이 실행됩니다.
+    def last_pending(self):
+        with self._lock:
+            return self._pending[self._ranks[-1][1]] if self._ranks else None
+
+    def pending_paths(self):
+        with self._lock:
+            return [task.path for task in self._pending.values()]
+
+    # 파일 이름 -> 해당 파일을 배포한 작업 목록 (오래된 순)
+    def tasks_by_name(self):
+        with self._lock:
+            tasks = {}
+            for task in [*self._history.values(), *self._pending.values()]:
+                if task.path:
+                    tasks.setdefault(os.path.basename(task.path), []).append(task)
+            return tasks
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
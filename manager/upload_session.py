@@ -0,0 +1,278 @@
+import bisect
+import hashlib
+import os
+import threading
+import time
+import uuid
+from os.path import join as opj
+
+from logger.log import create_logger
+from manager.file_manager import TEMP_SUFFIX, _remove_quietly
+
+log = create_logger('US_Log', 'uec.log')
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+# 이 시간 동안 청크가 오지 않은 세션은 임시 파일과 함께 정리합니다.
+SESSION_TIMEOUT = 24 * 60 * 60
+# 세션 만료를 확인하는 간격입니다.
+EXPIRE_INTERVAL = 10 * 60
+
+
+class UploadSessionError(ValueError):
+    pass
+
+
+class ChecksumError(UploadSessionError):
+    pass
+
+
+class _Ranges:
+    # 받은 바이트 범위를 겹치지 않는 [start, end) 목록으로 유지합니다.
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+
+    def add(self, start, end):
+        index = bisect.bisect_left(self._ends, start)
+        last = bisect.bisect_right(self._starts, end)
+        if index < last:
+            start = min(start, self._starts[index])
+            end = max(end, self._ends[last - 1])
+        self._starts[index:last] = [start]
+        self._ends[index:last] = [end]
+
+    def remove(self, start, end):
+        index = bisect.bisect_right(self._ends, start)
+        last = bisect.bisect_left(self._starts, end)
+        kept = []
+        if index < last:
+            if self._starts[index] < start:
+                kept.append((self._starts[index], start))
+            if self._ends[last - 1] > end:
+                kept.append((end, self._ends[last - 1]))
+        self._starts[index:last] = [start for start, _ in kept]
+        self._ends[index:last] = [end for _, end in kept]
+
+    def received(self):
+        return sum(end - start for start, end in zip(self._starts, self._ends))
+
+    def missing(self, size):
+        gaps = []
+        position = 0
+        for start, end in zip(self._starts, self._ends):
+            if start > position:
+                gaps.append([position, start])
+            position = end
+        if position < size:
+            gaps.append([position, size])
+        return gaps
+
+    def to_list(self):
+        return [[start, end] for start, end in zip(self._starts, self._ends)]
+
+
+def _pwrite(fd, data, position):
+    if not hasattr(os, 'pwrite'):
+        # 윈도우에는 pwrite 가 없으므로, 위치 이동과 기록이 다른 청크와 섞이지 않도록 잠금 안에서 진행합니다.
+        with _seek_lock:
+            os.lseek(fd, position, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        return
+
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        position += written
+        view = view[written:]
+
+
+_seek_lock = threading.Lock()
+
+
+class UploadSession:
+    # 크기만큼 미리 할당한 save_dir 의 임시 파일에, 청크를 도착한 순서와 관계없이 자신의 위치에 바로 기록합니다.
+    # 모든 범위를 받은 뒤에 게시하므로, 연결이 끊겨도 받지 못한 범위만 다시 보내면 됩니다.
+    def __init__(self, service, save_dir, filename, size, digest=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.id = uuid.uuid4().hex
+        self.service = service
+        self.save_dir = save_dir
+        self.filename = filename
+        self.size = size
+        self.digest = digest.lower() if digest else None
+        self.chunk_size = chunk_size
+        self.path = opj(save_dir, f'.{self.id}{TEMP_SUFFIX}')
+        self.created_at = time.time()
+        self.updated_at = time.monotonic()
+
+        self._ranges = _Ranges()
+        self._lock = threading.Lock()
+        self._finalizing = False
+        self._writers = 0
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if hasattr(os, 'posix_fallocate') and size:
+                os.posix_fallocate(self._fd, 0, size)
+            else:
+                os.ftruncate(self._fd, size)
+        except OSError:
+            self.close()
+            raise
+
+    def write(self, offset, stream, length, checksum):
+        # 청크는 위치를 지정한 쓰기(pwrite)로 기록하므로 여러 청크를 동시에 받아도 서로 영향을 주지 않습니다.
+        # checksum 과 다르거나 도중에 끊긴 청크는 해당 범위를 받지 않은 것으로 되돌리므로, 같은 범위를 다시 보내야 합니다.
+        if offset < 0 or length <= 0 or offset + length > self.size:
+            raise UploadSessionError(
+                f'The chunk is out of range. offset : {offset}, length : {length}, size : {self.size}')
+        if length > MAX_CHUNK_SIZE:
+            raise UploadSessionError(f'The chunk is larger than {MAX_CHUNK_SIZE} bytes.')
+
+        with self._lock:
+            if self._finalizing:
+                raise UploadSessionError('The upload is already being finalized.')
+            self._writers += 1
+        try:
+            self.__write(offset, stream, length, checksum)
+        except BaseException:
+            with self._lock:
+                self._ranges.remove(offset, offset + length)
+            raise
+        else:
+            with self._lock:
+                self._ranges.add(offset, offset + length)
+                self.updated_at = time.monotonic()
+                return self._ranges.received()
+        finally:
+            with self._lock:
+                self._writers -= 1
+
+    def __write(self, offset, stream, length, checksum):
+        digest = hashlib.sha256()
+        position = offset
+        while position < offset + length:
+            data = stream.read(min(READ_SIZE, offset + length - position))
+            if not data:
+                raise UploadSessionError('The chunk ended before its Content-Length.')
+            digest.update(data)
+            _pwrite(self._fd, data, position)
+            position += len(data)
+
+        if digest.hexdigest() != checksum.lower():
+            raise ChecksumError(f'The chunk checksum does not match. offset : {offset}')
+
+    def status(self):
+        with self._lock:
+            return {
+                'id': self.id,
+                'service': self.service,
+                'filename': self.filename,
+                'size': self.size,
+                'chunk_size': self.chunk_size,
+                'received_bytes': self._ranges.received(),
+                'received': self._ranges.to_list(),
+                'missing': self._ranges.missing(self.size),
+            }
+
+    def complete(self):
+        with self._lock:
+            return self._ranges.received() == self.size
+
+    def finish(self):
+        # 모든 범위를 받았으면 sha256 을 계산합니다. 디스크 반영(fsync)은 게시할 때 publish_file 에서 합니다.
+        # 완료 요청은 한 번만 처리합니다. 진행 중이거나 이미 끝난 세션에 다시 요청하면 UploadSessionError 가 발생합니다.
+        with self._lock:
+            if self._finalizing or self._fd is None:
+                raise UploadSessionError('The upload is already being finalized.')
+            if self._ranges.received() != self.size:
+                raise UploadSessionError('Some ranges have not been received yet.')
+            if self._writers:
+                raise UploadSessionError('Some chunks are still being written.')
+            self._finalizing = True
+
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            while chunk := f.read(READ_SIZE):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+
+        if self.digest is not None and digest != self.digest:
+            with self._lock:
+                self._finalizing = False
+            raise ChecksumError(f'The uploaded file does not match the expected sha256. received : {digest}')
+
+        os.close(self._fd)
+        self._fd = None
+        return digest
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        _remove_quietly(self.path)
+
+
+class UploadSessions:
+    def __init__(self, timeout=SESSION_TIMEOUT, interval=EXPIRE_INTERVAL):
+        self.timeout = timeout
+        self.interval = min(interval, timeout)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        # 새 세션이 열리지 않아도 끊긴 세션의 임시 파일이 남지 않도록 주기적으로 만료를 확인합니다.
+        if self._thread is not None:
+            return self
+
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.setName('UEC Upload Sessions')
+        self._thread.start()
+        return self
+
+    def __run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.expire()
+            except Exception:
+                log.exception('An error occurred while expiring upload sessions.')
+
+    def open(self, service, save_dir, filename, size, digest=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.expire()
+        session = UploadSession(service, save_dir, filename, size, digest, min(chunk_size, MAX_CHUNK_SIZE))
+        with self._lock:
+            self._sessions[session.id] = session
+
+        log.info(f'An upload session has been opened. id : {session.id}, file : {filename}, size : {size}')
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def pop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def abort(self, session_id):
+        session = self.pop(session_id)
+        if session is None:
+            return False
+        session.close()
+        log.info(f'The upload session has been aborted. id : {session_id}')
+        return True
+
+    def expire(self):
+        deadline = time.monotonic() - self.timeout
+        with self._lock:
+            expired = [session for session in self._sessions.values() if session.updated_at < deadline]
+            for session in expired:
+                del self._sessions[session.id]
+
+        for session in expired:
+            log.info(f'The idle upload session has expired. id : {session.id}')
+            session.close()
@@ -0,0 +1,145 @@
+import bisect
+import os
+import re
+import threading
+
+from logger.log import create_logger
+
+log = create_logger('VI_Log', 'uec.log')
+
+_NAME_PATTERN = re.compile(r'^(?P<artifact>.+?)(?: v(?P<version>\d+))?(?P<extension>\.[^.]+)$')
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+# 'app v3.jar' -> ('app', 3), 'app.jar' -> ('app', 1)
+def parse_version(filename):
+    match = _NAME_PATTERN.match(filename)
+    if match is None:
+        return None, None
+
+    version = match['version']
+    return match['artifact'], int(version) if version else 1
+
+
+class VersionIndex:
+    def __init__(self, target_dir, extension='.jar'):
+        self.target_dir = target_dir
+        self.extension = extension
+
+        self._lock = threading.Lock()
+        # artifact -> [(version, filename)] 버전 오름차순
+        self._versions = {}
+        self._names = {}
+
+    def __is_target(self, filename):
+        return filename.endswith(self.extension) and not filename.startswith('.')
+
+    def scan(self):
+        with os.scandir(self.target_dir) as entries:
+            names = [entry.name for entry in entries if entry.is_file() and self.__is_target(entry.name)]
+
+        with self._lock:
+            self._versions.clear()
+            self._names.clear()
+            for name in names:
+                self.__add(name)
+
+        log.debug(f'The version index has been built. directory : {self.target_dir}, files : {len(names)}')
+        return self
+
+    def __add(self, filename):
+        if filename in self._names:
+            return False
+
+        artifact, version = parse_version(filename)
+        if artifact is None:
+            return False
+
+        bisect.insort(self._versions.setdefault(artifact, []), (version, filename))
+        self._names[filename] = (artifact, version)
+        return True
+
+    def add(self, filename):
+        filename = os.path.basename(filename)
+        if not self.__is_target(filename):
+            return False
+
+        with self._lock:
+            return self.__add(filename)
+
+    def discard(self, filename):
+        filename = os.path.basename(filename)
+        with self._lock:
+            key = self._names.pop(filename, None)
+            if key is None:
+                return False
+
+            artifact, version = key
+            versions = self._versions[artifact]
+            versions.pop(bisect.bisect_left(versions, (version, filename)))
+            if not versions:
+                del self._versions[artifact]
+            return True
+
+    # 업로드된 파일 이름에 대해 다음 버전의 이름을 결정하고 색인에 선점합니다.
+    def reserve_next(self, filename):
+        artifact, version = parse_version(filename)
+        if artifact is None:
+            return filename
+
+        with self._lock:
+            versions = self._versions.get(artifact)
+            if versions:
+                next_name = f'{artifact} v{versions[-1][0] + 1}{self.extension}'
+            else:
+                next_name = filename
+
+            self.__add(next_name)
+            return next_name
+
+    def artifact_of(self, filename):
+        return parse_version(os.path.basename(filename))[0]
+
+    def latest(self, artifact, count=1):
+        with self._lock:
+            versions = self._versions.get(artifact, [])
+            return [name for _, name in reversed(versions[-count:])] if count > 0 else []
+
+    # artifact -> [filename] 버전 오름차순의 복사본입니다.
+    def versions(self):
+        with self._lock:
+            return {artifact: [name for _, name in versions] for artifact, versions in self._versions.items()}
+
+    # 각 아티팩트의 최신 maintenance_count 개를 제외한, 삭제 대상 파일 이름을 반환합니다.
+    def evict(self, maintenance_count, ignores=None):
+        ignores = set(ignores or ())
+        remove_list = []
+
+        with self._lock:
+            for versions in self._versions.values():
+                if len(versions) <= maintenance_count:
+                    continue
+
+                excess = len(versions) - int(maintenance_count)
+                remove_list.extend(name for _, name in versions[:excess] if name not in ignores)
+
+        return remove_list
+
+    def count(self):
+        with self._lock:
+            return len(self._names)
+
+    def __len__(self):
+        return self.count()
+
+
+def get_index(target_dir, extension='.jar'):
+    key = (os.path.abspath(target_dir), extension)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = VersionIndex(key[0], extension).scan()
+            _indexes[key] = index
+        return index
@@ -0,0 +1,403 @@
+import asyncio
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote
+
+from logger.log import create_logger
+
+log = create_logger('AS_Log', 'uec.log')
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_KEEP_ALIVE = 15
+MAX_HEADER_SIZE = 64 * 1024
+READ_SIZE = 64 * 1024
+
+_DIGITS = re.compile(r'[0-9]+')
+
+# 이 서버가 WSGI environ 에 넣는 확장입니다.
+# PAUSE_KEY 가 있으면 응답 본문에서 Pause 를 내보낼 수 있습니다.
+# DEFER_KEY 는 Pause 를 받는 함수이며, 호출하면 앱이 반환한 응답을 버리고 기다림이 끝난 뒤 요청을 다시 처리합니다.
+# 다시 처리하는 요청의 environ 에는 RESUMED_KEY 가 True 로 들어 있습니다.
+PAUSE_KEY = 'uec.pause'
+DEFER_KEY = 'uec.defer'
+RESUMED_KEY = 'uec.resumed'
+
+
+class _BodyReader:
+    # WSGI 핸들러 스레드에서 호출되며, 요청 본문을 필요한 만큼만 소켓에서 읽어옵니다.
+    # 업로드가 메모리에 쌓이지 않고, 핸들러가 읽는 속도에 맞춰 흐름이 제어됩니다.
+    def __init__(self, loop, reader, writer, content_length=None, chunked=False, expect_continue=False):
+        self._loop = loop
+        self._reader = reader
+        self._writer = writer
+        self._remaining = content_length or 0
+        self._chunked = chunked
+        self._chunk_remaining = 0
+        self._expect_continue = expect_continue
+        self._buffer = b''
+        self.finished = not chunked and not content_length
+
+    async def __read_chunk(self, size):
+        if self._expect_continue:
+            self._expect_continue = False
+            self._writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            await self._writer.drain()
+
+        if self.finished:
+            return b''
+
+        if not self._chunked:
+            data = await self._reader.read(min(size, self._remaining))
+            if not data:
+                raise ConnectionError('The client closed the connection while sending the body.')
+            self._remaining -= len(data)
+            self.finished = self._remaining == 0
+            return data
+
+        if self._chunk_remaining == 0:
+            size_line = await self._reader.readuntil(b'\r\n')
+            self._chunk_remaining = int(size_line.split(b';', 1)[0], 16)
+            if self._chunk_remaining == 0:
+                # 트레일러는 사용하지 않으므로 빈 줄까지 버립니다.
+                while await self._reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                self.finished = True
+                return b''
+
+        data = await self._reader.read(min(size, self._chunk_remaining))
+        if not data:
+            raise ConnectionError('The client closed the connection while sending the body.')
+        self._chunk_remaining -= len(data)
+        if self._chunk_remaining == 0:
+            await self._reader.readexactly(2)
+        return data
+
+    def __fetch(self, size):
+        return asyncio.run_coroutine_threadsafe(self.__read_chunk(size), self._loop).result()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self._buffer]
+            self._buffer = b''
+            while data := self.__fetch(READ_SIZE):
+                parts.append(data)
+            return b''.join(parts)
+
+        if not self._buffer:
+            self._buffer = self.__fetch(max(size, READ_SIZE))
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        line = b''
+        while not line.endswith(b'\n') and (size < 0 or len(line) < size):
+            data = self.read(1 if size < 0 else min(1, size - len(line)))
+            if not data:
+                break
+            line += data
+        return line
+
+    def __iter__(self):
+        while line := self.readline():
+            yield line
+
+    # 응답 후 읽지 않은 본문을 버려 다음 요청을 읽을 수 있게 합니다.
+    # 100-continue 를 기다리는 클라이언트는 본문을 보내지 않으므로 연결을 유지할 수 없습니다.
+    async def drain(self):
+        if self._expect_continue and not self.finished:
+            return False
+
+        self._buffer = b''
+        while not self.finished:
+            await self.__read_chunk(READ_SIZE)
+        return True
+
+
+class Pause:
+    # WSGI 앱이 응답 본문 대신 내보내면, 서버는 작업 스레드와 동시 처리 수를 반납하고
+    # 이벤트 루프에서 wait() 가 반환한 코루틴을 기다린 뒤 다음 본문을 읽습니다.
+    # environ[PAUSE_KEY] 가 있을 때만 사용할 수 있습니다.
+    __slots__ = ('wait',)
+
+    def __init__(self, wait):
+        self.wait = wait
+
+
+class _ErrorStream:
+    def write(self, message):
+        log.error(message)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+
+class AsyncServer:
+    def __init__(self, wsgi_app, host='0.0.0.0', port=4074,
+                 concurrency=DEFAULT_CONCURRENCY, keep_alive=DEFAULT_KEEP_ALIVE):
+        self.wsgi_app = wsgi_app
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+
+        # 동시에 처리할 요청 수의 상한입니다. 초과한 요청은 소켓에서 대기합니다.
+        self._semaphore = None
+        self._concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='UEC HTTP')
+        self._loop = None
+
+    def serve_forever(self):
+        asyncio.run(self.__serve())
+
+    async def __serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        server = await asyncio.start_server(self.__handle_connection, self.host, self.port, limit=MAX_HEADER_SIZE)
+        log.info(f'The async server has started. Port : {self.port}, concurrency : {self._concurrency}')
+        async with server:
+            await server.serve_forever()
+
+    async def __handle_connection(self, reader, writer):
+        peer = writer.get_extra_info('peername') or ('', 0)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keep_alive)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request = self.__parse_head(head)
+                if request is not None:
+                    method, target, version, headers = request
+                    request = self.__build_environ(method, target, version, headers, reader, writer, peer)
+                if request is None:
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+
+                environ, body, keep_alive = request
+
+                keep_alive = await self.__run_app(_Exchange(self, environ, writer, version, keep_alive))
+
+                if not keep_alive or not await body.drain():
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __run_app(self, exchange):
+        # WSGI 호출과 응답 전송은 작업 스레드에서 진행하고, 앱이 Pause 로 기다림을 요청하면
+        # 스레드와 동시 처리 수를 반납한 채 이벤트 루프에서 기다립니다.
+        try:
+            while True:
+                async with self._semaphore:
+                    outcome = await self._loop.run_in_executor(self._executor, exchange.step)
+                if not isinstance(outcome, Pause):
+                    return outcome
+                try:
+                    await outcome.wait()
+                except Exception as e:
+                    log.error(f'An error occurred while waiting for the request. : {e}', exc_info=sys.exc_info())
+        except BaseException:
+            exchange.close()
+            raise
+
+    @staticmethod
+    def __parse_head(head):
+        try:
+            lines = head.decode('latin-1').split('\r\n')
+            method, target, version = lines[0].split(' ', 2)
+            headers = []
+            for line in lines[1:]:
+                if not line:
+                    continue
+                name, value = line.split(':', 1)
+                headers.append((name.strip(), value.strip()))
+        except ValueError:
+            return None
+        return method, target, version, headers
+
+    @staticmethod
+    def __parse_framing(headers):
+        # 본문의 길이를 정하는 헤더를 확인하고 (content_length, chunked) 를 반환합니다.
+        # 두 헤더가 함께 오거나 길이가 숫자가 아니면, 앞단 프록시와 본문의 끝을 다르게 해석할 수 있으므로
+        # (request smuggling) 잘못된 요청으로 보고 None 을 반환합니다.
+        lengths = {part.strip() for name, value in headers if name.lower() == 'content-length'
+                   for part in value.split(',')}
+        encodings = [value.lower() for name, value in headers if name.lower() == 'transfer-encoding']
+        if lengths and encodings:
+            return None
+        if len(lengths) > 1 or not all(_DIGITS.fullmatch(length) for length in lengths):
+            return None
+        chunked = any('chunked' in encoding for encoding in encodings)
+        return (int(lengths.pop()) if lengths else 0), chunked
+
+    def __build_environ(self, method, target, version, headers, reader, writer, peer):
+        path, _, query = target.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote(path, 'latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': version,
+            'REMOTE_ADDR': peer[0],
+            'REMOTE_PORT': str(peer[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': _ErrorStream(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            PAUSE_KEY: True,
+        }
+
+        connection = ''
+        for name, value in headers:
+            key = name.upper().replace('-', '_')
+            if key == 'CONNECTION':
+                connection = value.lower()
+            if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[key] = value
+            else:
+                key = f'HTTP_{key}'
+                environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+        framing = self.__parse_framing(headers)
+        if framing is None:
+            return None
+        content_length, chunked = framing
+        expect_continue = environ.get('HTTP_EXPECT', '').lower() == '100-continue'
+
+        body = _BodyReader(self._loop, reader, writer, content_length, chunked, expect_continue)
+        environ['wsgi.input'] = body
+        # 길이가 정해지지 않은 chunked 본문도 werkzeug 가 끝까지 읽도록 합니다.
+        environ['wsgi.input_terminated'] = chunked
+
+        if version == 'HTTP/1.1':
+            keep_alive = connection != 'close'
+        else:
+            keep_alive = connection == 'keep-alive'
+
+        return environ, body, keep_alive
+
+
+class _Exchange:
+    # 요청 하나의 WSGI 호출과 응답 전송 상태입니다. step() 은 작업 스레드에서 호출되며,
+    # 응답을 끝까지 보내면 연결 유지 여부를, 앱이 기다림을 요청하면 Pause 를 반환합니다.
+    def __init__(self, server, environ, writer, version, keep_alive):
+        self._app = server.wsgi_app
+        self._loop = server._loop
+        self._environ = environ
+        self._writer = writer
+        self._version = version
+        self._keep_alive = keep_alive
+
+        self._status = None
+        self._headers = None
+        self._sent = False
+        self._chunked = False
+        self._result = None
+        self._iterator = None
+
+    def step(self):
+        try:
+            return self.__begin() if self._iterator is None else self.__resume()
+        except ConnectionError:
+            self.close()
+            return False
+        except Exception as e:
+            log.error(f'An error occurred while handling the request. : {e}', exc_info=sys.exc_info())
+            self.close()
+            if not self._sent:
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+                try:
+                    self.__write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                                 f'Content-Length: 0\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+                except ConnectionError:
+                    pass
+            return False
+
+    def close(self):
+        result, self._result, self._iterator = self._result, None, None
+        if hasattr(result, 'close'):
+            result.close()
+
+    def __begin(self):
+        deferred = []
+        environ = dict(self._environ, **{DEFER_KEY: deferred.append})
+        self._result = self._app(environ, self.__start_response)
+
+        if deferred:
+            # 앱이 반환한 응답은 보내지 않고, 기다림이 끝나면 같은 요청을 다시 처리합니다.
+            self.close()
+            self._status = self._headers = None
+            self._environ[RESUMED_KEY] = True
+            return Pause(deferred[-1])
+
+        self._iterator = iter(self._result)
+        return self.__resume()
+
+    def __resume(self):
+        for data in self._iterator:
+            if isinstance(data, Pause):
+                return data
+            self.__send(data)
+
+        if not self._sent:
+            self.__send_head()
+        if self._chunked:
+            self.__write(b'0\r\n\r\n')
+        self.close()
+        return self._keep_alive
+
+    def __start_response(self, status, response_headers, exc_info=None):
+        if exc_info and self._sent:
+            raise exc_info[1].with_traceback(exc_info[2])
+        self._status = status
+        self._headers = response_headers
+        return self.__send
+
+    def __send_head(self):
+        headers = self._headers
+        names = {name.lower() for name, _ in headers}
+
+        if 'content-length' not in names:
+            if self._version == 'HTTP/1.1':
+                self._chunked = True
+                headers = headers + [('Transfer-Encoding', 'chunked')]
+            else:
+                self._keep_alive = False
+
+        headers = headers + [('Connection', 'keep-alive' if self._keep_alive else 'close')]
+        lines = [f'HTTP/1.1 {self._status}'] + [f'{name}: {value}' for name, value in headers]
+        self.__write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        self._sent = True
+
+    def __send(self, data):
+        if not self._sent:
+            self.__send_head()
+        if not data:
+            return
+        if self._chunked:
+            data = f'{len(data):X}\r\n'.encode('latin-1') + data + b'\r\n'
+        self.__write(data)
+
+    def __write(self, data):
+        async def write():
+            self._writer.write(data)
+            await self._writer.drain()
+
+        asyncio.run_coroutine_threadsafe(write(), self._loop).result()
+
+
+def serve(wsgi_app, host='0.0.0.0', port=4074, concurrency=DEFAULT_CONCURRENCY, keep_alive=DEFAULT_KEEP_ALIVE):
+    AsyncServer(wsgi_app, host, port, concurrency, keep_alive).serve_forever()
@@ -0,0 +1,59 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from server.async_server import AsyncServer
+
+
+def _app(environ, start_response):
+    body = environ['wsgi.input'].read()
+    start_response('200 OK', [('Content-Length', str(len(body)))])
+    return [body]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope='module')
+def port():
+    port = _free_port()
+    threading.Thread(target=AsyncServer(_app, '127.0.0.1', port, concurrency=4).serve_forever, daemon=True).start()
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return port
+        except OSError:
+            time.sleep(0.05)
+    pytest.fail('The server did not start.')
+
+
+def _request(port, raw):
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as s:
+        s.sendall(raw)
+        response = b''
+        while chunk := s.recv(65536):
+            response += chunk
+    return response
+
+
+def test_request_with_content_length_is_served(port):
+    response = _request(port, b'POST / HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\nhello')
+    assert response.startswith(b'HTTP/1.1 200')
+    assert response.endswith(b'hello')
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-1', b'+5', b'5, 6'])
+def test_invalid_content_length_is_rejected(port, length):
+    response = _request(port, b'POST / HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\nhello')
+    assert response.startswith(b'HTTP/1.1 400')
+
+
+def test_content_length_with_transfer_encoding_is_rejected(port):
+    response = _request(port, b'POST / HTTP/1.1\r\nContent-Length: 5\r\nTransfer-Encoding: chunked\r\n\r\n'
+                              b'5\r\nhello\r\n0\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 400')
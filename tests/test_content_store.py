@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from uuid import uuid4
+
+from manager import content_store
+from manager.content_store import STORE_FILE_NAME, ContentStore
+
+
+def _store(tmp_path, *names):
+    for name in names:
+        (tmp_path / name).write_bytes(b'jar')
+    return ContentStore(str(tmp_path)).load()
+
+
+def test_record_and_lookup(tmp_path):
+    store = _store(tmp_path, 'app.jar')
+    task = uuid4()
+
+    store.record('aa', 'app.jar', task)
+
+    assert store.lookup('aa') == ('app.jar', task)
+    assert store.lookup('bb') == (None, None)
+    assert store.digest_of('/save/app.jar') == 'aa'
+
+
+def test_record_moves_digest_to_new_name(tmp_path):
+    store = _store(tmp_path, 'app.jar', 'app v2.jar')
+
+    store.record('aa', 'app.jar', uuid4())
+    store.record('aa', 'app v2.jar', uuid4())
+
+    assert store.lookup('aa')[0] == 'app v2.jar'
+    assert store.digest_of('app.jar') is None
+
+
+def test_discard_forgets_the_file(tmp_path):
+    store = _store(tmp_path, 'app.jar')
+    store.record('aa', 'app.jar', uuid4())
+
+    assert store.discard('app.jar') is True
+    assert store.discard('app.jar') is False
+    assert store.lookup('aa') == (None, None)
+
+
+def test_discard_without_waiting_saves_in_the_background(tmp_path, monkeypatch):
+    store = _store(tmp_path, 'app.jar', 'app v2.jar')
+    store.record('aa', 'app.jar', uuid4())
+    store.record('bb', 'app v2.jar', uuid4())
+    saved = threading.Event()
+    fsync = content_store.os.fsync
+
+    def slow_fsync(fd):
+        saved.wait(5)
+        fsync(fd)
+    monkeypatch.setattr(content_store.os, 'fsync', slow_fsync)
+
+    started = time.monotonic()
+    assert store.discard('/save/app.jar', wait=False) is True
+    assert time.monotonic() - started < 1
+    assert store.lookup('aa') == (None, None)
+    # 저장이 끝나지 않아도 조회는 기다리지 않습니다.
+    time.sleep(0.1)
+    started = time.monotonic()
+    assert store.lookup('bb')[0] == 'app v2.jar'
+    assert time.monotonic() - started < 1
+
+    saved.set()
+    for _ in range(100):
+        if 'aa' not in json.loads((tmp_path / STORE_FILE_NAME).read_text()):
+            break
+        time.sleep(0.05)
+    assert list(json.loads((tmp_path / STORE_FILE_NAME).read_text())) == ['bb']
+
+
+def test_load_skips_entries_of_deleted_files(tmp_path):
+    store = _store(tmp_path, 'app.jar', 'app v2.jar')
+    kept = uuid4()
+    store.record('aa', 'app.jar', uuid4())
+    store.record('bb', 'app v2.jar', kept)
+    (tmp_path / 'app.jar').unlink()
+
+    reloaded = ContentStore(str(tmp_path)).load()
+
+    assert reloaded.lookup('aa') == (None, None)
+    assert reloaded.lookup('bb') == ('app v2.jar', kept)
+
+
+def test_broken_hash_map_is_rebuilt(tmp_path):
+    (tmp_path / STORE_FILE_NAME).write_text('{broken', encoding='utf-8')
+
+    store = _store(tmp_path, 'app.jar')
+    store.record('aa', 'app.jar', uuid4())
+
+    assert list(json.loads((tmp_path / STORE_FILE_NAME).read_text(encoding='utf-8'))) == ['aa']
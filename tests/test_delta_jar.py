@@ -0,0 +1,82 @@
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from manager.delta_jar import DeltaError, apply_delta, make_delta, rebuilt_digest
+
+
+def _jar(path, entries):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as jar:
+        for name, data in entries.items():
+            jar.writestr(name, data)
+    return path
+
+
+def _entries(jar):
+    with zipfile.ZipFile(jar) as archive:
+        return {info.filename: archive.read(info) for info in archive.infolist()}
+
+
+@pytest.fixture
+def jars(tmp_path):
+    base = _jar(tmp_path / 'app.jar', {
+        'META-INF/MANIFEST.MF': b'Manifest-Version: 1.0\n',
+        'com/app/Main.class': b'main v1' * 100,
+        'com/app/Removed.class': b'removed',
+        'application.yml': b'port: 8080\n',
+    })
+    new = _jar(tmp_path / 'app v2.jar', {
+        'META-INF/MANIFEST.MF': b'Manifest-Version: 1.0\n',
+        'com/app/Main.class': b'main v2' * 100,
+        'application.yml': b'port: 8080\n',
+        'com/app/Added.class': b'added',
+    })
+    return base, new
+
+
+def test_delta_contains_only_changed_entries(jars):
+    base, new = jars
+    delta = io.BytesIO()
+
+    deleted = make_delta(base, new, delta)
+
+    assert deleted == ['com/app/Removed.class']
+    assert set(_entries(delta)) == {'com/app/Main.class', 'com/app/Added.class'}
+
+
+def test_apply_delta_rebuilds_new_jar(jars, tmp_path):
+    base, new = jars
+    delta = io.BytesIO()
+    deleted = make_delta(base, new, delta)
+    rebuilt = tmp_path / 'rebuilt.jar'
+
+    with open(rebuilt, 'wb') as out:
+        counts = apply_delta(base, delta, deleted, out)
+
+    assert counts == {'copied': 2, 'replaced': 1, 'added': 1, 'deleted': 1}
+    assert _entries(rebuilt) == _entries(new)
+    with zipfile.ZipFile(rebuilt) as archive:
+        assert archive.testzip() is None
+
+
+def test_rebuilt_digest_matches_rebuilt_file(jars, tmp_path):
+    base, new = jars
+    delta = io.BytesIO()
+    deleted = make_delta(base, new, delta)
+    rebuilt = tmp_path / 'rebuilt.jar'
+    with open(rebuilt, 'wb') as out:
+        apply_delta(base, delta, deleted, out)
+
+    data = rebuilt.read_bytes()
+    assert rebuilt_digest(base, delta, deleted) == (hashlib.sha256(data).hexdigest(), len(data))
+
+
+def test_apply_delta_rejects_broken_base(jars, tmp_path):
+    _, new = jars
+    broken = tmp_path / 'broken.jar'
+    broken.write_bytes(b'not a jar')
+
+    with open(new, 'rb') as delta, pytest.raises(DeltaError):
+        apply_delta(broken, delta, [], io.BytesIO())
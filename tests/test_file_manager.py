@@ -0,0 +1,55 @@
+import hashlib
+
+import pytest
+
+from manager import file_manager
+from manager.file_manager import publish_upload
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    paths = []
+    fsync_file = file_manager._fsync_file
+
+    def record(path):
+        paths.append(path)
+        fsync_file(path)
+    monkeypatch.setattr(file_manager, '_fsync_file', record)
+    return paths
+
+
+def _upload(tmp_path, name, data):
+    temp = tmp_path / f'.{name}.part'
+    temp.write_bytes(data)
+    return str(temp), hashlib.sha256(data).hexdigest()
+
+
+def test_published_upload_is_synced_before_it_is_renamed(tmp_path, synced):
+    temp, digest = _upload(tmp_path, 'first', b'jar')
+
+    uuid, ok, duplicate = publish_upload(str(tmp_path), temp, 'app.jar', digest)
+
+    assert (ok, duplicate) == (True, False)
+    assert synced == [temp]
+    assert (tmp_path / 'app.jar').read_bytes() == b'jar'
+
+
+def test_duplicate_upload_is_discarded_without_fsync(tmp_path, synced):
+    temp, digest = _upload(tmp_path, 'first', b'jar')
+    uuid, _, _ = publish_upload(str(tmp_path), temp, 'app.jar', digest)
+    synced.clear()
+
+    temp, digest = _upload(tmp_path, 'second', b'jar')
+    assert publish_upload(str(tmp_path), temp, 'app.jar', digest) == (uuid, True, True)
+
+    assert synced == []
+    assert not (tmp_path / '.second.part').exists()
+
+
+def test_duplicate_upload_is_published_without_dedup(tmp_path, synced):
+    for name in ('first', 'second'):
+        temp, digest = _upload(tmp_path, name, b'jar')
+        assert publish_upload(str(tmp_path), temp, 'app.jar', digest, dedup=False)[1:] == (True, False)
+
+    assert len(synced) == 2
+    assert sorted(path.name for path in tmp_path.glob('*.jar')) == ['app v2.jar', 'app.jar']
@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from manager import ingest
+from manager.ingest import DirectoryIngest, is_temp_name
+
+
+class _Events:
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def ready(self, path):
+        self.queue.put(('ready', path, time.monotonic()))
+
+    def dropped(self, path):
+        self.queue.put(('dropped', path, time.monotonic()))
+
+    def next(self, timeout=3):
+        return self.queue.get(timeout=timeout)
+
+    def empty(self, wait):
+        try:
+            self.queue.get(timeout=wait)
+        except queue.Empty:
+            return True
+        return False
+
+
+@pytest.fixture
+def events():
+    return _Events()
+
+
+def _ingest(events, quiet=0.3):
+    return DirectoryIngest(events.ready, events.dropped, quiet=quiet, name='test').start()
+
+
+@pytest.mark.parametrize('name, temp', [
+    ('app.jar', False),
+    ('.app.jar.Xa12bc', True),
+    ('.0123.part', True),
+    ('app.jar.crdownload', True),
+    ('app.jar~', True),
+    ('APP.JAR.TMP', True),
+])
+def test_is_temp_name(name, temp):
+    assert is_temp_name(f'/save/{name}') is temp
+
+
+def test_closed_file_is_ready_after_the_close_debounce(tmp_path, events):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    started = time.monotonic()
+
+    _ingest(events, quiet=5).closed(str(path))
+
+    kind, got, at = events.next()
+    assert (kind, got) == ('ready', str(path))
+    assert at - started < 1
+
+
+def test_repeated_events_are_handled_once(tmp_path, events):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    target = _ingest(events)
+
+    for _ in range(10):
+        target.touch(str(path))
+    target.closed(str(path))
+
+    assert events.next()[:2] == ('ready', str(path))
+    assert events.empty(0.5)
+    assert len(target) == 0
+
+
+def test_file_without_close_event_waits_until_it_stops_changing(tmp_path, events):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'j')
+    target = _ingest(events, quiet=0.2)
+    target.touch(str(path))
+
+    def grow():
+        for _ in range(3):
+            time.sleep(0.15)
+            with open(path, 'ab') as f:
+                f.write(b'ar')
+    writer = threading.Thread(target=grow)
+    writer.start()
+    writer.join()
+    finished = time.monotonic()
+
+    kind, got, at = events.next()
+    assert (kind, got) == ('ready', str(path))
+    assert at >= finished
+    assert path.read_bytes() == b'jararar'
+
+
+def test_file_removed_before_it_is_ready_is_dropped(tmp_path, events, monkeypatch):
+    monkeypatch.setattr(ingest, 'CLOSE_DEBOUNCE', 0.3)
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+
+    _ingest(events).closed(str(path))
+    path.unlink()
+
+    assert events.next()[:2] == ('dropped', str(path))
+
+
+def test_discard_forgets_a_pending_file(tmp_path, events):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    target = _ingest(events)
+    target.touch(str(path))
+
+    assert target.discard(str(path)) is True
+    assert target.discard(str(path)) is False
+    assert events.empty(0.8)
@@ -0,0 +1,64 @@
+import zipfile
+
+from manager.jar_validator import JarValidator, validate_jar
+
+MANIFEST = 'Manifest-Version: 1.0\nMain-Class: com.app.Main\n\n'
+
+
+def _jar(path, manifest=MANIFEST, entries=None):
+    with zipfile.ZipFile(path, 'w') as jar:
+        if manifest is not None:
+            jar.writestr('META-INF/MANIFEST.MF', manifest)
+        for name, data in (entries or {'com/app/Main.class': b'class' * 100}).items():
+            jar.writestr(name, data)
+    return str(path)
+
+
+def test_valid_jar(tmp_path):
+    assert validate_jar(_jar(tmp_path / 'app.jar')) == (True, None)
+
+
+def test_spring_boot_start_class_split_over_lines(tmp_path):
+    manifest = 'Manifest-Version: 1.0\nMain-Class: org.springframework.boot.loader.\n JarLauncher\n\nName: x\n'
+    assert validate_jar(_jar(tmp_path / 'app.jar', manifest))[0] is True
+
+    # main 속성은 첫 빈 줄 전까지만 읽습니다.
+    manifest = 'Manifest-Version: 1.0\n\nStart-Class: com.app.Main\n'
+    assert validate_jar(_jar(tmp_path / 'section.jar', manifest))[0] is False
+
+
+def test_missing_manifest_or_main_class(tmp_path):
+    ok, message = validate_jar(_jar(tmp_path / 'none.jar', manifest=None))
+    assert not ok and 'MANIFEST.MF does not exist' in message
+
+    ok, message = validate_jar(_jar(tmp_path / 'main.jar', manifest='Manifest-Version: 1.0\n'))
+    assert not ok and 'Main-Class' in message
+
+
+def test_corrupt_entry_fails_crc_check(tmp_path):
+    path = tmp_path / 'app.jar'
+    _jar(path, entries={f'com/app/C{number}.class': bytes([65 + number]) * 4096 for number in range(4)})
+    data = path.read_bytes()
+    position = data.index(b'C' * 4096) + 100
+    path.write_bytes(data[:position] + b'X' + data[position + 1:])
+
+    ok, message = validate_jar(str(path))
+
+    assert not ok and 'corrupt' in message
+
+
+def test_not_a_zip_file(tmp_path):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'not a jar')
+
+    assert validate_jar(str(path))[0] is False
+
+
+def test_validator_returns_submitted_result(tmp_path):
+    validator = JarValidator()
+    good, bad = _jar(tmp_path / 'good.jar'), _jar(tmp_path / 'bad.jar', manifest=None)
+    validator.submit(good)
+
+    assert validator.result(good) == (True, None)
+    assert validator.result(bad)[0] is False
+    assert JarValidator(enabled=False).result(bad) == (True, None)
@@ -0,0 +1,60 @@
+import json
+import logging
+import sys
+
+from logger import log
+from logger.log import TEXT_FORMAT, JsonFormatter, _LoggerQueueHandler, _Router
+
+
+def _prepared(exc_info=True):
+    logger = logging.getLogger('test_log')
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = logger.makeRecord('test_log', logging.ERROR, __file__, 1, 'failed : %s', ('app.jar',),
+                                   sys.exc_info() if exc_info else None)
+    return _LoggerQueueHandler('test.log', logging.DEBUG, logging.INFO).prepare(record)
+
+
+def test_json_format_keeps_the_exception():
+    entry = json.loads(JsonFormatter().format(_prepared()))
+    assert entry['message'] == 'failed : app.jar'
+    assert 'ZeroDivisionError' in entry['exception']
+
+
+def test_text_format_appends_the_exception():
+    text = logging.Formatter(TEXT_FORMAT).format(_prepared())
+    assert 'failed : app.jar' in text
+    assert 'ZeroDivisionError' in text
+
+
+def test_json_format_without_exception():
+    entry = json.loads(JsonFormatter().format(_prepared(exc_info=False)))
+    assert 'exception' not in entry
+
+
+def test_file_only_logger_skips_the_console(monkeypatch):
+    router = _Router()
+    written = []
+    monkeypatch.setattr(router.console, 'handle', written.append)
+    monkeypatch.setattr(log, '_file_handlers', {})
+
+    for console_level in (None, logging.DEBUG):
+        record = logging.LogRecord('test_log', logging.INFO, __file__, 1, 'line', None, None)
+        router.handle(_LoggerQueueHandler('test.log', logging.DEBUG, console_level).prepare(record))
+
+    assert len(written) == 1
+    assert written[0].uec_console_level == logging.DEBUG
+
+
+def test_set_console_level_keeps_file_only_loggers(monkeypatch):
+    monkeypatch.setattr(log, '_loggers', {})
+    for name, console_level in (('test_file_only', None), ('test_console', logging.INFO)):
+        logger = logging.Logger(name)
+        logger.addHandler(_LoggerQueueHandler('test.log', logging.DEBUG, console_level))
+        log._loggers[name] = logger
+
+    log.set_console_level(logging.DEBUG)
+
+    assert log._loggers['test_file_only'].handlers[0].console_level is None
+    assert log._loggers['test_console'].handlers[0].console_level == logging.DEBUG
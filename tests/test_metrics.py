@@ -0,0 +1,60 @@
+import pytest
+
+from manager.metrics import Counter, Gauge, Histogram, render
+
+
+def test_counter_renders_each_label_set():
+    counter = Counter('test_uploads_total', 'Uploads.', ('service', 'result'))
+    counter.labels('api', 'published').inc()
+    counter.labels('api', 'published').inc(2)
+    counter.labels('web', 'failed').inc()
+
+    assert counter.render() == [
+        '# HELP test_uploads_total Uploads.',
+        '# TYPE test_uploads_total counter',
+        'test_uploads_total{service="api",result="published"} 3',
+        'test_uploads_total{service="web",result="failed"} 1',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter('test_escape_total', 'Escaping.', ('name',))
+    counter.labels('a "b"\\c\nd').inc()
+
+    assert counter.render()[-1] == 'test_escape_total{name="a \\"b\\"\\\\c\\nd"} 1'
+
+
+def test_wrong_label_count_is_rejected():
+    counter = Counter('test_labels_total', 'Labels.', ('service',))
+
+    with pytest.raises(ValueError):
+        counter.labels('api', 'extra')
+
+
+def test_gauge_function_is_read_at_render_time():
+    gauge = Gauge('test_queue_depth', 'Queue depth.', ('service',))
+    depth = [1]
+    gauge.labels('api').set_function(lambda: depth[0])
+    depth[0] = 4
+
+    assert gauge.render()[-1] == 'test_queue_depth{service="api"} 4'
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_duration_seconds', 'Durations.', ('service',), buckets=(1, 0.1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.labels('api').observe(value)
+
+    assert histogram.render()[2:] == [
+        'test_duration_seconds_bucket{service="api",le="0.1"} 2',
+        'test_duration_seconds_bucket{service="api",le="1"} 3',
+        'test_duration_seconds_bucket{service="api",le="+Inf"} 4',
+        'test_duration_seconds_sum{service="api"} 3.65',
+        'test_duration_seconds_count{service="api"} 4',
+    ]
+
+
+def test_render_includes_registered_metrics():
+    Counter('test_render_total', 'Rendered.').labels().inc()
+
+    assert 'test_render_total 1\n' in render()
@@ -0,0 +1,125 @@
+import asyncio
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from manager import proxy as proxy_module
+from manager.proxy import TcpProxy
+
+
+class _Tagged(socketserver.BaseRequestHandler):
+    # 받은 데이터 앞에 백엔드 이름을 붙여 돌려줍니다.
+    def handle(self):
+        while data := self.request.recv(1024):
+            self.request.sendall(self.server.tag + data)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def backends():
+    servers = []
+    for tag in (b'blue:', b'green:'):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _Tagged)
+        server.daemon_threads = True
+        server.tag = tag
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    yield [server.server_address[1] for server in servers]
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def proxy():
+    proxy = TcpProxy(_free_port(), host='127.0.0.1').start()
+    assert proxy.bind() is True
+    return proxy
+
+
+def _connect(proxy):
+    return socket.create_connection(('127.0.0.1', proxy.listen_port), timeout=5)
+
+
+def _echo(connection, data=b'ping'):
+    connection.sendall(data)
+    return connection.recv(1024)
+
+
+def test_new_connections_follow_switch_while_open_ones_stay(proxy, backends):
+    blue, green = backends
+    proxy.switch(blue)
+    old = _connect(proxy)
+    assert _echo(old) == b'blue:ping'
+
+    proxy.switch(green)
+    with _connect(proxy) as new:
+        assert _echo(new) == b'green:ping'
+    # 전환 전에 맺어진 연결은 기존 백엔드로 계속 전달됩니다.
+    assert _echo(old) == b'blue:ping'
+    old.close()
+
+
+def test_drain_waits_for_open_connections(proxy, backends):
+    blue, green = backends
+    proxy.switch(blue)
+    connection = _connect(proxy)
+    _echo(connection)
+    proxy.switch(green)
+
+    assert proxy.active(blue) == 1
+    assert proxy.drain(blue, timeout=0.2) is False
+
+    threading.Timer(0.1, connection.close).start()
+    assert proxy.drain(blue, timeout=5) is True
+    assert proxy.active(blue) == 0
+
+
+def test_connection_is_closed_without_target(proxy):
+    with _connect(proxy) as connection:
+        assert connection.recv(1024) == b''
+
+
+def test_bind_fails_when_port_is_taken():
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        proxy = TcpProxy(taken.getsockname()[1], host='127.0.0.1').start()
+
+        assert proxy.bind() is False
+        assert proxy.bound is False
+
+
+def test_connection_accepted_before_switch_is_drained(proxy, backends, monkeypatch, request):
+    blue, green = backends
+    connecting = threading.Event()
+    release = threading.Event()
+    request.addfinalizer(release.set)
+    open_connection = asyncio.open_connection
+
+    # 백엔드에 연결하는 도중에 switch() 가 호출되는 경우를 만듭니다.
+    async def slow_open_connection(*args, **kwargs):
+        connecting.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return await open_connection(*args, **kwargs)
+
+    monkeypatch.setattr(proxy_module.asyncio, 'open_connection', slow_open_connection)
+    proxy.switch(blue)
+    connection = _connect(proxy)
+    assert connecting.wait(5)
+
+    proxy.switch(green)
+    assert proxy.active(blue) == 1
+    assert proxy.drain(blue, timeout=0.2) is False
+
+    release.set()
+    assert _echo(connection) == b'blue:ping'
+    connection.close()
+    assert proxy.drain(blue, timeout=5) is True
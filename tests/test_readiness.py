@@ -0,0 +1,113 @@
+import socket
+import subprocess
+import sys
+import textwrap
+
+import psutil
+import pytest
+
+from manager.readiness import wait_until_ready
+
+SERVER = textwrap.dedent('''
+    import http.server, sys, time
+    time.sleep(float(sys.argv[2]))
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == '/health' else 404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    http.server.HTTPServer(('127.0.0.1', int(sys.argv[1])), Handler).serve_forever()
+''')
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def spawn():
+    processes = []
+
+    def start(*args):
+        process = subprocess.Popen([sys.executable, *args])
+        processes.append(process)
+        return process
+
+    yield start
+    for process in processes:
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            children = []
+        for child in [*children, process]:
+            child.kill()
+        process.wait()
+
+
+def test_ready_as_soon_as_port_opens(spawn):
+    port = _free_port()
+    process = spawn('-c', SERVER, str(port), '0.2')
+
+    ready, elapsed, reason = wait_until_ready(process, port, timeout=10)
+
+    assert (ready, reason) == (True, None)
+    assert elapsed < 5
+
+
+def test_health_path_must_answer_2xx(spawn):
+    port = _free_port()
+    process = spawn('-c', SERVER, str(port), '0')
+
+    assert wait_until_ready(process, port, health_path='/health', timeout=10)[0] is True
+    assert wait_until_ready(process, port, health_path='/missing', timeout=0.5)[0] is False
+
+
+def test_exited_process_is_reported(spawn):
+    process = spawn('-c', 'import sys; sys.exit(3)')
+    process.wait()
+
+    ready, _, reason = wait_until_ready(process, _free_port(), timeout=10)
+
+    assert ready is False
+    assert 'code 3' in reason
+
+
+def test_timeout_when_port_never_opens(spawn):
+    process = spawn('-c', 'import time; time.sleep(30)')
+
+    ready, elapsed, reason = wait_until_ready(process, _free_port(), timeout=0.3)
+
+    assert ready is False
+    assert 'within 0.3 seconds' in reason
+    assert elapsed < 2
+
+
+def test_port_used_by_another_process_is_not_ready(spawn):
+    # 이전 서버가 아직 포트를 점유한 경우입니다. 새 프로세스는 포트를 열지 않습니다.
+    with socket.socket() as old_server:
+        old_server.bind(('127.0.0.1', 0))
+        old_server.listen()
+        port = old_server.getsockname()[1]
+        process = spawn('-c', 'import time; time.sleep(30)')
+
+        ready, _, reason = wait_until_ready(process, port, timeout=0.5)
+
+    assert ready is False
+    assert 'used by another process' in reason
+
+
+def test_listener_started_by_a_child_process_is_ready(spawn):
+    port = _free_port()
+    child = f'import subprocess, sys; subprocess.run([sys.executable, "-c", {SERVER!r}, "{port}", "0"])'
+    process = spawn('-c', child)
+
+    ready, _, reason = wait_until_ready(process, port, timeout=10)
+
+    assert (ready, reason) == (True, None)
@@ -0,0 +1,181 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from manager.replication import (QUORUM_COMPLETED, QUORUM_FAILED, QUORUM_PENDING, REPLICATED, REPLICATION_FAILED,
+                                 Replicator, parse_peer)
+from manager.task_registry import COMPLETED, FAILED, QUEUED
+
+LOCAL_COMPLETED = (COMPLETED, 0, None, None)
+
+
+class _Peer:
+    # /jar_upload/replica 는 sha256 이 known 에 있을 때만 받아들이고(없으면 missing 을 표시한 404),
+    # /tasking 은 statuses 의 상태를 돌려주는 가짜 UEC 입니다.
+    def __init__(self):
+        self.known = set()
+        self.has_service = True
+        self.statuses = {}
+        self.uploads = []
+        peer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                if self.path.startswith('/jar_upload/replica'):
+                    digest = json.loads(body)['sha256']
+                    if not peer.has_service:
+                        self._reply(404, {'error': 'unknown service'})
+                    elif digest in peer.known:
+                        self._reply(200, {'uuid': f'hash-{digest}'})
+                    else:
+                        self._reply(404, {'error': 'unknown content', 'missing': True})
+                else:
+                    peer.uploads.append(body)
+                    self._reply(202, {'uuid': f'upload-{len(peer.uploads)}'})
+
+            def do_GET(self):
+                uuid = parse_qs(urlparse(self.path).query)['uuid'][0]
+                if uuid in peer.statuses:
+                    self._reply(200, {'status': peer.statuses[uuid]})
+                else:
+                    self._reply(404, {'message': 'unknown task'})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.address = f'127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def peers():
+    created = []
+
+    def make(count):
+        created.extend(_Peer() for _ in range(count))
+        return created[-count:]
+
+    yield make
+    for peer in created:
+        peer.close()
+
+
+def _replicator(*addresses, quorum=None):
+    return Replicator(SimpleNamespace(name='svc'), addresses, quorum=quorum)
+
+
+def _wait_replicated(replicator, task_uuid, timeout=5):
+    for _ in range(int(timeout / 0.05)):
+        nodes = replicator.status(task_uuid, LOCAL_COMPLETED)['nodes'][1:]
+        if all(node['replication'] != 'replicating' for node in nodes):
+            return nodes
+        threading.Event().wait(0.05)
+    raise AssertionError('The replication did not finish.')
+
+
+def test_parse_peer():
+    assert parse_peer('10.0.0.1:8080') == ('10.0.0.1', 8080)
+    assert parse_peer('[::1]:8080') == ('::1', 8080)
+    for address in ('10.0.0.1', ':8080', 'host:port'):
+        with pytest.raises(ValueError):
+            parse_peer(address)
+
+
+def test_quorum_defaults_to_a_majority_and_is_capped():
+    assert _replicator().quorum == 1
+    assert _replicator('a:1', 'b:2').quorum == 2
+    assert _replicator('a:1', 'b:2', 'c:3').quorum == 3
+    assert _replicator('a:1', quorum=5).quorum == 2
+
+
+def test_without_peers_the_local_status_decides():
+    replicator = _replicator()
+
+    assert replicator.replicate('t', '/save/app.jar', 'aa') is False
+    assert replicator.status('t', LOCAL_COMPLETED)['status'] == QUORUM_COMPLETED
+    assert replicator.status('t', (FAILED, 0, 'broken', None))['status'] == QUORUM_FAILED
+
+
+def test_peer_with_the_same_content_receives_only_the_hash(tmp_path, peers):
+    hit, miss = peers(2)
+    hit.known.add('aa')
+    path = tmp_path / 'app v3.jar'
+    path.write_bytes(b'jar')
+    replicator = _replicator(hit.address, miss.address)
+
+    assert replicator.replicate('t', str(path), 'aa') is True
+    assert replicator.replicate('t', str(path), 'aa') is False
+    nodes = {node['node']: node for node in _wait_replicated(replicator, 't')}
+
+    assert nodes[hit.address]['transfer'] == 'hash'
+    assert nodes[miss.address]['transfer'] == 'upload'
+    assert len(miss.uploads) == 1
+    assert b'filename="app.jar"' in miss.uploads[0] and b'\r\n\r\njar\r\n' in miss.uploads[0]
+
+
+def test_quorum_follows_the_peer_statuses(tmp_path, peers):
+    first, second = peers(2)
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    replicator = _replicator(first.address, second.address)
+    replicator.replicate('t', str(path), 'aa')
+    assert all(node['replication'] == REPLICATED for node in _wait_replicated(replicator, 't'))
+
+    first.statuses['upload-1'] = QUEUED
+    second.statuses['upload-1'] = FAILED
+    assert replicator.status('t', LOCAL_COMPLETED)['status'] == QUORUM_PENDING
+
+    first.statuses['upload-1'] = COMPLETED
+    result = replicator.status('t', LOCAL_COMPLETED)
+    assert result['status'] == QUORUM_COMPLETED
+    assert result['quorum'] == {'required': 2, 'nodes': 3, 'succeeded': 2, 'reached': True}
+
+    first.statuses['upload-1'] = FAILED
+    assert replicator.status('t', LOCAL_COMPLETED)['status'] == QUORUM_FAILED
+
+
+def test_unreachable_peer_fails_its_replication(tmp_path, peers):
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    peer, = peers(1)
+    peer.close()
+    replicator = _replicator(peer.address)
+
+    replicator.replicate('t', str(path), 'aa')
+    node, = _wait_replicated(replicator, 't')
+
+    assert node['replication'] == REPLICATION_FAILED
+    assert node['status'] == FAILED
+    assert replicator.status('t', LOCAL_COMPLETED)['status'] == QUORUM_FAILED
+
+
+def test_peer_404_without_the_missing_flag_fails_without_an_upload(tmp_path, peers):
+    peer, = peers(1)
+    peer.has_service = False
+    path = tmp_path / 'app.jar'
+    path.write_bytes(b'jar')
+    replicator = _replicator(peer.address)
+
+    replicator.replicate('t', str(path), 'aa')
+    node, = _wait_replicated(replicator, 't')
+
+    assert node['replication'] == REPLICATION_FAILED
+    assert '404' in node['error']
+    assert peer.uploads == []
@@ -0,0 +1,45 @@
+import hashlib
+import time
+
+import pytest
+
+from manager import runner_manager
+from manager.file_manager import publish_file
+from manager.runner_manager import Manager
+from manager.task_registry import QUEUED
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner_manager, 'DETECT_TIMEOUT', 0.2)
+    # start() 를 호출하지 않으므로 감시자는 실행되지 않으며, 게시된 파일의 이벤트도 발생하지 않습니다.
+    return Manager(str(tmp_path), 18080, validate=False, name='test')
+
+
+def _publish(tmp_path, manager, data=b'jar'):
+    temp = tmp_path / '.upload.part'
+    temp.write_bytes(data)
+    return publish_file(str(tmp_path), str(temp), 'app.jar', hashlib.sha256(data).hexdigest(), manager.reserve)
+
+
+def test_published_upload_is_queued_without_the_observer_event(tmp_path, manager):
+    uuid = _publish(tmp_path, manager)
+    assert manager.tasks.get(uuid).held
+
+    for _ in range(40):
+        if not manager.tasks.get(uuid).held:
+            break
+        time.sleep(0.05)
+
+    task = manager.tasks.get(uuid)
+    assert not task.held
+    assert task.status == QUEUED
+    assert (tmp_path / 'app.jar').is_file()
+
+
+def test_failed_publish_finishes_the_reserved_task(tmp_path, manager):
+    with pytest.raises(FileNotFoundError):
+        publish_file(str(tmp_path), str(tmp_path / '.missing.part'), 'app.jar', 'aa', manager.reserve)
+
+    assert manager.task_count() == 0
+    assert manager._reserved == {}
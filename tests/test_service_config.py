@@ -0,0 +1,80 @@
+import argparse
+import json
+import math
+import sys
+
+import pytest
+
+import app
+from manager.service_config import _KEYS, ServiceConfigError, load_service_configs
+
+
+def _load(tmp_path, config, defaults=None):
+    path = tmp_path / 'services.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return load_service_configs(str(path), defaults)
+
+
+def test_services_map_to_manager_arguments(tmp_path):
+    configs = _load(tmp_path, {'services': [
+        {'name': 'api', 'save_dir': '/srv/api', 'port': 8080, 'maintenance_count': 5},
+        {'name': 'web', 'save_dir': '/srv/web', 'port': 8081, 'coalesce': True},
+    ]}, defaults={'coalesce': False, 'ready_timeout': 30})
+
+    assert configs[0] == {'name': 'api', 'target_dir': '/srv/api', 'server_port': 8080, 'maintenance_count': 5,
+                          'coalesce': False, 'ready_timeout': 30}
+    # 설정 파일의 값이 실행 인수의 기본값보다 우선합니다.
+    assert configs[1]['coalesce'] is True
+    assert configs[1]['maintenance_count'] == math.inf
+
+
+def test_top_level_list_is_accepted(tmp_path):
+    configs = _load(tmp_path, [{'name': 'api', 'save_dir': '/srv/api', 'port': 8080}])
+
+    assert [config['name'] for config in configs] == ['api']
+
+
+@pytest.mark.parametrize('config, message', [
+    ({'services': []}, 'No services'),
+    ([{'name': 'api', 'port': 8080}], '"save_dir" is required'),
+    ([{'name': 'api', 'save_dir': '/srv/api', 'port': 8080, 'colaesce': True}], 'Unknown service settings'),
+    ([{'name': 'api', 'save_dir': '/srv/a', 'port': 8080}, {'name': 'api', 'save_dir': '/srv/b', 'port': 8081}],
+     'duplicated'),
+    ([{'name': 'api', 'save_dir': '/srv/a', 'port': 8080}, {'name': 'web', 'save_dir': '/srv/b/../a/', 'port': 8081}],
+     'use the same save_dir'),
+])
+def test_invalid_configs_are_rejected(tmp_path, config, message):
+    with pytest.raises(ServiceConfigError, match=message):
+        _load(tmp_path, config)
+
+
+@pytest.mark.parametrize('services', [
+    [{'name': 'api', 'save_dir': '/srv/a', 'port': 8080}, {'name': 'web', 'save_dir': '/srv/b', 'port': 8080}],
+    [{'name': 'api', 'save_dir': '/srv/a', 'port': 8080, 'internal_ports': [18080, 18081]},
+     {'name': 'web', 'save_dir': '/srv/b', 'port': 18081}],
+])
+def test_services_sharing_a_port_are_rejected(tmp_path, services):
+    with pytest.raises(ServiceConfigError, match='use the same port'):
+        _load(tmp_path, services)
+
+
+def test_cli_options_apply_to_config_services(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['app.py', '-co', '-rt', '5', '-hp', '/health', '-mb', '1024', '-ma', '60',
+                                      '-rl', '0', '-bl', '-nv', '-iq', '2', '-pe', 'node2:4074', '-qu', '2'])
+    defaults = app.service_defaults(app.add_parse(argparse.ArgumentParser()))
+
+    config = _load(tmp_path, [{'name': 'api', 'save_dir': '/srv/api', 'port': 8080}], defaults)[0]
+
+    assert config['coalesce'] is True
+    assert config['ready_timeout'] == 5
+    assert config['health_path'] == '/health'
+    assert config['maintenance_bytes'] == 1024
+    assert config['maintenance_age'] == 60
+    assert config['restart_limit'] == 0
+    assert config['backend_log'] is True
+    assert config['validate'] is False
+    assert config['ingest_quiet'] == 2
+    assert config['peers'] == ['node2:4074']
+    assert config['quorum'] == 2
+    # 서비스 설정 파일로 지정할 수 있는 값은 모두 실행 인수의 값을 기본값으로 받습니다.
+    assert set(_KEYS.values()) - set(config) <= {'command'}
@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from uuid import uuid4
+
+import manager.task_journal as task_journal
+from manager.task_journal import JOURNAL_FILE_NAME, TaskJournal
+
+
+def _line(event, uuid, **values):
+    return json.dumps(dict(values, event=event, uuid=str(uuid), time=0.0))
+
+
+def _uuids(entries):
+    return [entry['uuid'] for entry in entries]
+
+
+def _wait_compaction(journal):
+    for _ in range(100):
+        if journal._compacting is None:
+            return
+        time.sleep(0.05)
+    raise AssertionError('The compaction did not finish.')
+
+
+def test_replay_restores_unfinished_and_finished_tasks(tmp_path):
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    done, pending = uuid4(), uuid4()
+    journal.add(done, '/save/app.jar', 'app')
+    journal.add(pending, '/save/app v2.jar', 'app')
+    journal.finish(done, 'completed')
+    assert journal.sync(timeout=5)
+
+    unfinished, finished = TaskJournal(str(tmp_path)).replay()
+
+    assert _uuids(unfinished) == [str(pending)]
+    assert [(entry['uuid'], entry['status'], entry['path']) for entry in finished] == \
+           [(str(done), 'completed', '/save/app.jar')]
+
+
+def test_priority_is_replayed(tmp_path):
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    uuid = uuid4()
+    journal.sync(journal.add(uuid, '/save/app.jar', 'app', priority=True))
+
+    unfinished, _ = TaskJournal(str(tmp_path)).replay()
+
+    assert unfinished[0]['priority'] is True
+
+
+def test_replay_discards_truncated_last_line(tmp_path):
+    done, pending, lost = uuid4(), uuid4(), uuid4()
+    lines = [
+        _line('add', done, path='/save/app.jar', artifact='app'),
+        _line('add', pending, path='/save/app v2.jar', artifact='app'),
+        _line('finish', done, status='completed', message=None),
+    ]
+    truncated = _line('add', lost, path='/save/app v3.jar', artifact='app')[:20]
+    (tmp_path / JOURNAL_FILE_NAME).write_text('\n'.join(lines) + '\n' + truncated, encoding='utf-8')
+
+    unfinished, finished = TaskJournal(str(tmp_path)).replay()
+
+    assert _uuids(unfinished) == [str(pending)]
+    assert _uuids(finished) == [str(done)]
+
+
+def test_replay_skips_broken_line_in_the_middle(tmp_path):
+    first, second = uuid4(), uuid4()
+    lines = [
+        _line('add', first, path='/save/a.jar', artifact='a'),
+        '{"event": "add", "uu',
+        _line('add', second, path='/save/b.jar', artifact='b'),
+    ]
+    (tmp_path / JOURNAL_FILE_NAME).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    unfinished, _ = TaskJournal(str(tmp_path)).replay()
+
+    assert _uuids(unfinished) == [str(first), str(second)]
+
+
+def test_compaction_keeps_only_live_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_journal, 'COMPACT_THRESHOLD', 20)
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    unfinished = []
+
+    def record(count):
+        for number in range(count):
+            uuid = uuid4()
+            journal.add(uuid, f'/save/{uuid}.jar', 'app')
+            if number % 3:
+                journal.finish(uuid, 'completed')
+            else:
+                unfinished.append(str(uuid))
+
+    threads = [threading.Thread(target=record, args=(60,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.sync()
+    _wait_compaction(journal)
+
+    lines = (tmp_path / JOURNAL_FILE_NAME).read_text(encoding='utf-8').splitlines()
+    replayed, finished = TaskJournal(str(tmp_path)).replay()
+
+    assert len(lines) < 400
+    assert sorted(_uuids(replayed)) == sorted(unfinished)
+    assert len(finished) == 160
+
+
+def test_entries_appended_after_truncated_line_survive_next_replay(tmp_path):
+    kept, added = uuid4(), uuid4()
+    truncated = _line('add', uuid4(), path='/save/x.jar', artifact='x')[:20]
+    (tmp_path / JOURNAL_FILE_NAME).write_text(_line('add', kept, path='/save/a.jar', artifact='a') + '\n' + truncated,
+                                              encoding='utf-8')
+
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    journal.sync(journal.add(added, '/save/b.jar', 'b'))
+
+    unfinished, _ = TaskJournal(str(tmp_path)).replay()
+
+    assert _uuids(unfinished) == [str(kept), str(added)]
+
+
+def test_complete_last_line_without_newline_is_kept(tmp_path):
+    kept, added = uuid4(), uuid4()
+    (tmp_path / JOURNAL_FILE_NAME).write_text(_line('add', kept, path='/save/a.jar', artifact='a'), encoding='utf-8')
+
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    journal.sync(journal.add(added, '/save/b.jar', 'b'))
+
+    unfinished, _ = TaskJournal(str(tmp_path)).replay()
+
+    assert _uuids(unfinished) == [str(kept), str(added)]
+
+
+def test_add_returns_before_the_record_is_synced(tmp_path, monkeypatch):
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    fsync = task_journal.os.fsync
+    released = threading.Event()
+
+    def slow_fsync(fd):
+        released.wait(5)
+        fsync(fd)
+    monkeypatch.setattr(task_journal.os, 'fsync', slow_fsync)
+
+    started = time.monotonic()
+    number = journal.add(uuid4(), '/save/app.jar', 'app')
+    assert time.monotonic() - started < 1
+    assert journal.sync(number, timeout=0.2) is False
+
+    released.set()
+    assert journal.sync(number, timeout=5) is True
+
+
+def test_records_written_during_compaction_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_journal, 'COMPACT_THRESHOLD', 5)
+    journal = TaskJournal(str(tmp_path))
+    journal.replay()
+    compact = journal._TaskJournal__compact
+    in_compaction = threading.Event()
+    resume = threading.Event()
+
+    def paused_compact(entries, lines):
+        in_compaction.set()
+        resume.wait(5)
+        compact(entries, lines)
+    monkeypatch.setattr(journal, '_TaskJournal__compact', paused_compact)
+
+    for _ in range(10):
+        uuid = uuid4()
+        journal.add(uuid, f'/save/{uuid}.jar', 'app')
+        journal.sync(journal.finish(uuid, 'completed'))
+    assert in_compaction.wait(5)
+
+    # 압축이 멈춰 있는 동안에도 기록은 디스크에 반영됩니다.
+    pending = uuid4()
+    assert journal.sync(journal.add(pending, '/save/pending.jar', 'app'), timeout=5)
+    resume.set()
+    _wait_compaction(journal)
+
+    unfinished, finished = TaskJournal(str(tmp_path)).replay()
+    assert _uuids(unfinished) == [str(pending)]
+    assert len(finished) == 10
+    lines = (tmp_path / JOURNAL_FILE_NAME).read_text(encoding='utf-8').splitlines()
+    assert len(lines) == len(set(lines))
@@ -0,0 +1,264 @@
+import asyncio
+import threading
+import time
+from uuid import uuid4
+
+from manager.task_registry import CANCELLED_MESSAGE, COMPLETED, DEPLOYING, QUEUED, SKIPPED, UNKNOWN, VALIDATING, \
+    TaskRegistry
+
+
+def _add(registry, **kwargs):
+    uuid = uuid4()
+    registry.add(uuid, f'/save/{uuid}.jar', **kwargs)
+    return uuid
+
+
+def _state(registry, uuid):
+    # (상태, 대기 번호)
+    return registry.status(uuid)[:2]
+
+
+def test_waiting_numbers_follow_registration_order():
+    registry = TaskRegistry()
+    first, second, third = _add(registry), _add(registry), _add(registry)
+
+    assert [_state(registry, uuid) for uuid in (first, second, third)] == [(QUEUED, 0), (QUEUED, 1), (QUEUED, 2)]
+    assert len(registry) == 3
+
+
+def test_completed_task_moves_to_history():
+    registry = TaskRegistry()
+    first, second = _add(registry), _add(registry)
+    assert registry.claim_next().uuid == first
+    assert _state(registry, first) == (VALIDATING, 0)
+
+    registry.complete(first)
+
+    assert _state(registry, first) == (COMPLETED, 0)
+    assert _state(registry, second) == (QUEUED, 0)
+    assert registry.pending_paths() == [f'/save/{second}.jar']
+    assert registry.complete(first) is None
+
+
+def test_unknown_task():
+    assert _state(TaskRegistry(), uuid4()) == (UNKNOWN, 0)
+
+
+def test_history_is_bounded():
+    registry = TaskRegistry(history_size=2)
+    tasks = [_add(registry) for _ in range(3)]
+    for uuid in tasks:
+        registry.complete(uuid)
+
+    assert _state(registry, tasks[0]) == (UNKNOWN, 0)
+    assert [_state(registry, uuid)[0] for uuid in tasks[1:]] == [COMPLETED, COMPLETED]
+
+
+def test_coalesce_supersedes_queued_task_of_same_artifact():
+    registry = TaskRegistry()
+    old = _add(registry, artifact='app', coalesce=True)
+    other = _add(registry, artifact='web', coalesce=True)
+    new = _add(registry, artifact='app', coalesce=True)
+
+    status, _, message = registry.status(old)[:3]
+    assert (status, message) == (SKIPPED, f'superseded by {new}')
+    # 새 작업은 대체한 작업의 자리를 이어받습니다.
+    assert _state(registry, new) == (QUEUED, 0)
+    assert _state(registry, other) == (QUEUED, 1)
+    assert len(registry) == 2
+
+
+def test_claim_next_runs_the_task_that_took_over_the_slot():
+    registry = TaskRegistry()
+    _add(registry, artifact='app', coalesce=True)
+    other = _add(registry, artifact='web')
+    new = _add(registry, artifact='app', coalesce=True)
+
+    assert registry.claim_next().uuid == new
+    assert registry.claim_next().uuid == other
+
+
+def test_started_task_is_not_superseded():
+    registry = TaskRegistry()
+    started = _add(registry, artifact='app', coalesce=True)
+    registry.claim_next()
+    queued = _add(registry, artifact='app', coalesce=True)
+
+    assert _state(registry, started) == (VALIDATING, 0)
+    assert _state(registry, queued) == (QUEUED, 1)
+
+
+def test_without_coalesce_every_upload_is_kept():
+    registry = TaskRegistry()
+    tasks = [_add(registry, artifact='app') for _ in range(3)]
+
+    assert [_state(registry, uuid) for uuid in tasks] == [(QUEUED, 0), (QUEUED, 1), (QUEUED, 2)]
+
+
+def test_wait_for_change_wakes_when_status_changes():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    previous = registry.status(uuid)
+    threading.Timer(0.05, registry.set_phase, (uuid, 'launching')).start()
+
+    start_time = time.monotonic()
+    state = registry.wait_for_change(uuid, previous, 5)
+
+    assert state[3] == 'launching'
+    assert time.monotonic() - start_time < 1
+
+
+def test_wait_for_change_returns_unchanged_state_after_timeout():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    previous = registry.status(uuid)
+
+    assert registry.wait_for_change(uuid, previous, 0.05) == previous
+
+
+def test_add_returns_the_superseded_task():
+    registry = TaskRegistry()
+    old = _add(registry, artifact='app', coalesce=True)
+
+    task, superseded = registry.add(uuid4(), '/save/app v2.jar', 'app', coalesce=True)
+
+    assert superseded.uuid == old
+    assert registry.add(uuid4(), '/save/web.jar', 'web', coalesce=True)[1] is None
+
+
+def test_restore_keeps_finished_task_queryable():
+    registry = TaskRegistry()
+    uuid = uuid4()
+
+    registry.restore(uuid, '/save/app.jar', 'app', COMPLETED, 'done', finished_at=1.0)
+
+    assert registry.status(uuid)[:3] == (COMPLETED, 0, 'done')
+    assert registry.get(uuid).finished_at == 1.0
+    assert len(registry) == 0
+
+
+def test_priority_task_runs_before_queued_tasks_but_after_running_task():
+    registry = TaskRegistry()
+    running = _add(registry)
+    registry.claim_next()
+    queued = _add(registry)
+    priority = _add(registry, priority=True)
+
+    assert _state(registry, running) == (VALIDATING, 0)
+    assert _state(registry, priority) == (QUEUED, 1)
+    assert _state(registry, queued) == (QUEUED, 2)
+    assert registry.claim_next().uuid == priority
+    assert registry.claim_next().uuid == queued
+
+
+def test_priority_task_is_never_coalesced():
+    registry = TaskRegistry()
+    queued = _add(registry, artifact='app', coalesce=True)
+    priority = _add(registry, artifact='app', coalesce=True, priority=True)
+    newer = _add(registry, artifact='app', coalesce=True)
+
+    assert registry.status(queued)[0] == SKIPPED
+    assert _state(registry, priority) == (QUEUED, 0)
+    assert _state(registry, newer) == (QUEUED, 1)
+
+
+def test_tasks_by_name_lists_tasks_of_each_file():
+    registry = TaskRegistry()
+    first = uuid4()
+    registry.add(first, '/save/app.jar', 'app')
+    registry.complete(first)
+    second = uuid4()
+    registry.add(second, '/save/app.jar', 'app', priority=True)
+
+    assert [task.uuid for task in registry.tasks_by_name()['app.jar']] == [first, second]
+
+
+def test_validated_task_moves_to_deploying():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    registry.claim_next()
+
+    assert registry.begin_deploy(uuid) is True
+    assert _state(registry, uuid) == (DEPLOYING, 0)
+
+
+def test_cancel_queued_task_skips_it():
+    registry = TaskRegistry()
+    cancelled, kept = _add(registry), _add(registry)
+
+    task, status = registry.cancel(cancelled)
+
+    assert (task.uuid, status) == (cancelled, SKIPPED)
+    assert registry.status(cancelled)[::2] == (SKIPPED, CANCELLED_MESSAGE)
+    assert _state(registry, kept) == (QUEUED, 0)
+    assert registry.claim_next().uuid == kept
+
+
+def test_cancel_validating_task_stops_it_before_deploy():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    registry.claim_next()
+
+    assert registry.cancel(uuid)[1] == VALIDATING
+    assert registry.begin_deploy(uuid) is False
+
+
+def test_cancel_refuses_deploying_and_unknown_tasks():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    registry.claim_next()
+    registry.begin_deploy(uuid)
+
+    assert registry.cancel(uuid)[1] == DEPLOYING
+    assert registry.cancel(uuid4()) == (None, UNKNOWN)
+
+
+def test_held_task_waits_until_released():
+    registry = TaskRegistry()
+    held = _add(registry, held=True)
+    ready = _add(registry)
+
+    assert registry.claim_next().uuid == ready
+    assert registry.release(held).uuid == held
+    assert registry.release(held) is None
+    assert registry.claim_next().uuid == held
+
+
+def test_claim_next_returns_none_after_close():
+    registry = TaskRegistry()
+    threading.Timer(0.05, registry.close).start()
+
+    assert registry.claim_next() is None
+
+
+def test_last_pending_is_the_task_that_runs_last():
+    registry = TaskRegistry()
+    assert registry.last_pending() is None
+
+    first = _add(registry)
+    last = _add(registry)
+    _add(registry, priority=True)
+    assert registry.last_pending().uuid == last
+
+    registry.cancel(last)
+    assert registry.last_pending().uuid == first
+
+
+def test_wait_for_change_async_wakes_on_change():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    previous = registry.status(uuid)
+
+    async def wait():
+        threading.Timer(0.05, registry.claim_next).start()
+        return await registry.wait_for_change_async(uuid, previous, 5)
+
+    assert asyncio.run(wait())[0] == VALIDATING
+
+
+def test_wait_for_change_async_returns_unchanged_state_after_timeout():
+    registry = TaskRegistry()
+    uuid = _add(registry)
+    previous = registry.status(uuid)
+
+    assert asyncio.run(registry.wait_for_change_async(uuid, previous, 0.05)) == previous
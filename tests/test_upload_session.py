@@ -0,0 +1,138 @@
+import hashlib
+import io
+
+import pytest
+
+from manager.upload_session import ChecksumError, UploadSession, UploadSessionError, _Ranges
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _send(session, data, start, end):
+    chunk = data[start:end]
+    return session.write(start, io.BytesIO(chunk), len(chunk), _sha(chunk))
+
+
+def _ranges(*pairs):
+    ranges = _Ranges()
+    for start, end in pairs:
+        ranges.add(start, end)
+    return ranges
+
+
+def test_add_keeps_disjoint_ranges_sorted():
+    ranges = _ranges((20, 30), (0, 10))
+
+    assert ranges.to_list() == [[0, 10], [20, 30]]
+    assert ranges.received() == 20
+
+
+def test_add_merges_overlapping_and_adjacent_ranges():
+    assert _ranges((0, 10), (5, 15)).to_list() == [[0, 15]]
+    assert _ranges((0, 10), (10, 20)).to_list() == [[0, 20]]
+    assert _ranges((0, 10), (20, 30), (40, 50), (5, 45)).to_list() == [[0, 50]]
+    assert _ranges((0, 100), (10, 20)).to_list() == [[0, 100]]
+
+
+def test_remove_splits_a_range():
+    ranges = _ranges((0, 100))
+    ranges.remove(40, 60)
+
+    assert ranges.to_list() == [[0, 40], [60, 100]]
+    assert ranges.received() == 80
+
+
+def test_remove_trims_and_drops_several_ranges():
+    ranges = _ranges((0, 10), (20, 30), (40, 50))
+    ranges.remove(5, 45)
+
+    assert ranges.to_list() == [[0, 5], [45, 50]]
+
+
+def test_remove_outside_received_ranges_changes_nothing():
+    ranges = _ranges((0, 10), (20, 30))
+    ranges.remove(10, 20)
+
+    assert ranges.to_list() == [[0, 10], [20, 30]]
+
+
+def test_missing_lists_gaps_up_to_size():
+    ranges = _ranges((10, 20), (30, 40))
+
+    assert ranges.missing(50) == [[0, 10], [20, 30], [40, 50]]
+    assert _ranges((0, 50)).missing(50) == []
+
+
+def test_session_accepts_chunks_out_of_order(tmp_path):
+    data = bytes(range(256)) * 4
+    session = UploadSession('svc', str(tmp_path), 'app.jar', len(data), digest=_sha(data), chunk_size=256)
+
+    _send(session, data, 512, 1024)
+    assert not session.complete()
+    assert session.status()['missing'] == [[0, 512]]
+    _send(session, data, 0, 512)
+
+    assert session.complete()
+    assert session.finish() == _sha(data)
+    with open(session.path, 'rb') as f:
+        assert f.read() == data
+    session.close()
+
+
+def test_session_forgets_a_chunk_with_a_wrong_checksum(tmp_path):
+    data = b'x' * 100
+    session = UploadSession('svc', str(tmp_path), 'app.jar', len(data))
+
+    with pytest.raises(ChecksumError):
+        session.write(0, io.BytesIO(data[:50]), 50, _sha(b'other'))
+
+    assert session.status()['received'] == []
+    with pytest.raises(UploadSessionError):
+        session.finish()
+    session.close()
+
+
+def test_session_rejects_a_chunk_out_of_range(tmp_path):
+    session = UploadSession('svc', str(tmp_path), 'app.jar', 10)
+
+    with pytest.raises(UploadSessionError):
+        session.write(5, io.BytesIO(b'x' * 10), 10, _sha(b'x' * 10))
+    session.close()
+
+
+def test_session_rejects_a_file_with_a_wrong_digest(tmp_path):
+    data = b'y' * 64
+    session = UploadSession('svc', str(tmp_path), 'app.jar', len(data), digest=_sha(b'other'))
+    _send(session, data, 0, len(data))
+
+    with pytest.raises(ChecksumError):
+        session.finish()
+    session.close()
+    assert not (tmp_path / session.path).exists()
+
+
+def test_session_is_finalized_only_once(tmp_path):
+    data = b'z' * 64
+    session = UploadSession('svc', str(tmp_path), 'app.jar', len(data), digest=_sha(data))
+    _send(session, data, 0, len(data))
+
+    assert session.finish() == _sha(data)
+    with pytest.raises(UploadSessionError):
+        session.finish()
+    session.close()
+
+
+def test_session_can_be_finalized_again_after_a_digest_mismatch(tmp_path):
+    data = b'z' * 64
+    session = UploadSession('svc', str(tmp_path), 'app.jar', len(data), digest=_sha(data))
+    _send(session, data, 0, 32)
+    _send(session, b'w' * 64, 32, 64)
+
+    with pytest.raises(ChecksumError):
+        session.finish()
+    _send(session, data, 32, 64)
+
+    assert session.finish() == _sha(data)
+    session.close()
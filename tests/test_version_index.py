@@ -0,0 +1,55 @@
+from manager.version_index import VersionIndex, parse_version
+
+
+def _index(tmp_path, *names):
+    for name in names:
+        (tmp_path / name).write_bytes(b'jar')
+    return VersionIndex(str(tmp_path)).scan()
+
+
+def test_parse_version():
+    assert parse_version('app.jar') == ('app', 1)
+    assert parse_version('app v3.jar') == ('app', 3)
+    assert parse_version('my app v12.jar') == ('my app', 12)
+    assert parse_version('app v2.beta.jar') == ('app v2.beta', 1)
+
+
+def test_scan_ignores_hidden_and_other_files(tmp_path):
+    index = _index(tmp_path, 'app.jar', 'app v2.jar', '.upload.part', '.app v3.jar', 'notes.txt')
+
+    assert len(index) == 2
+    assert index.latest('app', 5) == ['app v2.jar', 'app.jar']
+
+
+def test_reserve_next_takes_the_next_version_name(tmp_path):
+    index = _index(tmp_path, 'app.jar', 'app v2.jar')
+
+    assert index.reserve_next('app.jar') == 'app v3.jar'
+    # 선점한 이름은 파일이 생기기 전에도 색인에 있으므로 다음 업로드와 겹치지 않습니다.
+    assert index.reserve_next('app.jar') == 'app v4.jar'
+    assert index.reserve_next('web.jar') == 'web.jar'
+
+
+def test_versions_are_ordered_numerically(tmp_path):
+    index = _index(tmp_path, 'app v10.jar', 'app v9.jar', 'app.jar')
+
+    assert index.latest('app') == ['app v10.jar']
+    assert index.latest('app', 3) == ['app v10.jar', 'app v9.jar', 'app.jar']
+
+
+def test_add_and_discard(tmp_path):
+    index = _index(tmp_path, 'app.jar')
+
+    assert index.add('/save/app v2.jar') is True
+    assert index.add('app v2.jar') is False
+    assert index.discard('app.jar') is True
+    assert index.discard('app.jar') is False
+    assert index.latest('app', 5) == ['app v2.jar']
+
+
+def test_evict_keeps_latest_versions_of_each_artifact(tmp_path):
+    index = _index(tmp_path, 'app.jar', 'app v2.jar', 'app v3.jar', 'web.jar', 'web v2.jar')
+
+    assert sorted(index.evict(1)) == ['app v2.jar', 'app.jar', 'web.jar']
+    assert index.evict(2, ignores=['app.jar']) == []
+    assert index.evict(3) == []